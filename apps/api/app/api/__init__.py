@@ -6,6 +6,7 @@ from .projects import router as projects_router
 from .documents import router as documents_router
 from .extractions import router as extractions_router
 from .exports import router as exports_router
+from .usage import router as usage_router
 
 api_router = APIRouter()
 
@@ -13,4 +14,5 @@ api_router.include_router(projects_router, prefix="/projects", tags=["Projects"]
 api_router.include_router(documents_router, prefix="/documents", tags=["Documents"])
 api_router.include_router(extractions_router, prefix="/extractions", tags=["Extractions"])
 api_router.include_router(exports_router, prefix="/exports", tags=["Exports"])
+api_router.include_router(usage_router, prefix="/usage", tags=["Usage"])
 
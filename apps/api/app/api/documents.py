@@ -2,27 +2,52 @@
 Document API Routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Dict, Any
+import asyncio
+import json
 import os
 import uuid
 import shutil
 from pathlib import Path
 
-from ..database import get_db
-from ..models.document import Document, DocumentStatus, DocumentLanguage
+from ..database import get_db, SessionLocal
+from ..models.document import Document, DocumentStatus, DocumentLanguage, DocumentFingerprint
 from ..models.project import Project
 from ..models.extraction import Extraction, ExtractedField, FieldStatus, FieldType
+from ..models.validation import FlagCategory, FlagSeverity, ValidationFlag as FlagModel
 from ..schemas.document import DocumentResponse, DocumentUploadResponse, DocumentListResponse
 from ..config import get_settings
 from ..services.ocr_service import OCRService, MockOCRService
-from ..services.extraction_service import ExtractionService, MockExtractionService
-from ..services.validation_service import ValidationService
+from ..services.extraction_service import ExtractionService, MockExtractionService, ExtractionError
+from ..services.validation_service import ValidationService, ValidationFlag, canonical_digests, bump_fields_version
+from ..services.usage_service import UsageService
+from ..services.model_router import ModelRouter
+from ..services.extraction_batcher import get_extraction_batcher
+from ..services.period_analyzer import quarter_bounds
+from ..services.proration import allocate
+from ..services.flag_store import save_flags, SOURCE_DOCUMENT
+from ..services.unit_normalizer import MWH_PRECISION
+from ..services.duplicate_detector import (
+    bill_fingerprint, text_signature, index_keys, similarity,
+    FINGERPRINT, NEAR_DUPLICATE_SIMILARITY
+)
 
 router = APIRouter()
 settings = get_settings()
 
+# Statuses after which a document's status stream ends
+TERMINAL_STATUSES = {
+    DocumentStatus.OCR_FAILED,
+    DocumentStatus.EXTRACTION_COMPLETE,
+    DocumentStatus.EXTRACTION_FAILED,
+    DocumentStatus.REVIEWED,
+}
+
+STATUS_STREAM_POLL_SECONDS = 0.5
+
 
 @router.post("/upload/{project_id}", response_model=List[DocumentUploadResponse])
 async def upload_documents(
@@ -48,6 +73,7 @@ async def upload_documents(
     upload_dir.mkdir(parents=True, exist_ok=True)
     
     uploaded = []
+    document_ids = []
     
     for file in files:
         # Validate file type
@@ -89,8 +115,7 @@ async def upload_documents(
         db.commit()
         db.refresh(document)
         
-        # Queue background processing
-        background_tasks.add_task(process_document, doc_id)
+        document_ids.append(doc_id)
         
         uploaded.append(DocumentUploadResponse(
             id=document.id,
@@ -101,6 +126,9 @@ async def upload_documents(
             message="Document uploaded, processing started"
         ))
     
+    # Queue background processing
+    background_tasks.add_task(process_documents, document_ids)
+    
     return uploaded
 
 
@@ -198,6 +226,70 @@ async def get_document_ocr(
     return document.ocr_raw_output
 
 
+@router.get("/{document_id}/events")
+def stream_document_events(
+    document_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Server-sent event stream of a document's processing status.
+    Emits an event whenever the status or the partially extracted key fields
+    change, and closes once processing has finished.
+    """
+    document = db.query(Document).filter(Document.id == document_id).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    async def event_stream():
+        # Own session: the request-scoped one may be closed while streaming
+        stream_db = SessionLocal()
+        last_payload = None
+        try:
+            while True:
+                # Polled off the event loop, as the query blocks
+                event = await run_in_threadpool(_document_event, stream_db, document_id)
+                if event is None:
+                    break
+                
+                payload, finished = event
+                if payload != last_payload:
+                    yield f"data: {json.dumps(payload)}\n\n"
+                    last_payload = payload
+                
+                if finished:
+                    break
+                await asyncio.sleep(STATUS_STREAM_POLL_SECONDS)
+        finally:
+            await run_in_threadpool(stream_db.close)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+def _document_event(db: Session, document_id: str):
+    """
+    Current status event of a document and whether processing has
+    finished, or None if the document was deleted.
+    """
+    db.expire_all()
+    doc = db.query(Document).filter(Document.id == document_id).first()
+    if not doc:
+        return None
+    payload = {
+        "status": doc.status.value,
+        "extraction_data": doc.extraction_data,
+        "error_message": doc.error_message
+    }
+    return payload, doc.status in TERMINAL_STATUSES
+
+
 @router.post("/{document_id}/reprocess", response_model=DocumentResponse)
 async def reprocess_document(
     document_id: str,
@@ -216,6 +308,7 @@ async def reprocess_document(
     # Reset status
     document.status = DocumentStatus.UPLOADED
     document.error_message = None
+    document.extraction_data = None
     db.commit()
     
     # Queue background processing
@@ -245,6 +338,46 @@ async def set_document_language(
     return {"status": "ok", "language": language}
 
 
+@router.delete("/{document_id}/duplicate")
+async def dismiss_duplicate(
+    document_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Mark a document flagged as a duplicate as a distinct bill (counted again
+    in totals). The dismissal is kept, so reprocessing either document does
+    not flag the pair again.
+    """
+    document = db.query(Document).filter(Document.id == document_id).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    flags = db.query(FlagModel).filter(
+        FlagModel.document_id == document_id,
+        FlagModel.code == "DUPLICATE_BILL"
+    ).all()
+    originals = {f.context.get("original_document") for f in flags if f.context} | {document.duplicate_of_id}
+    document.dismissed_duplicate_ids = sorted(
+        set(document.dismissed_duplicate_ids or []) | {o for o in originals if o}
+    )
+    
+    for flag in flags:
+        flag.is_resolved = True
+        flag.resolution_note = "Dismissed: a different bill"
+        flag.context = {**(flag.context or {}), "excluded_from_totals": False}
+    
+    document.duplicate_of_id = None
+    document.duplicate_similarity = None
+    update_project_canonical(db, document.project_id)
+    db.commit()
+    
+    return {"status": "ok"}
+
+
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     document_id: str,
@@ -263,10 +396,30 @@ async def delete_document(
     if os.path.exists(document.file_path):
         os.remove(document.file_path)
     
+    # Copies of this document are no longer duplicates of anything
+    db.query(Document).filter(Document.duplicate_of_id == document_id).update(
+        {"duplicate_of_id": None, "duplicate_similarity": None}
+    )
+    bump_fields_version(db, document.project_id)
     db.delete(document)
     db.commit()
 
 
+async def process_documents(document_ids: List[str]):
+    """
+    Background task processing an upload's documents concurrently, so
+    small ones can share packed extraction requests. (Background tasks
+    run one after another, which would leave each batch with a single
+    document.)
+    """
+    results = await asyncio.gather(
+        *(process_document(document_id) for document_id in document_ids), return_exceptions=True
+    )
+    for document_id, result in zip(document_ids, results):
+        if isinstance(result, Exception):
+            print(f"[PROCESS] Processing failed for {document_id}: {str(result)}")
+
+
 async def process_document(document_id: str):
     """
     Background task to process a document.
@@ -300,6 +453,10 @@ async def process_document(document_id: str):
             print(f"[PROCESS] Using mock extraction (no OpenAI API key)")
         
         validation_service = ValidationService()
+        usage_service = UsageService()
+        # Small documents share packed extraction requests across tasks
+        batcher = get_extraction_batcher() if settings.openai_api_key and settings.batch_enabled else None
+        model_router = ModelRouter(extraction_service, validation_service, batcher)
         
         # Step 1: OCR
         document.status = DocumentStatus.OCR_PROCESSING
@@ -309,9 +466,11 @@ async def process_document(document_id: str):
         try:
             ocr_result = await ocr_service.process_pdf(document.file_path)
             document.page_count = ocr_result.page_count
-            document.detected_language = DocumentLanguage(ocr_result.detected_language) if ocr_result.detected_language in ["en", "fr", "ar"] else DocumentLanguage.UNKNOWN
+            document.detected_language = DocumentLanguage(ocr_result.detected_language) if ocr_result.detected_language in {l.value for l in DocumentLanguage} else DocumentLanguage.UNKNOWN
             document.ocr_confidence = ocr_result.confidence
             document.ocr_processing_time = ocr_result.processing_time
+            document.ocr_pages_billed = (document.ocr_pages_billed or 0) + ocr_result.pages_billed
+            document.ocr_cost = (document.ocr_cost or 0.0) + usage_service.ocr_cost(ocr_result.pages_billed)
             document.ocr_raw_output = ocr_result.to_dict()
             document.status = DocumentStatus.OCR_COMPLETE
             db.commit()
@@ -330,9 +489,14 @@ async def process_document(document_id: str):
         db.commit()
         print(f"[PROCESS] Starting extraction...")
         
+        async def publish_partial(preview: Dict[str, Any]):
+            # Surface key fields to the review UI before the completion finishes
+            document.extraction_data = preview
+            db.commit()
+        
         try:
-            extraction_result = await extraction_service.extract_from_ocr(
-                ocr_result, document.id
+            extraction_result = await model_router.extract(
+                ocr_result, document.id, on_partial=publish_partial
             )
             print(f"[PROCESS] Extraction complete, {len(extraction_result.fields)} fields")
             
@@ -348,12 +512,21 @@ async def process_document(document_id: str):
             ).count()
             
             # Create extraction record
+            usage = extraction_result.usage
             extraction = Extraction(
                 document_id=document_id,
                 version=max_version + 1,
                 is_current=True,
                 model_name=extraction_result.model_name,
+                prompt_version=extraction_result.prompt_version,
+                route=extraction_result.route,
+                escalation_reason=extraction_result.escalation_reason,
                 processing_time=extraction_result.processing_time,
+                llm_calls=usage.calls,
+                prompt_tokens=usage.prompt_tokens,
+                cached_tokens=usage.cached_tokens,
+                completion_tokens=usage.completion_tokens,
+                estimated_cost=extraction_result.estimated_cost,
                 raw_output=extraction_result.raw_response,
                 canonical_data=extraction_result.canonical_data
             )
@@ -368,41 +541,34 @@ async def process_document(document_id: str):
                     field_type=FieldType(field_data["field_type"]) if field_data["field_type"] in [e.value for e in FieldType] else FieldType.OTHER,
                     value=field_data.get("value"),
                     unit=field_data.get("unit"),
+                    normalized_value=field_data.get("normalized_value"),
+                    normalized_unit=field_data.get("normalized_unit"),
                     confidence=field_data.get("confidence"),
+                    model_confidence=field_data.get("model_confidence"),
+                    confidence_checks=field_data.get("confidence_checks"),
                     status=FieldStatus.UNCONFIRMED,
                     source_page=field_data.get("source_page"),
-                    source_quote=field_data.get("source_quote")
+                    source_quote=field_data.get("source_quote"),
+                    source_bbox=field_data.get("source_bbox")
                 )
                 db.add(field)
+            bump_fields_version(db, document.project_id)
             
+            document.extraction_data = _extraction_preview(extraction_result.canonical_data)
             document.status = DocumentStatus.EXTRACTION_COMPLETE
             db.commit()
             
             # Step 3: Validate document
-            doc_validation = validation_service.validate_document(
-                extraction_result.canonical_data, document_id
-            )
+            doc_validation = validation_service.validate_document(extraction_result.canonical_data, document_id)
+            duplicate_flag = _check_duplicate(db, document, extraction_result.canonical_data, ocr_result.get_full_markdown())
+            if duplicate_flag:
+                doc_validation.flags.append(duplicate_flag)
             
-            # Store validation flags
-            from ..models.validation import ValidationFlag as VFModel
-            for flag in doc_validation.flags:
-                vf = VFModel(
-                    document_id=document_id,
-                    project_id=document.project_id,
-                    code=flag.code,
-                    category=flag.category,
-                    severity=flag.severity,
-                    message=flag.message,
-                    suggestion=flag.suggestion,
-                    field_name=flag.field_name,
-                    expected_value=flag.expected_value,
-                    actual_value=flag.actual_value,
-                    context=flag.context
-                )
-                db.add(vf)
+            # Store validation flags (replacing those of earlier runs)
+            save_flags(db, document.project_id, doc_validation.flags, SOURCE_DOCUMENT, document_id)
             
             # Update project canonical data
-            _update_project_canonical(db, document.project_id)
+            update_project_canonical(db, document.project_id)
             
             db.commit()
             
@@ -411,13 +577,35 @@ async def process_document(document_id: str):
             traceback.print_exc()
             document.status = DocumentStatus.EXTRACTION_FAILED
             document.error_message = str(e)
+            if isinstance(e, ExtractionError) and e.usage.calls:
+                _record_failed_extraction(db, document_id, e)
             db.commit()
             return
         
         print(f"[PROCESS] Document processing complete!")
 
 
-def _update_project_canonical(db: Session, project_id: str):
+def _record_failed_extraction(db: Session, document_id: str, error: ExtractionError):
+    """
+    Store the usage of a failed extraction's API calls as a non-current
+    extraction, so usage reports include what failures cost.
+    """
+    usage = error.usage
+    db.add(Extraction(
+        document_id=document_id,
+        version=db.query(Extraction).filter(Extraction.document_id == document_id).count() + 1,
+        is_current=False,
+        model_name=error.model_name,
+        route=error.route,
+        llm_calls=usage.calls,
+        prompt_tokens=usage.prompt_tokens,
+        cached_tokens=usage.cached_tokens,
+        completion_tokens=usage.completion_tokens,
+        estimated_cost=error.estimated_cost
+    ))
+
+
+def update_project_canonical(db: Session, project_id: str):
     """Aggregate all document extractions into project canonical data."""
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
@@ -429,7 +617,10 @@ def _update_project_canonical(db: Session, project_id: str):
     ).all()
     
     all_bills = []
-    total_mwh = 0.0
+    
+    # Bills uploaded twice to this project count once
+    document_ids = {doc.id for doc in documents}
+    documents = [doc for doc in documents if doc.duplicate_of_id not in document_ids]
     
     for doc in documents:
         extraction = db.query(Extraction).filter(
@@ -440,19 +631,27 @@ def _update_project_canonical(db: Session, project_id: str):
         if extraction and extraction.canonical_data:
             bills = extraction.canonical_data.get("electricity_bills", [])
             all_bills.extend(bills)
-            total_mwh += extraction.canonical_data.get("total_electricity_mwh", 0) or 0
+    
+    # Count only the part of each bill's consumption that falls in the reporting quarter
+    reporting_period = project.reporting_period.value if project.reporting_period else None
+    quarter = quarter_bounds(reporting_period, project.reporting_year)
+    allocations = allocate(all_bills, quarter)
+    all_bills = [{**bill, "quarter_allocation": a.to_dict()} for bill, a in zip(all_bills, allocations)]
+    total_mwh = round(sum(a.mwh for a in allocations), MWH_PRECISION)
+    billed_mwh = round(sum(a.billed_mwh for a in allocations), MWH_PRECISION)
     
     # Calculate emissions
     emission_factor = float(project.emission_factor_value or 0.4)  # Default 0.4 tCO2/MWh
     total_emissions = total_mwh * emission_factor
     
     project.canonical_data = {
-        "reporting_period": project.reporting_period.value if project.reporting_period else None,
+        "reporting_period": reporting_period,
         "reporting_year": project.reporting_year,
         "declarant": project.declarant_info,
         "installation": project.installation_info,
         "electricity_bills": all_bills,
         "total_electricity_mwh": total_mwh,
+        "billed_electricity_mwh": billed_mwh,
         "indirect_emissions": [{
             "electricity_consumed_mwh": total_mwh,
             "emission_factor": emission_factor,
@@ -462,6 +661,140 @@ def _update_project_canonical(db: Session, project_id: str):
         "total_indirect_emissions_tco2": total_emissions,
         "extraction_version": "1.0"
     }
+    project.canonical_digests = canonical_digests(project.canonical_data)
+
+
+def _check_duplicate(db: Session, document: Document, canonical_data: Dict[str, Any], ocr_text: str):
+    """
+    Index a processed document and look it up among the owner's other
+    documents, by bill fingerprint or by OCR text similarity. The lookup is
+    a fixed number of indexed queries on a fixed number of keys.
+    A fingerprint match sets duplicate_of_id, which drops the bill from the
+    totals; a text match only warns, and is ignored when the two bills have
+    different fingerprints or billing periods (e.g. consecutive monthly
+    bills from the same supplier), as are pairs dismissed by the user.
+    Returns a DUPLICATE_BILL flag on a match.
+    """
+    user_id = db.query(Project.user_id).filter(Project.id == document.project_id).scalar()
+    bills = canonical_data.get("electricity_bills") or []
+    fingerprint = bill_fingerprint(bills[0]) if bills else None
+    signature = text_signature(ocr_text)
+    keys = index_keys(fingerprint, signature)
+    preview = _extraction_preview(canonical_data)
+    period = (preview.get("period_start"), preview.get("period_end"))
+    
+    # Re-index on reprocessing
+    db.query(DocumentFingerprint).filter(DocumentFingerprint.document_id == document.id).delete()
+    document.text_signature = signature
+    document.duplicate_of_id = None
+    document.duplicate_similarity = None
+    
+    candidates = db.query(
+        Document.id, Document.project_id, Document.original_filename, Document.text_signature,
+        Document.extraction_data, Document.created_at, Document.dismissed_duplicate_ids, DocumentFingerprint.kind
+    ).join(
+        DocumentFingerprint, DocumentFingerprint.document_id == Document.id
+    ).filter(
+        DocumentFingerprint.user_id == user_id,
+        DocumentFingerprint.key.in_([key for _, key in keys]),
+        Document.id != document.id,
+        Document.duplicate_of_id.is_(None)
+    ).all() if keys else []
+    
+    for kind, key in keys:
+        db.add(DocumentFingerprint(document_id=document.id, user_id=user_id, kind=kind, key=key))
+    
+    # (exact, score, candidate) per document; a fingerprint match is exact
+    matches = {}
+    dismissed = set(document.dismissed_duplicate_ids or [])
+    for candidate in candidates:
+        # Pairs the user marked as different bills, in either direction
+        if candidate.id in dismissed or document.id in (candidate.dismissed_duplicate_ids or []):
+            continue
+        if candidate.kind == FINGERPRINT:
+            match = (True, 1.0, candidate)
+        else:
+            score = similarity(signature, candidate.text_signature)
+            if score < NEAR_DUPLICATE_SIMILARITY:
+                continue
+            match = (False, score, candidate)
+        if match[:2] > matches.get(candidate.id, (False, 0.0, None))[:2]:
+            matches[candidate.id] = match
+    
+    # Bill fingerprints of the text matches, to rule out different bills
+    text_match_ids = [candidate_id for candidate_id, (exact, _, _) in matches.items() if not exact]
+    candidate_fingerprints = dict(db.query(DocumentFingerprint.document_id, DocumentFingerprint.key).filter(
+        DocumentFingerprint.document_id.in_(text_match_ids),
+        DocumentFingerprint.kind == FINGERPRINT
+    ).all()) if text_match_ids else {}
+    
+    for candidate_id in text_match_ids:
+        candidate = matches[candidate_id][2]
+        candidate_fingerprint = candidate_fingerprints.get(candidate_id)
+        candidate_preview = candidate.extraction_data or {}
+        candidate_period = (candidate_preview.get("period_start"), candidate_preview.get("period_end"))
+        if fingerprint and candidate_fingerprint and fingerprint != candidate_fingerprint:
+            del matches[candidate_id]
+        elif all(period) and all(candidate_period) and period != candidate_period:
+            del matches[candidate_id]
+    
+    if not matches:
+        return None
+    
+    # Prefer a fingerprint match, then the same project, then the strongest
+    # match, then the first upload
+    exact, score, original = max(
+        matches.values(),
+        key=lambda m: (m[0], m[2].project_id == document.project_id, m[1], -m[2].created_at.timestamp())
+    )
+    same_project = original.project_id == document.project_id
+    if exact:
+        document.duplicate_of_id = original.id
+        document.duplicate_similarity = score
+    print(f"[PROCESS] {'Duplicate' if exact else 'Possible duplicate'} of {original.id} (similarity {score:.2f})")
+    
+    if not exact:
+        message = f"This bill looks like {original.original_filename}" + ("" if same_project else " in another project")
+        suggestion = "Delete it if it is a rescan of the same bill, or dismiss if it is a different bill"
+    elif same_project:
+        message = f"This bill appears to duplicate {original.original_filename}"
+        suggestion = "Delete the copy, or dismiss if it is a different bill"
+    else:
+        message = f"This bill appears to duplicate {original.original_filename} in another project"
+        suggestion = "Check that the bill belongs to both projects"
+    
+    return ValidationFlag(
+        code="DUPLICATE_BILL",
+        category=FlagCategory.DATA_QUALITY,
+        severity=FlagSeverity.WARNING,
+        message=message,
+        suggestion=suggestion,
+        context={
+            "original_document": original.id,
+            "original_project": original.project_id,
+            "match": "fingerprint" if exact else "text",
+            "similarity": round(score, 3),
+            "excluded_from_totals": exact and same_project
+        },
+        document_id=document.id
+    )
+
+
+def _extraction_preview(canonical_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Key fields of a finished extraction for the review preview."""
+    bills = canonical_data.get("electricity_bills") or []
+    if not bills:
+        return {}
+    bill = bills[0]
+    period = bill.get("billing_period") or {}
+    consumption = bill.get("total_consumption") or {}
+    return {
+        "supplier": bill.get("supplier"),
+        "period_start": period.get("start_date"),
+        "period_end": period.get("end_date"),
+        "total_consumption": consumption.get("value"),
+        "total_consumption_unit": consumption.get("unit")
+    }
 
 
 def _document_to_response(document: Document) -> DocumentResponse:
@@ -477,8 +810,13 @@ def _document_to_response(document: Document) -> DocumentResponse:
         language_override=document.language_override,
         ocr_confidence=document.ocr_confidence,
         ocr_processing_time=document.ocr_processing_time,
+        ocr_pages_billed=document.ocr_pages_billed,
+        ocr_cost=document.ocr_cost,
         file_size=document.file_size,
         error_message=document.error_message,
+        extraction_data=document.extraction_data,
+        duplicate_of_id=document.duplicate_of_id,
+        duplicate_similarity=document.duplicate_similarity,
         created_at=document.created_at,
         updated_at=document.updated_at
     )
@@ -1,56 +1,102 @@
 """
 Export API Routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse, FileResponse
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
-from typing import Optional
-import io
+from starlette.background import BackgroundTask
+from typing import Optional, Iterator, Tuple, Union, Dict, List
+from concurrent.futures import Future, as_completed
+import json
+import os
+import re
+import shutil
+import time
+import traceback
 from datetime import datetime
+from pathlib import Path
 import uuid
 
-from ..database import get_db
-from ..models.project import Project, ProjectStatus
+from ..database import get_db, get_db_context
+from ..models.project import Project, ProjectStatus, ReportingPeriod
 from ..models.document import Document, DocumentStatus
 from ..models.extraction import Extraction, ExtractedField
-from ..models.export import ExportRecord, ExportFormat
-from ..models.validation import ValidationFlag
-from ..schemas.export import ExportRequest, ExportResponse
+from ..models.export import ExportRecord, ExportFormat, ExportJob, ExportJobStatus
+from ..models.validation import ValidationFlag, FlagSeverity
+from ..schemas.export import ExportRequest, ExportResponse, ExportJobCreate, ExportJobResponse
 from ..services.export_service import ExportService
+from ..services.export_pool import submit_export
+from ..services.period_analyzer import quarter_bounds
+from ..services.proration import allocate_projects
+from ..services.export_cache import (
+    EXTENSIONS, artifact_path, artifact_writer, cached_artifact, collect_garbage, export_key,
+    pin_artifact, pin_directory, store_stream
+)
+from .projects import get_user_id
 
 router = APIRouter()
 
+# Seconds between progress updates of a running export job
+JOB_PROGRESS_INTERVAL = 1.0
+
+# Names of recorded exports, followed by the project ID prefix
+RECORD_NAMES = {
+    ExportFormat.EXCEL: "osita_report",
+    ExportFormat.XML: "cbam_report",
+    ExportFormat.ZIP: "cbam_package",
+}
+
+MEDIA_TYPES = {
+    ExportFormat.EXCEL: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ExportFormat.XML: "application/xml",
+    ExportFormat.ZIP: "application/zip",
+}
+
 
 @router.post("/project/{project_id}/excel")
-async def export_excel(
+def export_excel(
     project_id: str,
     db: Session = Depends(get_db)
 ):
-    """Generate and download Excel export."""
-    project, canonical_data, validation_flags, evidence_items = _get_export_data(db, project_id)
+    """
+    Generate and download Excel export.
+    The workbook is served from the export cache, or written to it first
+    (evidence rows are streamed from the database) when its inputs changed.
+    """
+    project, canonical_data, validation_flags, _, flag_counts = _get_export_data(db, project_id)
+    project_data = _project_to_dict(project)
     
-    export_service = ExportService()
-    excel_bytes = export_service.generate_excel(
-        project_data=_project_to_dict(project),
-        canonical_data=canonical_data,
-        validation_flags=validation_flags,
-        evidence_items=evidence_items
-    )
+    key = _export_key(ExportFormat.EXCEL, project_data, canonical_data, validation_flags, _evidence_versions(db, project_id))
+    path = cached_artifact(key, ExportFormat.EXCEL.value)
+    background = None
+    if path is None:
+        with artifact_writer(key, ExportFormat.EXCEL.value) as partial:
+            ExportService().write_excel(
+                partial,
+                project_data=project_data,
+                canonical_data=canonical_data,
+                validation_flags=validation_flags,
+                evidence_items=_iter_evidence(db, project_id)
+            )
+        path = artifact_path(key, ExportFormat.EXCEL.value)
+        background = BackgroundTask(collect_garbage)
     
     # Record export
-    _record_export(db, project_id, ExportFormat.EXCEL, f"osita_report_{project_id[:8]}.xlsx")
+    _record_export(db, project_id, ExportFormat.EXCEL, _record_filename(ExportFormat.EXCEL, project_id), flag_counts, key, path)
     
     filename = f"osita_cbam_report_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
     
-    return StreamingResponse(
-        io.BytesIO(excel_bytes),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[ExportFormat.EXCEL],
+        filename=filename,
+        background=background
     )
 
 
 @router.post("/project/{project_id}/xml")
-async def export_xml(
+def export_xml(
     project_id: str,
     as_download: bool = False,
     db: Session = Depends(get_db)
@@ -59,50 +105,52 @@ async def export_xml(
     Generate XML export.
     Returns XML content for copy/paste by default, or as download if as_download=true.
     """
-    project, canonical_data, _, _ = _get_export_data(db, project_id)
+    project, canonical_data, _, _, flag_counts = _get_export_data(db, project_id, include_flags=False)
+    project_data = _project_to_dict(project)
     
-    export_service = ExportService()
-    xml_content = export_service.generate_xml(
-        project_data=_project_to_dict(project),
-        canonical_data=canonical_data
-    )
+    key = _export_key(ExportFormat.XML, project_data, canonical_data)
+    path = cached_artifact(key, ExportFormat.XML.value)
     
     # Record export
-    _record_export(db, project_id, ExportFormat.XML, f"cbam_report_{project_id[:8]}.xml")
+    _record_export(db, project_id, ExportFormat.XML, _record_filename(ExportFormat.XML, project_id), flag_counts, key, path or artifact_path(key, ExportFormat.XML.value))
     
+    headers = {}
     if as_download:
         filename = f"cbam_report_{datetime.now().strftime('%Y%m%d_%H%M')}.xml"
-        return StreamingResponse(
-            io.BytesIO(xml_content.encode("utf-8")),
-            media_type="application/xml",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+    
+    if path is not None:
+        return FileResponse(path, media_type=MEDIA_TYPES[ExportFormat.XML], headers=headers)
     
-    # Return XML for copy/paste
-    return Response(
-        content=xml_content,
-        media_type="application/xml"
+    # Serialized section by section while the response is sent, and cached
+    xml_chunks = ExportService().iter_xml(project_data=project_data, canonical_data=canonical_data)
+    return StreamingResponse(
+        store_stream(key, ExportFormat.XML.value, xml_chunks),
+        media_type=MEDIA_TYPES[ExportFormat.XML],
+        headers=headers,
+        background=BackgroundTask(collect_garbage)
     )
 
 
 @router.post("/project/{project_id}/zip")
-async def export_zip(
+def export_zip(
     project_id: str,
+    include_sources: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Generate ZIP package with XML and Excel."""
-    project, canonical_data, validation_flags, evidence_items = _get_export_data(db, project_id)
+    """
+    Generate ZIP package with XML and Excel.
+    With include_sources=true, the source PDFs and their OCR output are added for audits.
+    """
+    project, canonical_data, validation_flags, _, flag_counts = _get_export_data(db, project_id)
+    project_data = _project_to_dict(project)
     
-    export_service = ExportService()
-    zip_bytes = export_service.generate_zip(
-        project_data=_project_to_dict(project),
-        canonical_data=canonical_data,
-        validation_flags=validation_flags,
-        evidence_items=evidence_items
-    )
+    sources = _source_versions(db, project_id) if include_sources else None
+    key = _export_key(ExportFormat.ZIP, project_data, canonical_data, validation_flags, _evidence_versions(db, project_id), sources)
+    path = cached_artifact(key, ExportFormat.ZIP.value)
     
     # Record export
-    _record_export(db, project_id, ExportFormat.ZIP, f"cbam_package_{project_id[:8]}.zip")
+    _record_export(db, project_id, ExportFormat.ZIP, _record_filename(ExportFormat.ZIP, project_id), flag_counts, key, path or artifact_path(key, ExportFormat.ZIP.value))
     
     # Update project status
     project.status = ProjectStatus.EXPORTED
@@ -110,10 +158,24 @@ async def export_zip(
     
     filename = f"cbam_package_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
     
+    if path is not None:
+        return FileResponse(path, media_type=MEDIA_TYPES[ExportFormat.ZIP], filename=filename)
+    
+    # Compressed and sent entry by entry, and cached; rows are read in their
+    # own session since the request session is closed while the response streams
+    zip_chunks = ExportService().iter_zip(
+        project_data=project_data,
+        canonical_data=canonical_data,
+        validation_flags=validation_flags,
+        evidence_items=_stream_evidence(project_id),
+        attachments=_stream_sources(project_id) if include_sources else ()
+    )
+    
     return StreamingResponse(
-        io.BytesIO(zip_bytes),
-        media_type="application/zip",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        store_stream(key, ExportFormat.ZIP.value, zip_chunks),
+        media_type=MEDIA_TYPES[ExportFormat.ZIP],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(collect_garbage)
     )
 
 
@@ -123,7 +185,7 @@ async def preview_xml(
     db: Session = Depends(get_db)
 ):
     """Preview XML without recording as export."""
-    project, canonical_data, _, _ = _get_export_data(db, project_id, allow_incomplete=True)
+    project, canonical_data, _, _, _ = _get_export_data(db, project_id, allow_incomplete=True, include_flags=False)
     
     export_service = ExportService()
     xml_content = export_service.generate_xml(
@@ -158,14 +220,183 @@ async def get_export_history(
             "filename": e.filename,
             "generated_at": e.generated_at.isoformat(),
             "warnings_count": e.warnings_count,
-            "blocking_flags_count": e.blocking_flags_count
+            "blocking_flags_count": e.blocking_flags_count,
+            "available": bool(e.file_path) and os.path.isfile(e.file_path)
         }
         for e in exports
     ]
 
 
-def _get_export_data(db: Session, project_id: str, allow_incomplete: bool = False):
-    """Get all data needed for export."""
+@router.get("/{export_id}/download")
+async def download_export(
+    export_id: str,
+    db: Session = Depends(get_db)
+):
+    """Download a past export from the export cache."""
+    export = db.query(ExportRecord).filter(ExportRecord.id == export_id).first()
+    if not export:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    
+    path = cached_artifact(export.content_hash, export.format.value) if export.content_hash else None
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export file is no longer stored, generate the export again"
+        )
+    
+    return FileResponse(path, media_type=MEDIA_TYPES[export.format], filename=export.filename)
+
+
+@router.post("/project/{project_id}/jobs", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_export_job(
+    project_id: str,
+    request: ExportJobCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate an export in the background, for large projects.
+    Poll the job for progress; it links to the download when completed.
+    """
+    format = ExportFormat(request.format.value)
+    if format not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {format.value}"
+        )
+    
+    # Fails fast on a missing project or unacknowledged blocking flags
+    _get_export_data(db, project_id, include_flags=False)
+    
+    job = ExportJob(
+        project_id=project_id,
+        format=format,
+        include_sources=request.include_sources and format == ExportFormat.ZIP
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    try:
+        future = submit_export(run_export_job, job.id)
+    except Exception as e:
+        # The job was already committed as queued
+        print(f"[EXPORT] Could not queue export job {job.id}: {str(e)}")
+        job.status = ExportJobStatus.FAILED
+        job.error_message = f"Could not start export: {str(e)}"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Export workers are unavailable, try again later"
+        )
+    future.add_done_callback(lambda f, job_id=job.id: _export_job_done(job_id, f))
+    
+    return _job_to_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(
+    job_id: str,
+    db: Session = Depends(get_db)
+):
+    """Get the status and progress of an export job."""
+    job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    return _job_to_response(job)
+
+
+@router.post("/portfolio")
+def export_portfolio(
+    reporting_period: ReportingPeriod,
+    reporting_year: str,
+    include_sources: bool = False,
+    user_id: str = Depends(get_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Export all of a user's projects for one reporting period as one archive.
+    Project packages are generated concurrently on the export pool and
+    streamed into the archive as each one completes, followed by a
+    consolidated summary workbook. Projects with unacknowledged blocking
+    flags are listed in the summary but not packaged.
+    """
+    projects = db.query(Project).filter(
+        Project.user_id == user_id,
+        Project.reporting_period == reporting_period,
+        Project.reporting_year == reporting_year
+    ).order_by(Project.name, Project.id).all()
+    if not projects:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No projects for {reporting_period.value} {reporting_year}"
+        )
+    
+    flag_counts = _project_flag_counts(db, [p.id for p in projects])
+    
+    # In-quarter consumption of every project in one pass, from the bills
+    # themselves (also right for canonical data stored before proration)
+    quarter = quarter_bounds(reporting_period.value, reporting_year)
+    quarter_mwh = allocate_projects({
+        p.id: ((p.canonical_data or {}).get("electricity_bills") or [], quarter)
+        for p in projects if p.canonical_data
+    })
+    
+    summary_rows = []
+    pending = {}
+    pin_dir = pin_directory()
+    for project in projects:
+        counts = flag_counts[project.id]
+        canonical_data = project.canonical_data or {}
+        row = {
+            "name": project.name,
+            "project_id": project.id,
+            "reporting_period": f"{reporting_period.value} {reporting_year}",
+            "declarant": (project.declarant_info or {}).get("name", ""),
+            "total_electricity_mwh": quarter_mwh.get(project.id),
+            "total_indirect_emissions_tco2": canonical_data.get("total_indirect_emissions_tco2"),
+            "emission_factor_value": project.emission_factor_value,
+            "warnings_count": counts["warnings"],
+            "blocking_flags_count": counts["blocking"]
+        }
+        summary_rows.append(row)
+        if counts["unacknowledged_blocking"]:
+            row["note"] = f"Not exported: {counts['unacknowledged_blocking']} blocking issue(s) must be acknowledged first"
+            continue
+        try:
+            pending[submit_export(build_portfolio_package, project.id, include_sources, pin_dir)] = row
+        except Exception as e:
+            print(f"[EXPORT] Could not queue portfolio package for project {project.id}: {str(e)}")
+            row["note"] = f"Export failed: {str(e)}"
+    
+    print(f"[EXPORT] Portfolio export of {len(pending)} of {len(projects)} projects for {reporting_period.value} {reporting_year}")
+    
+    filename = f"cbam_portfolio_{reporting_period.value}_{reporting_year}_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+    
+    return StreamingResponse(
+        ExportService().iter_portfolio_zip(_portfolio_packages(pending, pin_dir), summary_rows),
+        media_type=MEDIA_TYPES[ExportFormat.ZIP],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(collect_garbage)
+    )
+
+
+def _get_export_data(db: Session, project_id: str, allow_incomplete: bool = False, include_flags: bool = True):
+    """
+    Get all data needed for export, in a fixed number of queries whatever
+    the project size: flag counts are aggregated in SQL, and evidence rows
+    are streamed lazily from one joined query.
+    
+    Returns:
+        (project, canonical data, validation flags, evidence rows, flag counts);
+        validation flags are empty unless include_flags
+    """
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(
@@ -175,55 +406,232 @@ def _get_export_data(db: Session, project_id: str, allow_incomplete: bool = Fals
     
     canonical_data = project.canonical_data or {}
     
-    # Get validation flags
-    flags = db.query(ValidationFlag).filter(
-        ValidationFlag.project_id == project_id
-    ).all()
-    
-    validation_flags = [
-        {
-            "code": f.code,
-            "severity": f.severity.value,
-            "category": f.category.value,
-            "message": f.message,
-            "suggestion": f.suggestion,
-            "is_resolved": f.is_resolved,
-            "is_acknowledged": f.is_acknowledged
-        }
-        for f in flags
-    ]
-    
     # Check for blocking flags
-    blocking_count = sum(1 for f in flags if f.severity.value == "blocking" and not f.is_acknowledged)
+    flag_counts = _flag_counts(db, project_id)
+    blocking_count = flag_counts["unacknowledged_blocking"]
     if blocking_count > 0 and not allow_incomplete:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Cannot export: {blocking_count} blocking issue(s) must be acknowledged first"
         )
     
-    # Get evidence items from fields
-    evidence_items = []
-    documents = db.query(Document).filter(Document.project_id == project_id).all()
-    
-    for doc in documents:
-        extraction = db.query(Extraction).filter(
-            Extraction.document_id == doc.id,
-            Extraction.is_current == True
-        ).first()
+    # Get validation flags
+    validation_flags = []
+    if include_flags:
+        flags = db.query(
+            ValidationFlag.code,
+            ValidationFlag.severity,
+            ValidationFlag.category,
+            ValidationFlag.message,
+            ValidationFlag.suggestion,
+            ValidationFlag.is_resolved,
+            ValidationFlag.is_acknowledged
+        ).filter(
+            ValidationFlag.project_id == project_id
+        ).order_by(ValidationFlag.created_at, ValidationFlag.id).all()
         
-        if extraction:
-            for field in extraction.fields:
-                evidence_items.append({
-                    "field_name": field.field_name,
-                    "value": field.value,
-                    "document_id": doc.id,
-                    "document_name": doc.original_filename,
-                    "source_page": field.source_page,
-                    "source_quote": field.source_quote,
-                    "confidence": field.confidence
-                })
+        validation_flags = [
+            {
+                "code": f.code,
+                "severity": f.severity.value,
+                "category": f.category.value,
+                "message": f.message,
+                "suggestion": f.suggestion,
+                "is_resolved": f.is_resolved,
+                "is_acknowledged": f.is_acknowledged
+            }
+            for f in flags
+        ]
+    
+    # Evidence items are read lazily, only by exports that include them
+    evidence_items = _iter_evidence(db, project_id)
     
-    return project, canonical_data, validation_flags, evidence_items
+    return project, canonical_data, validation_flags, evidence_items, flag_counts
+
+
+def _flag_counts(db: Session, project_id: str) -> dict:
+    """Warning, blocking and unacknowledged blocking flag counts, from one aggregate query."""
+    return _project_flag_counts(db, [project_id])[project_id]
+
+
+def _project_flag_counts(db: Session, project_ids: List[str]) -> Dict[str, dict]:
+    """_flag_counts of several projects, from one aggregate query."""
+    rows = db.query(
+        ValidationFlag.project_id,
+        ValidationFlag.severity,
+        ValidationFlag.is_acknowledged,
+        func.count(ValidationFlag.id)
+    ).filter(
+        ValidationFlag.project_id.in_(project_ids)
+    ).group_by(ValidationFlag.project_id, ValidationFlag.severity, ValidationFlag.is_acknowledged).all()
+    
+    counts = {pid: {"warnings": 0, "blocking": 0, "unacknowledged_blocking": 0} for pid in project_ids}
+    for project_id, severity, acknowledged, count in rows:
+        if severity == FlagSeverity.WARNING:
+            counts[project_id]["warnings"] += count
+        elif severity == FlagSeverity.BLOCKING:
+            counts[project_id]["blocking"] += count
+            if not acknowledged:
+                counts[project_id]["unacknowledged_blocking"] += count
+    return counts
+
+
+def _evidence_query(db: Session, project_id: str):
+    """Current extracted fields of a project, joined to their documents."""
+    return db.query(ExtractedField).join(
+        Extraction, Extraction.id == ExtractedField.extraction_id
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).filter(
+        Document.project_id == project_id,
+        Extraction.is_current == True
+    )
+
+
+def _iter_evidence(db: Session, project_id: str, batch_size: int = 1000) -> Iterator[dict]:
+    """
+    Evidence of all current extracted fields in a project, streamed in
+    keyset pages. Each page is fetched whole, so no read stays open while
+    rows are written out and SQLite writers are not locked out meanwhile.
+    """
+    order = (Document.created_at, Document.id, ExtractedField.created_at, ExtractedField.id)
+    query = _evidence_query(db, project_id).with_entities(
+        ExtractedField.field_name,
+        ExtractedField.value,
+        ExtractedField.source_page,
+        ExtractedField.source_quote,
+        ExtractedField.confidence,
+        Document.id.label("document_id"),
+        Document.original_filename,
+        *order
+    ).order_by(*order)
+    
+    after = None
+    while True:
+        page = query if after is None else query.filter(tuple_(*order) > tuple_(*after))
+        rows = page.limit(batch_size).all()
+        for row in rows:
+            yield {
+                "field_name": row.field_name,
+                "value": row.value,
+                "document_id": row.document_id,
+                "document_name": row.original_filename,
+                "source_page": row.source_page,
+                "source_quote": row.source_quote,
+                "confidence": row.confidence
+            }
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+        after = (last[-4], last[-3], last[-2], last[-1])
+
+
+def _export_key(
+    format: ExportFormat,
+    project_data: dict,
+    canonical_data: dict,
+    validation_flags: Optional[list] = None,
+    evidence: Optional[list] = None,
+    sources: Optional[list] = None
+) -> str:
+    """Export cache key of everything an export is rendered from."""
+    inputs = {
+        # Status is not rendered, and exporting a package changes it
+        "project": {k: v for k, v in project_data.items() if k != "status"},
+        "canonical": canonical_data,
+        "flags": validation_flags,
+        "evidence": evidence,
+        "sources": sources
+    }
+    return export_key(format.value, ExportService.SCHEMA_VERSION, inputs)
+
+
+def _evidence_versions(db: Session, project_id: str) -> list:
+    """
+    Identity and last change of each current extraction's fields, for keys
+    of exports including evidence. One aggregate query, so a cache hit
+    doesn't read the evidence rows themselves.
+    """
+    rows = db.query(
+        Extraction.id,
+        Document.original_filename,
+        func.count(ExtractedField.id),
+        func.max(ExtractedField.updated_at)
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).outerjoin(
+        ExtractedField, ExtractedField.extraction_id == Extraction.id
+    ).filter(
+        Document.project_id == project_id,
+        Extraction.is_current == True
+    ).group_by(Extraction.id, Document.original_filename).order_by(Extraction.id).all()
+    return [
+        [extraction_id, filename, count, updated_at.isoformat() if updated_at else None]
+        for extraction_id, filename, count, updated_at in rows
+    ]
+
+
+def _source_versions(db: Session, project_id: str) -> list:
+    """Identity and last change of each document, for keys of packages including sources."""
+    rows = db.query(Document.id, Document.file_size, Document.updated_at).filter(
+        Document.project_id == project_id
+    ).order_by(Document.id).all()
+    return [[row.id, row.file_size, row.updated_at.isoformat() if row.updated_at else None] for row in rows]
+
+
+def _stream_evidence(project_id: str) -> Iterator[dict]:
+    """_iter_evidence in a session of its own, for streamed responses."""
+    with get_db_context() as db:
+        yield from _iter_evidence(db, project_id)
+
+
+def _stream_sources(project_id: str) -> Iterator[Tuple[str, Union[str, bytes]]]:
+    """Source PDF and OCR output of each document, as ZIP package attachments."""
+    with get_db_context() as db:
+        documents = db.query(
+            Document.id,
+            Document.original_filename,
+            Document.file_path,
+            Document.ocr_output_path,
+            Document.ocr_raw_output
+        ).filter(
+            Document.project_id == project_id
+        ).order_by(Document.created_at, Document.id).yield_per(50)
+        
+        for doc in documents:
+            # Prefixed with the document ID, as filenames repeat across uploads
+            name = f"{doc.id[:8]}_{os.path.basename(doc.original_filename)}"
+            yield f"sources/{name}", doc.file_path
+            if doc.ocr_output_path:
+                yield f"ocr/{os.path.splitext(name)[0]}.json", doc.ocr_output_path
+            elif doc.ocr_raw_output:
+                yield f"ocr/{os.path.splitext(name)[0]}.json", json.dumps(doc.ocr_raw_output, indent=2).encode("utf-8")
+
+
+def _portfolio_packages(pending: Dict[Future, dict], pin_dir: str) -> Iterator[Tuple[str, str]]:
+    """
+    Package files of a portfolio export in the order their workers finish,
+    recording each outcome in its summary row. Packages are pinned links in
+    pin_dir, removed once copied.
+    """
+    try:
+        for future in as_completed(pending):
+            row = pending[future]
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"[EXPORT] Portfolio package for project {row['project_id']} failed: {str(e)}")
+                row["note"] = f"Export failed: {str(e)}"
+                continue
+            name = re.sub(r"[^\w.-]+", "_", row["name"]).strip("_") or "project"
+            row["package"] = f"projects/{name}_{row['project_id'][:8]}.zip"
+            yield row["package"], path
+            os.remove(path)
+    finally:
+        # Download abandoned: don't start packages nobody will receive
+        for future in pending:
+            future.cancel()
+        shutil.rmtree(pin_dir, ignore_errors=True)
 
 
 def _project_to_dict(project: Project) -> dict:
@@ -242,26 +650,194 @@ def _project_to_dict(project: Project) -> dict:
     }
 
 
-def _record_export(db: Session, project_id: str, format: ExportFormat, filename: str):
-    """Record an export in the database."""
-    # Count flags
-    flags = db.query(ValidationFlag).filter(
-        ValidationFlag.project_id == project_id
-    ).all()
-    
-    warnings = sum(1 for f in flags if f.severity.value == "warning")
-    blocking = sum(1 for f in flags if f.severity.value == "blocking")
-    
+def _record_export(
+    db: Session,
+    project_id: str,
+    format: ExportFormat,
+    filename: str,
+    flag_counts: dict,
+    content_hash: Optional[str] = None,
+    file_path: Optional[Path] = None
+):
+    """Record an export in the database, with the flag counts it was generated with."""
     export_record = ExportRecord(
         id=str(uuid.uuid4()),
         project_id=project_id,
         format=format,
         filename=filename,
-        file_path="",  # Not stored on disk
-        warnings_count=str(warnings),
-        blocking_flags_count=str(blocking)
+        file_path=str(file_path) if file_path else "",
+        content_hash=content_hash,
+        schema_version=ExportService.SCHEMA_VERSION,
+        warnings_count=str(flag_counts["warnings"]),
+        blocking_flags_count=str(flag_counts["blocking"])
     )
     
     db.add(export_record)
     db.commit()
+    return export_record
+
+
+def _record_filename(format: ExportFormat, project_id: str) -> str:
+    return f"{RECORD_NAMES[format]}_{project_id[:8]}.{EXTENSIONS[format.value]}"
+
+
+def _job_to_response(job: ExportJob) -> ExportJobResponse:
+    response = ExportJobResponse.model_validate(job)
+    if job.export_id:
+        response.download_url = f"/api/exports/{job.export_id}/download"
+    return response
+
+
+def _count_evidence(db: Session, project_id: str) -> int:
+    return _evidence_query(db, project_id).count()
+
+
+def _write_export(
+    path: str,
+    format: ExportFormat,
+    project_data: dict,
+    canonical_data: dict,
+    validation_flags: list,
+    evidence_items: Iterator[dict],
+    attachments: Iterator[Tuple[str, Union[str, bytes]]] = ()
+) -> None:
+    """Write an export file of any format."""
+    export_service = ExportService()
+    if format == ExportFormat.EXCEL:
+        export_service.write_excel(path, project_data, canonical_data, validation_flags, evidence_items)
+        return
+    if format == ExportFormat.XML:
+        chunks = export_service.iter_xml(project_data, canonical_data)
+    else:
+        chunks = export_service.iter_zip(project_data, canonical_data, validation_flags, evidence_items, attachments)
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def _track_progress(db: Session, job: ExportJob, rows: Iterator[dict], total: int) -> Iterator[dict]:
+    """Pass evidence rows through, saving the share written as the job's progress."""
+    last_update = time.monotonic()
+    for done, row in enumerate(rows, 1):
+        yield row
+        if time.monotonic() - last_update >= JOB_PROGRESS_INTERVAL:
+            # Completion is only reported once the file is stored
+            job.progress = min(round(done / max(total, 1) * 100, 1), 99.0)
+            db.commit()
+            last_update = time.monotonic()
+
+
+def _build_export(
+    db: Session,
+    project_id: str,
+    format: ExportFormat,
+    include_sources: bool = False,
+    job: Optional[ExportJob] = None
+) -> ExportRecord:
+    """
+    Generate a project's export into the export cache, unless it is
+    already there, and record it. Reports progress to job when given.
+    """
+    project, canonical_data, validation_flags, _, flag_counts = _get_export_data(
+        db, project_id, allow_incomplete=True, include_flags=format != ExportFormat.XML
+    )
+    project_data = _project_to_dict(project)
+    
+    # Same keys as the synchronous endpoints, so both share cached files
+    if format == ExportFormat.XML:
+        key = _export_key(format, project_data, canonical_data)
+    else:
+        sources = _source_versions(db, project.id) if include_sources else None
+        key = _export_key(format, project_data, canonical_data, validation_flags, _evidence_versions(db, project.id), sources)
+    
+    path = cached_artifact(key, format.value)
+    if path is None:
+        evidence = _iter_evidence(db, project.id)
+        if job is not None:
+            evidence = _track_progress(db, job, evidence, _count_evidence(db, project.id))
+        with artifact_writer(key, format.value) as partial:
+            _write_export(
+                partial,
+                format,
+                project_data,
+                canonical_data,
+                validation_flags,
+                evidence,
+                _stream_sources(project.id) if include_sources else ()
+            )
+        path = artifact_path(key, format.value)
+    
+    export_record = _record_export(db, project.id, format, _record_filename(format, project.id), flag_counts, key, path)
+    
+    if format == ExportFormat.ZIP:
+        project.status = ProjectStatus.EXPORTED
+    return export_record
+
+
+def build_portfolio_package(project_id: str, include_sources: bool, pin_dir: str) -> str:
+    """
+    Export pool task generating one project's ZIP package for a
+    portfolio export. Returns a link to the package pinned in pin_dir, so
+    garbage collection can't evict it before it is copied.
+    """
+    print(f"[EXPORT] Building portfolio package for project {project_id}")
+    with get_db_context() as db:
+        # Regenerated if evicted between being written and being pinned
+        for _ in range(2):
+            pinned = pin_artifact(_build_export(db, project_id, ExportFormat.ZIP, include_sources).file_path, pin_dir)
+            if pinned:
+                return pinned
+    raise RuntimeError("Package was evicted from the export cache before it could be added")
+
+
+def run_export_job(job_id: str) -> None:
+    """
+    Export pool task generating a job's export into the export cache.
+    Runs in a worker process, with its own database session.
+    """
+    print(f"[EXPORT] Starting export job {job_id}")
+    
+    with get_db_context() as db:
+        job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+        if not job:
+            print(f"[EXPORT] Export job not found: {job_id}")
+            return
+        
+        job.status = ExportJobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        db.commit()
+        
+        try:
+            export_record = _build_export(db, job.project_id, job.format, job.include_sources, job)
+            
+            job.export_id = export_record.id
+            job.status = ExportJobStatus.COMPLETED
+            job.progress = 100.0
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            print(f"[EXPORT] Export job {job_id} complete")
+            
+        except Exception as e:
+            print(f"[EXPORT] Export job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+            db.rollback()
+            job.status = ExportJobStatus.FAILED
+            job.error_message = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    
+    collect_garbage()
+
 
+def _export_job_done(job_id: str, future) -> None:
+    """Mark a job failed when its worker died or it was cancelled before running."""
+    if not future.cancelled() and future.exception() is None:
+        return
+    reason = "Export was cancelled" if future.cancelled() else f"Export worker failed: {future.exception()}"
+    with get_db_context() as db:
+        job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+        if job and job.status in (ExportJobStatus.QUEUED, ExportJobStatus.RUNNING):
+            job.status = ExportJobStatus.FAILED
+            job.error_message = reason
+            job.finished_at = datetime.utcnow()
+            print(f"[EXPORT] Export job {job_id} failed: {reason}")
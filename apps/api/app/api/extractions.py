@@ -8,6 +8,12 @@ from typing import List, Optional
 from ..database import get_db
 from ..models.document import Document
 from ..models.extraction import Extraction, ExtractedField, FieldStatus
+from ..services.evidence_locator import EvidenceLocator
+from ..services.validation_service import bump_fields_version
+from .documents import update_project_canonical
+from ..services.unit_normalizer import (
+    parse_number, to_mwh, normalize_many, format_normalized, DEFAULT_UNIT, MACHINE_LANGUAGE
+)
 from ..schemas.extraction import (
     ExtractionResponse,
     ExtractedFieldResponse,
@@ -128,6 +134,7 @@ async def update_field(
     if field_update.edit_reason:
         field.edit_reason = field_update.edit_reason
     
+    _fields_changed(db, field.extraction_id)
     db.commit()
     db.refresh(field)
     
@@ -152,6 +159,7 @@ async def confirm_field(
         )
     
     field.status = FieldStatus.CONFIRMED
+    _fields_changed(db, field.extraction_id)
     db.commit()
     db.refresh(field)
     
@@ -180,50 +188,167 @@ async def confirm_all_fields(
         ExtractedField.status == FieldStatus.UNCONFIRMED
     ).update({"status": FieldStatus.CONFIRMED})
     
+    if updated:
+        _fields_changed(db, extraction.id)
     db.commit()
     
     return {"confirmed_count": updated}
 
 
+@router.post("/project/{project_id}/locate-evidence")
+async def locate_project_evidence(
+    project_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Resolve evidence quotes of all current extractions in a project to
+    OCR page offsets (fills source_bbox, e.g. for extractions made before
+    evidence was located at processing time).
+    """
+    rows = db.query(ExtractedField, Document.id, Document.ocr_raw_output).join(
+        Extraction, Extraction.id == ExtractedField.extraction_id
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).filter(
+        Document.project_id == project_id,
+        Extraction.is_current == True,
+        ExtractedField.source_quote.isnot(None)
+    ).all()
+    
+    locators = {}
+    located = 0
+    for field, document_id, ocr_output in rows:
+        if document_id not in locators:
+            locators[document_id] = EvidenceLocator.from_ocr_output(ocr_output)
+        span = locators[document_id].locate(field.source_quote, field.source_page)
+        if span:
+            field.source_page = span.page
+            field.source_bbox = span.to_dict()
+            located += 1
+    
+    db.commit()
+    
+    return {"field_count": len(rows), "located_count": located}
+
+
+def _fields_changed(db: Session, extraction_id: str):
+    """Bump the fields version of the project an extraction belongs to."""
+    project_id = db.query(Document.project_id).join(
+        Extraction, Extraction.document_id == Document.id
+    ).filter(Extraction.id == extraction_id).scalar()
+    if project_id:
+        bump_fields_version(db, project_id)
+
+
 def _recalculate_extraction_canonical(db: Session, extraction_id: str):
     """Recalculate canonical data from fields after edit."""
     extraction = db.query(Extraction).filter(Extraction.id == extraction_id).first()
     if not extraction:
         return
     
-    fields = db.query(ExtractedField).filter(
+    rows = db.query(ExtractedField, Document.language_override, Document.detected_language).join(
+        Extraction, Extraction.id == ExtractedField.extraction_id
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).filter(
         ExtractedField.extraction_id == extraction_id
     ).all()
     
-    # Rebuild canonical data from fields
-    canonical = extraction.canonical_data or {}
-    
-    for field in fields:
-        if field.field_name == "total_consumption" and field.value:
-            try:
-                value = float(field.value.replace(",", ""))
-                unit = field.unit or "kWh"
-                
-                # Normalize to MWh
-                if unit.lower() == "kwh":
-                    normalized_mwh = value / 1000
-                elif unit.lower() == "mwh":
-                    normalized_mwh = value
-                else:
-                    normalized_mwh = value / 1000
-                
-                if "electricity_bills" in canonical and canonical["electricity_bills"]:
-                    canonical["electricity_bills"][0]["total_consumption"] = {
-                        "value": value,
-                        "unit": unit,
-                        "normalized_mwh": normalized_mwh
-                    }
-                canonical["total_electricity_mwh"] = normalized_mwh
-            except ValueError:
-                pass
+    fields = [(field, _value_language(field, override or detected)) for field, override, detected in rows]
+    _normalize_fields(fields)
     
-    extraction.canonical_data = canonical
+    for field, language in fields:
+        if field.field_name == "total_consumption":
+            _apply_total_consumption(extraction, field, language)
+    
+    # Project totals are aggregated from the extractions' canonical data
+    project_id = db.query(Document.project_id).filter(Document.id == extraction.document_id).scalar()
+    if project_id:
+        update_project_canonical(db, project_id)
+    
+    db.commit()
+
+
+@router.post("/project/{project_id}/normalize")
+async def normalize_project_fields(
+    project_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute normalized values (MWh) of all current fields in a project,
+    and the consumption totals derived from them (per extraction and for
+    the project), in a single pass.
+    """
+    rows = db.query(
+        ExtractedField, Extraction, Document.language_override, Document.detected_language
+    ).join(
+        Extraction, Extraction.id == ExtractedField.extraction_id
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).filter(
+        Document.project_id == project_id,
+        Extraction.is_current == True
+    ).all()
+    
+    fields = [(field, _value_language(field, override or detected)) for field, _, override, detected in rows]
+    _normalize_fields(fields)
+    
+    for (field, language), (_, extraction, _, _) in zip(fields, rows):
+        if field.field_name == "total_consumption":
+            _apply_total_consumption(extraction, field, language)
+    
+    update_project_canonical(db, project_id)
     db.commit()
+    
+    return {
+        "field_count": len(rows),
+        "normalized_count": sum(1 for field, _ in fields if field.normalized_value is not None)
+    }
+
+
+def _value_language(field: ExtractedField, document_language) -> Optional[str]:
+    """
+    Locale to read a field value in: model output is machine-formatted,
+    values typed by a reviewer follow the document's language.
+    """
+    if field.status in (FieldStatus.CORRECTED, FieldStatus.MANUAL) and document_language:
+        return document_language.value
+    return MACHINE_LANGUAGE
+
+
+def _normalize_fields(fields: List[tuple]) -> None:
+    """Fill normalized_value/normalized_unit of (field, language) pairs in one pass."""
+    normalized = normalize_many([(field.value, field.unit, language) for field, language in fields])
+    for (field, _), result in zip(fields, normalized):
+        field.normalized_value = format_normalized(result[0]) if result else None
+        field.normalized_unit = result[1] if result else None
+
+
+def _apply_total_consumption(extraction: Extraction, field: ExtractedField, language: Optional[str]):
+    """Write a total_consumption field's value into the extraction's canonical data."""
+    value = parse_number(field.value, language)
+    if value is None:
+        return
+    unit = field.unit or DEFAULT_UNIT
+    normalized_mwh = to_mwh(value, unit)
+    if normalized_mwh is None:
+        # Unrecognized unit (flagged by validation): assume kWh
+        normalized_mwh = to_mwh(value, DEFAULT_UNIT)
+    
+    canonical = dict(extraction.canonical_data or {})
+    if canonical.get("electricity_bills"):
+        bills = list(canonical["electricity_bills"])
+        bills[0] = {
+            **bills[0],
+            "total_consumption": {
+                "value": value,
+                "unit": unit,
+                "normalized_mwh": normalized_mwh
+            }
+        }
+        canonical["electricity_bills"] = bills
+    canonical["total_electricity_mwh"] = normalized_mwh
+    extraction.canonical_data = canonical
 
 
 def _extraction_to_response(extraction: Extraction) -> ExtractionResponse:
@@ -236,7 +361,15 @@ def _extraction_to_response(extraction: Extraction) -> ExtractionResponse:
         version=extraction.version,
         is_current=extraction.is_current,
         model_name=extraction.model_name,
+        prompt_version=extraction.prompt_version,
+        route=extraction.route,
+        escalation_reason=extraction.escalation_reason,
         processing_time=extraction.processing_time,
+        llm_calls=extraction.llm_calls or 0,
+        prompt_tokens=extraction.prompt_tokens or 0,
+        cached_tokens=extraction.cached_tokens or 0,
+        completion_tokens=extraction.completion_tokens or 0,
+        estimated_cost=extraction.estimated_cost,
         canonical_data=extraction.canonical_data,
         fields=fields,
         created_at=extraction.created_at
@@ -254,9 +387,12 @@ def _field_to_response(field: ExtractedField) -> ExtractedFieldResponse:
         normalized_value=field.normalized_value,
         normalized_unit=field.normalized_unit,
         confidence=field.confidence,
+        model_confidence=field.model_confidence,
+        confidence_checks=field.confidence_checks,
         status=field.status,
         source_page=field.source_page,
         source_quote=field.source_quote,
+        source_bbox=field.source_bbox,
         original_value=field.original_value,
         edit_reason=field.edit_reason,
         created_at=field.created_at,
@@ -8,6 +8,9 @@ import json
 
 from ..database import get_db
 from ..models.project import Project, ProjectStatus
+from ..models.document import Document
+from ..models.extraction import Extraction, ExtractedField
+from ..models.validation import ValidationFlag, FlagSeverity
 from ..schemas.project import (
     ProjectCreate,
     ProjectUpdate,
@@ -15,7 +18,9 @@ from ..schemas.project import (
     ProjectListResponse,
     DocumentSummary
 )
-from ..services.validation_service import ValidationService
+from ..schemas.validation import ValidationSummary, ValidationFlagResponse, FlagAcknowledge
+from ..services.validation_service import ValidationService, get_validation_cache
+from ..services.flag_store import save_flags, SOURCE_PROJECT
 
 router = APIRouter()
 
@@ -181,7 +186,7 @@ async def validate_project(
             detail="Project not found"
         )
     
-    validation_service = ValidationService()
+    validation_service = ValidationService(cache=get_validation_cache())
     
     # Prepare project settings
     project_settings = {
@@ -194,9 +199,18 @@ async def validate_project(
     # Run validation
     result = validation_service.validate_project(
         canonical_data=project.canonical_data or {},
-        project_settings=project_settings
+        project_settings=project_settings,
+        load_fields=lambda: _current_fields(db, project_id),
+        stored_digests=project.canonical_digests,
+        project_id=project_id,
+        fields_version=project.fields_version
     )
     
+    # Persist project-level flags (replacing those of the previous run);
+    # a run served entirely from cache found what is already stored
+    if not result.all_cached:
+        save_flags(db, project_id, result.flags, SOURCE_PROJECT)
+    
     # Update project status based on validation
     if result.blocking_count == 0:
         project.status = ProjectStatus.EXPORT_READY
@@ -208,6 +222,109 @@ async def validate_project(
     return result.to_dict()
 
 
+@router.get("/{project_id}/flags", response_model=ValidationSummary)
+async def get_project_flags(
+    project_id: str,
+    user_id: str = Depends(get_user_id),
+    db: Session = Depends(get_db)
+):
+    """Stored validation flags of a project (document and project level)."""
+    project = db.query(Project).filter(
+        Project.id == project_id,
+        Project.user_id == user_id
+    ).first()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    flags = db.query(ValidationFlag).filter(ValidationFlag.project_id == project_id).all()
+    
+    def count(severity: FlagSeverity) -> int:
+        return sum(1 for f in flags if f.severity == severity)
+    
+    return ValidationSummary(
+        total_flags=len(flags),
+        blocking_count=count(FlagSeverity.BLOCKING),
+        warning_count=count(FlagSeverity.WARNING),
+        info_count=count(FlagSeverity.INFO),
+        resolved_count=sum(1 for f in flags if f.is_resolved),
+        acknowledged_count=sum(1 for f in flags if f.is_acknowledged),
+        can_export=not any(
+            f.severity == FlagSeverity.BLOCKING and not (f.is_acknowledged or f.is_resolved) for f in flags
+        ),
+        flags=[ValidationFlagResponse.model_validate(f) for f in flags]
+    )
+
+
+@router.put("/{project_id}/flags/{flag_id}", response_model=ValidationFlagResponse)
+async def update_project_flag(
+    project_id: str,
+    flag_id: str,
+    update: FlagAcknowledge,
+    user_id: str = Depends(get_user_id),
+    db: Session = Depends(get_db)
+):
+    """Acknowledge or resolve a flag; kept while validation keeps raising the issue."""
+    flag = db.query(ValidationFlag).join(
+        Project, Project.id == ValidationFlag.project_id
+    ).filter(
+        ValidationFlag.id == flag_id,
+        ValidationFlag.project_id == project_id,
+        Project.user_id == user_id
+    ).first()
+    
+    if not flag:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Flag not found"
+        )
+    
+    flag.is_acknowledged = update.acknowledge
+    flag.is_resolved = update.resolve
+    if update.resolution_note is not None:
+        flag.resolution_note = update.resolution_note
+    flag.resolved_by = user_id if (update.acknowledge or update.resolve) else None
+    
+    db.commit()
+    db.refresh(flag)
+    
+    return ValidationFlagResponse.model_validate(flag)
+
+
+def _current_fields(db: Session, project_id: str) -> List[dict]:
+    """Confidence data of all current extracted fields in a project, in one query."""
+    rows = db.query(
+        Extraction.document_id,
+        ExtractedField.field_name,
+        ExtractedField.value,
+        ExtractedField.confidence,
+        ExtractedField.confidence_checks,
+        ExtractedField.status
+    ).join(
+        Extraction, Extraction.id == ExtractedField.extraction_id
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).filter(
+        Document.project_id == project_id,
+        Extraction.is_current == True
+    ).all()
+    
+    return [
+        {
+            "document_id": r.document_id,
+            "field_name": r.field_name,
+            "value": r.value,
+            "confidence": r.confidence,
+            "confidence_checks": r.confidence_checks,
+            "status": r.status.value
+        }
+        for r in rows
+    ]
+
+
 def _project_to_response(project: Project) -> ProjectResponse:
     """Convert project model to response schema."""
     documents = []
@@ -0,0 +1,336 @@
+"""
+Usage API Routes
+Token, page and cost dashboards per document, project and user.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional
+
+from ..database import get_db
+from ..models.document import Document
+from ..models.extraction import Extraction, ExtractedField, FieldStatus
+from ..models.project import Project
+from .projects import get_user_id
+
+router = APIRouter()
+
+
+@router.get("/dashboard")
+async def get_usage_dashboard(
+    limit: int = 10,
+    user_id: str = Depends(get_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Cost and latency dashboard for the current user.
+    Returns user totals, a per-project breakdown and the documents and
+    suppliers that dominate spend.
+    """
+    documents = _document_usage(db, user_id)
+
+    return {
+        "totals": _user_usage(db, user_id),
+        "projects": _project_usage(db, user_id),
+        "top_documents": documents[:limit],
+        "top_suppliers": _supplier_usage(documents)[:limit]
+    }
+
+
+@router.get("/project/{project_id}")
+async def get_project_usage(
+    project_id: str,
+    user_id: str = Depends(get_user_id),
+    db: Session = Depends(get_db)
+):
+    """Cost and latency for a project, broken down per document."""
+    project = db.query(Project).filter(
+        Project.id == project_id,
+        Project.user_id == user_id
+    ).first()
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    projects = _project_usage(db, user_id, project_id)
+    documents = _document_usage(db, user_id, project_id)
+
+    return {
+        "totals": projects[0] if projects else None,
+        "documents": documents,
+        "suppliers": _supplier_usage(documents)
+    }
+
+
+@router.get("/prompts")
+async def get_prompt_usage(
+    user_id: str = Depends(get_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Prompt-cache effectiveness per prompt version for the current user.
+    Compare cached-token ratio, cost and latency across prompt layouts.
+    """
+    rows = db.query(
+        Extraction.prompt_version,
+        Extraction.model_name,
+        func.count(Extraction.id).label("extraction_runs"),
+        func.coalesce(func.sum(Extraction.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(Extraction.cached_tokens), 0).label("cached_tokens"),
+        func.coalesce(func.sum(Extraction.completion_tokens), 0).label("completion_tokens"),
+        func.coalesce(func.sum(Extraction.estimated_cost), 0.0).label("llm_cost"),
+        func.avg(Extraction.processing_time).label("avg_extraction_time")
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).join(
+        Project, Project.id == Document.project_id
+    ).filter(
+        Project.user_id == user_id
+    ).group_by(Extraction.prompt_version, Extraction.model_name).all()
+
+    return [
+        {
+            "prompt_version": r.prompt_version,
+            "model_name": r.model_name,
+            "extraction_runs": r.extraction_runs,
+            "prompt_tokens": r.prompt_tokens,
+            "cached_tokens": r.cached_tokens,
+            "completion_tokens": r.completion_tokens,
+            "cached_token_ratio": r.cached_tokens / r.prompt_tokens if r.prompt_tokens else 0.0,
+            "llm_cost": r.llm_cost,
+            "avg_cost_per_run": r.llm_cost / r.extraction_runs if r.extraction_runs else 0.0,
+            "avg_extraction_time": r.avg_extraction_time or 0.0
+        }
+        for r in rows
+    ]
+
+
+@router.get("/routes")
+async def get_route_usage(
+    user_id: str = Depends(get_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Cost, latency and reviewed accuracy per model route (fast, large, escalated).
+    Accuracy is the share of reviewed fields confirmed without correction.
+    """
+    reviews = db.query(
+        ExtractedField.extraction_id.label("extraction_id"),
+        func.sum(case((ExtractedField.status == FieldStatus.CONFIRMED, 1), else_=0)).label("confirmed"),
+        func.sum(case((ExtractedField.status == FieldStatus.CORRECTED, 1), else_=0)).label("corrected")
+    ).group_by(ExtractedField.extraction_id).subquery()
+
+    rows = db.query(
+        Extraction.route,
+        func.count(Extraction.id).label("extraction_runs"),
+        func.coalesce(func.sum(Extraction.estimated_cost), 0.0).label("llm_cost"),
+        func.avg(Extraction.processing_time).label("avg_extraction_time"),
+        func.coalesce(func.sum(reviews.c.confirmed), 0).label("confirmed_fields"),
+        func.coalesce(func.sum(reviews.c.corrected), 0).label("corrected_fields")
+    ).join(
+        Document, Document.id == Extraction.document_id
+    ).join(
+        Project, Project.id == Document.project_id
+    ).outerjoin(
+        reviews, reviews.c.extraction_id == Extraction.id
+    ).filter(
+        Project.user_id == user_id
+    ).group_by(Extraction.route).all()
+
+    result = []
+    for r in rows:
+        reviewed = r.confirmed_fields + r.corrected_fields
+        result.append({
+            "route": r.route or "unrouted",
+            "extraction_runs": r.extraction_runs,
+            "llm_cost": r.llm_cost,
+            "avg_cost_per_run": r.llm_cost / r.extraction_runs if r.extraction_runs else 0.0,
+            "avg_extraction_time": r.avg_extraction_time or 0.0,
+            "confirmed_fields": r.confirmed_fields,
+            "corrected_fields": r.corrected_fields,
+            "accuracy": r.confirmed_fields / reviewed if reviewed else None
+        })
+    return result
+
+
+def _extraction_usage_subquery(db: Session):
+    """Extraction usage summed per document (all versions, including reprocessing)."""
+    return db.query(
+        Extraction.document_id.label("document_id"),
+        func.count(Extraction.id).label("extraction_runs"),
+        func.coalesce(func.sum(Extraction.llm_calls), 0).label("llm_calls"),
+        func.coalesce(func.sum(Extraction.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(Extraction.cached_tokens), 0).label("cached_tokens"),
+        func.coalesce(func.sum(Extraction.completion_tokens), 0).label("completion_tokens"),
+        func.coalesce(func.sum(Extraction.estimated_cost), 0.0).label("llm_cost"),
+        func.coalesce(func.sum(Extraction.processing_time), 0.0).label("extraction_time")
+    ).group_by(Extraction.document_id).subquery()
+
+
+def _aggregate_columns(ext) -> list:
+    """Aggregate usage columns over documents joined to the extraction subquery."""
+    return [
+        func.count(Document.id).label("document_count"),
+        func.coalesce(func.sum(Document.ocr_pages_billed), 0).label("ocr_pages"),
+        func.coalesce(func.sum(Document.ocr_cost), 0.0).label("ocr_cost"),
+        func.coalesce(func.sum(Document.ocr_processing_time), 0.0).label("ocr_time"),
+        func.coalesce(func.sum(ext.c.extraction_runs), 0).label("extraction_runs"),
+        func.coalesce(func.sum(ext.c.llm_calls), 0).label("llm_calls"),
+        func.coalesce(func.sum(ext.c.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(ext.c.cached_tokens), 0).label("cached_tokens"),
+        func.coalesce(func.sum(ext.c.completion_tokens), 0).label("completion_tokens"),
+        func.coalesce(func.sum(ext.c.llm_cost), 0.0).label("llm_cost"),
+        func.coalesce(func.sum(ext.c.extraction_time), 0.0).label("extraction_time")
+    ]
+
+
+def _user_usage(db: Session, user_id: str) -> Dict[str, Any]:
+    """Usage totals across all of a user's projects."""
+    ext = _extraction_usage_subquery(db)
+    row = db.query(*_aggregate_columns(ext)).select_from(Project).join(
+        Document, Document.project_id == Project.id
+    ).outerjoin(
+        ext, ext.c.document_id == Document.id
+    ).filter(Project.user_id == user_id).one()
+
+    return _usage_row_to_dict(row)
+
+
+def _project_usage(db: Session, user_id: str, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Usage totals per project, most expensive first."""
+    ext = _extraction_usage_subquery(db)
+    query = db.query(
+        Project.id.label("project_id"),
+        Project.name.label("project_name"),
+        *_aggregate_columns(ext)
+    ).outerjoin(
+        Document, Document.project_id == Project.id
+    ).outerjoin(
+        ext, ext.c.document_id == Document.id
+    ).filter(Project.user_id == user_id)
+
+    if project_id:
+        query = query.filter(Project.id == project_id)
+
+    rows = query.group_by(Project.id, Project.name).all()
+
+    result = [
+        {"project_id": r.project_id, "project_name": r.project_name, **_usage_row_to_dict(r)}
+        for r in rows
+    ]
+    result.sort(key=lambda r: r["total_cost"], reverse=True)
+    return result
+
+
+def _document_usage(db: Session, user_id: str, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Usage per document, most expensive first."""
+    ext = _extraction_usage_subquery(db)
+    total_cost = (Document.ocr_cost + func.coalesce(ext.c.llm_cost, 0.0)).label("total_cost")
+
+    query = db.query(
+        Document.id,
+        Document.project_id,
+        Document.original_filename,
+        Document.page_count,
+        Document.ocr_pages_billed,
+        Document.ocr_cost,
+        Document.ocr_processing_time,
+        Document.extraction_data,
+        ext.c.extraction_runs,
+        ext.c.llm_calls,
+        ext.c.prompt_tokens,
+        ext.c.cached_tokens,
+        ext.c.completion_tokens,
+        ext.c.llm_cost,
+        ext.c.extraction_time,
+        total_cost
+    ).join(
+        Project, Project.id == Document.project_id
+    ).outerjoin(
+        ext, ext.c.document_id == Document.id
+    ).filter(Project.user_id == user_id)
+
+    if project_id:
+        query = query.filter(Document.project_id == project_id)
+
+    rows = query.order_by(total_cost.desc()).all()
+
+    return [
+        {
+            "document_id": r.id,
+            "project_id": r.project_id,
+            "filename": r.original_filename,
+            "supplier": (r.extraction_data or {}).get("supplier"),
+            "page_count": r.page_count,
+            "ocr_pages": r.ocr_pages_billed or 0,
+            "ocr_cost": r.ocr_cost or 0.0,
+            "ocr_time": r.ocr_processing_time or 0.0,
+            "extraction_runs": r.extraction_runs or 0,
+            "llm_calls": r.llm_calls or 0,
+            "prompt_tokens": r.prompt_tokens or 0,
+            "cached_tokens": r.cached_tokens or 0,
+            "completion_tokens": r.completion_tokens or 0,
+            "llm_cost": r.llm_cost or 0.0,
+            "extraction_time": r.extraction_time or 0.0,
+            "total_cost": r.total_cost or 0.0
+        }
+        for r in rows
+    ]
+
+
+def _supplier_usage(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Roll per-document usage up by extracted supplier, most expensive first."""
+    suppliers: Dict[str, Dict[str, Any]] = {}
+
+    for doc in documents:
+        name = doc["supplier"] or "Unknown"
+        entry = suppliers.setdefault(name, {
+            "supplier": name,
+            "document_count": 0,
+            "ocr_pages": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_cost": 0.0,
+            "total_time": 0.0
+        })
+        entry["document_count"] += 1
+        entry["ocr_pages"] += doc["ocr_pages"]
+        entry["prompt_tokens"] += doc["prompt_tokens"]
+        entry["completion_tokens"] += doc["completion_tokens"]
+        entry["total_cost"] += doc["total_cost"]
+        entry["total_time"] += doc["ocr_time"] + doc["extraction_time"]
+
+    result = list(suppliers.values())
+    for entry in result:
+        entry["avg_cost_per_document"] = entry["total_cost"] / entry["document_count"]
+        entry["avg_time_per_document"] = entry["total_time"] / entry["document_count"]
+    result.sort(key=lambda e: e["total_cost"], reverse=True)
+    return result
+
+
+def _usage_row_to_dict(row) -> Dict[str, Any]:
+    """Convert an aggregate usage row to a response dict with derived metrics."""
+    prompt_tokens = row.prompt_tokens or 0
+    document_count = row.document_count or 0
+    ocr_cost = row.ocr_cost or 0.0
+    llm_cost = row.llm_cost or 0.0
+
+    return {
+        "document_count": document_count,
+        "ocr_pages": row.ocr_pages or 0,
+        "extraction_runs": row.extraction_runs or 0,
+        "llm_calls": row.llm_calls or 0,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": row.cached_tokens or 0,
+        "completion_tokens": row.completion_tokens or 0,
+        "cached_token_ratio": (row.cached_tokens or 0) / prompt_tokens if prompt_tokens else 0.0,
+        "ocr_cost": ocr_cost,
+        "llm_cost": llm_cost,
+        "total_cost": ocr_cost + llm_cost,
+        "avg_cost_per_document": (ocr_cost + llm_cost) / document_count if document_count else 0.0,
+        "avg_ocr_time": (row.ocr_time or 0.0) / document_count if document_count else 0.0,
+        "avg_extraction_time": (row.extraction_time or 0.0) / row.extraction_runs if row.extraction_runs else 0.0
+    }
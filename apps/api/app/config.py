@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     # API Keys
     openai_api_key: str = Field(default="", description="OpenAI API Key for structured extraction")
     openai_finetuned_model: str = Field(default="", description="Fine-tuned model ID (optional)")
+    openai_fast_model: str = Field(default="gpt-4o-mini", description="Fast, cheap model for simple documents")
     mistral_api_key: str = Field(default="", description="Mistral AI API Key for OCR processing")
     
     # Application Settings
@@ -21,6 +22,7 @@ class Settings(BaseSettings):
     database_url: str = Field(default="sqlite:///./osita.db", description="Database connection URL")
     upload_dir: str = Field(default="./uploads", description="Directory for uploaded files")
     max_upload_size_mb: int = Field(default=50, description="Maximum upload size in MB")
+    export_dir: str = Field(default="./exports", description="Directory for cached export files")
     
     # Debug
     debug: bool = Field(default=False, description="Enable debug mode")
@@ -34,9 +36,35 @@ class Settings(BaseSettings):
     # Processing Settings
     ocr_timeout_seconds: int = Field(default=120, description="Timeout for OCR processing")
     extraction_timeout_seconds: int = Field(default=60, description="Timeout for extraction")
+    extraction_few_shot_examples: int = Field(default=5, description="Few-shot examples in the extraction prompt prefix")
+    extraction_examples_path: str = Field(default="", description="JSONL file of few-shot examples (defaults to app/data/extraction_examples.jsonl)")
+    
+    # Model Routing
+    routing_enabled: bool = Field(default=True, description="Route simple documents to the fast model")
+    routing_max_fast_pages: int = Field(default=2, description="Max pages for the fast model")
+    routing_max_fast_chars: int = Field(default=8000, description="Max OCR characters for the fast model")
+    routing_max_fast_table_rows: int = Field(default=12, description="Max OCR table rows (meters/line items) for the fast model")
+    routing_min_confidence: float = Field(default=0.7, description="Escalate when a key field's confidence is below this")
+    
+    # Extraction Batching
+    batch_enabled: bool = Field(default=True, description="Pack small documents into shared extraction requests")
+    batch_max_document_tokens: int = Field(default=1500, description="Largest document (estimated OCR tokens) eligible for batching")
+    batch_max_tokens: int = Field(default=6000, description="Estimated OCR token budget per packed request")
+    batch_max_documents: int = Field(default=6, description="Max documents per packed request")
+    batch_wait_ms: int = Field(default=250, description="How long to wait for more documents before sending a batch")
+    
+    # Cost Accounting
+    ocr_cost_per_page: float = Field(default=0.001, description="Estimated OCR cost per page (USD)")
     
     # Validation Settings
     totals_tolerance_percent: float = Field(default=1.0, description="Tolerance for totals reconciliation (%)")
+    low_confidence_threshold: float = Field(default=0.6, description="Flag unreviewed fields below this evidence-checked confidence")
+    validation_cache_size: int = Field(default=4096, description="Rule results kept in the validation cache")
+    
+    # Export Cache
+    export_cache_max_mb: int = Field(default=1024, description="Disk space for cached exports; least recently used are removed beyond it")
+    export_cache_max_age_days: int = Field(default=30, description="Cached exports unused for this long are removed")
+    export_workers: int = Field(default=2, description="Processes generating background export jobs")
     
     class Config:
         env_file = ".env"
@@ -50,6 +78,13 @@ class Settings(BaseSettings):
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    @property
+    def export_path(self) -> Path:
+        """Get the export cache directory as a Path object."""
+        path = Path(self.export_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
     @property
     def cors_origins_list(self) -> list[str]:
         """Get CORS origins as a list."""
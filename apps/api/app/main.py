@@ -10,6 +10,9 @@ import os
 from .config import get_settings
 from .database import init_db
 from .api import api_router
+from .services.export_cache import collect_garbage
+from .services.export_pool import shutdown_export_executor
+from .services.prompt_builder import load_examples, configured_examples_path
 
 settings = get_settings()
 
@@ -23,10 +26,17 @@ async def lifespan(app: FastAPI):
     # Create upload directory
     os.makedirs(settings.upload_dir, exist_ok=True)
     
+    # Apply export cache retention
+    collect_garbage()
+    
+    # Load the few-shot examples now, so a missing file is reported at startup
+    if settings.extraction_few_shot_examples > 0:
+        print(f"[STARTUP] Loaded {len(load_examples(configured_examples_path()))} few-shot examples")
+    
     yield
     
     # Shutdown
-    pass
+    shutdown_export_executor()
 
 
 app = FastAPI(
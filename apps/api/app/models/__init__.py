@@ -4,18 +4,20 @@ SQLAlchemy ORM models for the application.
 """
 from .base import Base
 from .project import Project
-from .document import Document
+from .document import Document, DocumentFingerprint
 from .extraction import Extraction, ExtractedField
 from .validation import ValidationFlag
-from .export import ExportRecord
+from .export import ExportRecord, ExportJob
 
 __all__ = [
     "Base",
     "Project", 
     "Document",
+    "DocumentFingerprint",
     "Extraction",
     "ExtractedField",
     "ValidationFlag",
-    "ExportRecord"
+    "ExportRecord",
+    "ExportJob"
 ]
 
@@ -2,7 +2,7 @@
 Document Model
 Represents an uploaded PDF document.
 """
-from sqlalchemy import Column, String, Text, Enum, Integer, Float, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, Enum, Integer, Float, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -25,6 +25,18 @@ class DocumentLanguage(str, enum.Enum):
     """Detected document language."""
     ENGLISH = "en"
     FRENCH = "fr"
+    GERMAN = "de"
+    SPANISH = "es"
+    ITALIAN = "it"
+    DUTCH = "nl"
+    PORTUGUESE = "pt"
+    POLISH = "pl"
+    SWEDISH = "sv"
+    DANISH = "da"
+    CZECH = "cs"
+    ROMANIAN = "ro"
+    GREEK = "el"
+    BULGARIAN = "bg"
     ARABIC = "ar"
     UNKNOWN = "unknown"
 
@@ -36,7 +48,7 @@ class Document(Base, TimestampMixin):
     __tablename__ = "documents"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    project_id = Column(String(36), ForeignKey("projects.id"), nullable=False)
+    project_id = Column(String(36), ForeignKey("projects.id"), nullable=False, index=True)
     
     # File Information
     filename = Column(String(255), nullable=False)
@@ -54,21 +66,54 @@ class Document(Base, TimestampMixin):
     ocr_confidence = Column(Float, nullable=True)
     ocr_processing_time = Column(Float, nullable=True)  # seconds
     
+    # OCR Cost Accounting (cumulative across reprocessing)
+    ocr_pages_billed = Column(Integer, default=0, nullable=False)
+    ocr_cost = Column(Float, default=0.0, nullable=False)  # USD
+    
     # OCR Output Storage
     ocr_output_path = Column(String(512), nullable=True)  # Path to OCR JSON
     ocr_raw_output = Column(JSON, nullable=True)  # Store directly for small docs
     
+    # Key extracted fields for review (filled incrementally while extraction streams)
+    extraction_data = Column(JSON, nullable=True)
+    
     # Error Tracking
     error_message = Column(Text, nullable=True)
     
     # User Override
     language_override = Column(Enum(DocumentLanguage), nullable=True)
     
+    # Duplicate Detection
+    text_signature = Column(JSON, nullable=True)  # MinHash of OCR text shingles
+    duplicate_of_id = Column(String(36), ForeignKey("documents.id"), nullable=True)
+    duplicate_similarity = Column(Float, nullable=True)  # 1.0 for a fingerprint match
+    dismissed_duplicate_ids = Column(JSON, nullable=True)  # Documents the user confirmed to be different bills
+    
     # Relationships
     project = relationship("Project", back_populates="documents")
     extractions = relationship("Extraction", back_populates="document", cascade="all, delete-orphan")
     validation_flags = relationship("ValidationFlag", back_populates="document", cascade="all, delete-orphan")
+    fingerprints = relationship("DocumentFingerprint", back_populates="document", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Document(id={self.id}, filename={self.filename}, status={self.status})>"
 
+
+class DocumentFingerprint(Base):
+    """
+    Duplicate-detection index entry: a document's bill fingerprint or one
+    of its OCR text band keys, scoped to the owning user.
+    """
+    __tablename__ = "document_fingerprints"
+    __table_args__ = (Index("ix_document_fingerprints_user_key", "user_id", "key"),)
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    document_id = Column(String(36), ForeignKey("documents.id"), nullable=False, index=True)
+    user_id = Column(String(36), nullable=False)
+    kind = Column(String(20), nullable=False)  # fingerprint | text_band
+    key = Column(String(64), nullable=False)
+
+    document = relationship("Document", back_populates="fingerprints")
+
+    def __repr__(self):
+        return f"<DocumentFingerprint(document_id={self.document_id}, kind={self.kind})>"
@@ -2,7 +2,7 @@
 Export Record Model
 Tracks exports generated from projects.
 """
-from sqlalchemy import Column, String, Text, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, Enum, ForeignKey, DateTime, Float, Boolean
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -18,6 +18,14 @@ class ExportFormat(str, enum.Enum):
     JSON = "json"
 
 
+class ExportJobStatus(str, enum.Enum):
+    """Status of an export job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class ExportRecord(Base, TimestampMixin):
     """
     Record of an export operation.
@@ -30,7 +38,8 @@ class ExportRecord(Base, TimestampMixin):
     # Export details
     format = Column(Enum(ExportFormat), nullable=False)
     filename = Column(String(255), nullable=False)
-    file_path = Column(String(512), nullable=False)
+    file_path = Column(String(512), nullable=False)  # Cached artifact; removed by export cache GC
+    content_hash = Column(String(64), nullable=True, index=True)  # Export cache key
     
     # Metadata
     generated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -50,3 +59,34 @@ class ExportRecord(Base, TimestampMixin):
     def __repr__(self):
         return f"<ExportRecord(id={self.id}, format={self.format}, filename={self.filename})>"
 
+
+
+class ExportJob(Base, TimestampMixin):
+    """
+    An export generated in the background, for projects too large to
+    export within a request.
+    """
+    __tablename__ = "export_jobs"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    project_id = Column(String(36), ForeignKey("projects.id"), nullable=False, index=True)
+    
+    # Requested export
+    format = Column(Enum(ExportFormat), nullable=False)
+    include_sources = Column(Boolean, default=False, nullable=False)
+    
+    # Progress
+    status = Column(Enum(ExportJobStatus), default=ExportJobStatus.QUEUED, nullable=False)
+    progress = Column(Float, default=0.0, nullable=False)  # Percent
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    error_message = Column(Text, nullable=True)
+    
+    # Result
+    export_id = Column(String(36), ForeignKey("export_records.id"), nullable=True)
+    
+    # Relationships
+    project = relationship("Project", back_populates="export_jobs")
+
+    def __repr__(self):
+        return f"<ExportJob(id={self.id}, format={self.format}, status={self.status})>"
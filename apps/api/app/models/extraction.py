@@ -42,7 +42,7 @@ class Extraction(Base, TimestampMixin):
     __tablename__ = "extractions"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    document_id = Column(String(36), ForeignKey("documents.id"), nullable=False)
+    document_id = Column(String(36), ForeignKey("documents.id"), nullable=False, index=True)
     
     # Version tracking
     version = Column(Integer, default=1, nullable=False)
@@ -51,10 +51,22 @@ class Extraction(Base, TimestampMixin):
     # Model metadata
     model_name = Column(String(100), nullable=True)
     model_version = Column(String(50), nullable=True)
+    prompt_version = Column(String(50), nullable=True)
+    
+    # Model routing ("fast", "large" or "escalated")
+    route = Column(String(20), nullable=True)
+    escalation_reason = Column(Text, nullable=True)
     
     # Processing info
     processing_time = Column(Float, nullable=True)  # seconds
     
+    # Token and cost accounting (summed over all LLM calls of this run)
+    llm_calls = Column(Integer, default=0, nullable=False)
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    cached_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    estimated_cost = Column(Float, nullable=True)  # USD, None if model price unknown
+    
     # Raw extraction output
     raw_output = Column(JSON, nullable=True)
     
@@ -76,7 +88,7 @@ class ExtractedField(Base, TimestampMixin):
     __tablename__ = "extracted_fields"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    extraction_id = Column(String(36), ForeignKey("extractions.id"), nullable=False)
+    extraction_id = Column(String(36), ForeignKey("extractions.id"), nullable=False, index=True)
     
     # Field identification
     field_name = Column(String(100), nullable=False)
@@ -89,7 +101,9 @@ class ExtractedField(Base, TimestampMixin):
     normalized_unit = Column(String(50), nullable=True)
     
     # Confidence and status
-    confidence = Column(Float, nullable=True)  # 0.0 to 1.0
+    confidence = Column(Float, nullable=True)  # 0.0 to 1.0, computed from evidence checks
+    model_confidence = Column(Float, nullable=True)  # As self-reported by the model
+    confidence_checks = Column(JSON, nullable=True)  # Individual evidence check results
     status = Column(Enum(FieldStatus), default=FieldStatus.UNCONFIRMED, nullable=False)
     
     # Evidence / Citation
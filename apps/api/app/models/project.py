@@ -2,7 +2,7 @@
 Project Model
 Represents a CBAM filing project.
 """
-from sqlalchemy import Column, String, Text, Enum, DateTime, JSON
+from sqlalchemy import Column, String, Text, Enum, DateTime, JSON, Integer
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -55,10 +55,13 @@ class Project(Base, TimestampMixin):
     
     # Canonical extracted data (aggregated from all documents)
     canonical_data = Column(JSON, nullable=True)
+    canonical_digests = Column(JSON, nullable=True)  # Content hash per top-level key, for validation caching
+    fields_version = Column(Integer, default=0, nullable=False)  # Bumped whenever extracted fields change, for validation caching
     
     # Relationships
     documents = relationship("Document", back_populates="project", cascade="all, delete-orphan")
     exports = relationship("ExportRecord", back_populates="project", cascade="all, delete-orphan")
+    export_jobs = relationship("ExportJob", back_populates="project", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Project(id={self.id}, name={self.name}, status={self.status})>"
@@ -2,7 +2,7 @@
 Validation Models
 Represents validation flags and checks.
 """
-from sqlalchemy import Column, String, Text, Enum, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, String, Text, Enum, ForeignKey, JSON, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum
 
@@ -30,13 +30,20 @@ class FlagCategory(str, enum.Enum):
 class ValidationFlag(Base, TimestampMixin):
     """
     A validation flag raised during processing.
+    Only live issues are stored: each validation run upserts its flags by
+    flag_key and deletes those it no longer raises (see flag_store).
     """
     __tablename__ = "validation_flags"
+    __table_args__ = (UniqueConstraint("project_id", "flag_key", name="uq_validation_flags_project_key"),)
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    project_id = Column(String(36), ForeignKey("projects.id"), nullable=True)
+    project_id = Column(String(36), ForeignKey("projects.id"), nullable=True, index=True)
     document_id = Column(String(36), ForeignKey("documents.id"), nullable=True)
     
+    # Identity across validation runs
+    source = Column(String(20), nullable=True)  # document | project (which run raised it)
+    flag_key = Column(String(64), nullable=True)
+    
     # Flag identification
     code = Column(String(50), nullable=False)
     category = Column(Enum(FlagCategory), nullable=False)
@@ -76,6 +83,7 @@ VALIDATION_CODES = {
     # Totals mismatch
     "TOTAL_LINE_MISMATCH": ("Sum of line items doesn't match total", FlagCategory.TOTALS_MISMATCH, FlagSeverity.WARNING),
     "TOTAL_METER_MISMATCH": ("Sum of meters doesn't match site total", FlagCategory.TOTALS_MISMATCH, FlagSeverity.WARNING),
+    "METER_CONSUMPTION_MISMATCH": ("Consumption doesn't match meter reading difference", FlagCategory.TOTALS_MISMATCH, FlagSeverity.WARNING),
     
     # Missing required
     "MISSING_PERIOD": ("Missing billing period", FlagCategory.MISSING_REQUIRED, FlagSeverity.BLOCKING),
@@ -87,9 +95,12 @@ VALIDATION_CODES = {
     "LOW_CONFIDENCE": ("Low extraction confidence", FlagCategory.EXTRACTION_CONFIDENCE, FlagSeverity.INFO),
     "OCR_QUALITY": ("OCR quality issues detected", FlagCategory.DATA_QUALITY, FlagSeverity.WARNING),
     "INCOMPLETE_EXTRACTION": ("Some fields could not be extracted", FlagCategory.DATA_QUALITY, FlagSeverity.WARNING),
+    "DUPLICATE_BILL": ("Bill already uploaded", FlagCategory.DATA_QUALITY, FlagSeverity.WARNING),
     
     # Period issues
     "PERIOD_OVERLAP": ("Overlapping billing periods detected", FlagCategory.PERIOD_OVERLAP, FlagSeverity.WARNING),
     "PERIOD_GAP": ("Gap in billing periods", FlagCategory.PERIOD_OVERLAP, FlagSeverity.INFO),
+    "METER_READING_GAP": ("Meter readings don't continue from previous bill", FlagCategory.PERIOD_OVERLAP, FlagSeverity.WARNING),
+    "METER_READING_OVERLAP": ("Meter readings overlap previous bill", FlagCategory.PERIOD_OVERLAP, FlagSeverity.WARNING),
 }
 
@@ -32,6 +32,8 @@ from .validation import (
 from .export import (
     ExportRequest,
     ExportResponse,
+    ExportJobCreate,
+    ExportJobResponse,
     ExcelExportData,
     XMLExportData,
 )
@@ -64,6 +66,8 @@ __all__ = [
     # Export
     "ExportRequest",
     "ExportResponse",
+    "ExportJobCreate",
+    "ExportJobResponse",
     "ExcelExportData",
     "XMLExportData",
 ]
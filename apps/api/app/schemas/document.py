@@ -2,7 +2,7 @@
 Document Schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -21,6 +21,18 @@ class DocumentStatus(str, Enum):
 class DocumentLanguage(str, Enum):
     ENGLISH = "en"
     FRENCH = "fr"
+    GERMAN = "de"
+    SPANISH = "es"
+    ITALIAN = "it"
+    DUTCH = "nl"
+    PORTUGUESE = "pt"
+    POLISH = "pl"
+    SWEDISH = "sv"
+    DANISH = "da"
+    CZECH = "cs"
+    ROMANIAN = "ro"
+    GREEK = "el"
+    BULGARIAN = "bg"
     ARABIC = "ar"
     UNKNOWN = "unknown"
 
@@ -50,8 +62,13 @@ class DocumentResponse(BaseModel):
     language_override: Optional[DocumentLanguage]
     ocr_confidence: Optional[float]
     ocr_processing_time: Optional[float]
+    ocr_pages_billed: Optional[int] = None
+    ocr_cost: Optional[float] = None
     file_size: Optional[int]
     error_message: Optional[str]
+    extraction_data: Optional[Dict[str, Any]] = None
+    duplicate_of_id: Optional[str] = None
+    duplicate_similarity: Optional[float] = None
     created_at: datetime
     updated_at: datetime
     
@@ -36,6 +36,38 @@ class ExportResponse(BaseModel):
         from_attributes = True
 
 
+class ExportJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ExportJobCreate(BaseModel):
+    """Request to generate an export in the background."""
+    format: ExportFormat
+    include_sources: bool = False  # ZIP only: add source PDFs and OCR output
+
+
+class ExportJobResponse(BaseModel):
+    """Status of a background export."""
+    id: str
+    project_id: str
+    format: ExportFormat
+    include_sources: bool
+    status: ExportJobStatus
+    progress: float
+    error_message: Optional[str] = None
+    export_id: Optional[str] = None
+    download_url: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 class ExcelExportData(BaseModel):
     """Data structure for Excel export."""
     # Summary sheet
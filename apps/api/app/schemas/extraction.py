@@ -49,9 +49,12 @@ class ExtractedFieldResponse(BaseModel):
     normalized_value: Optional[str]
     normalized_unit: Optional[str]
     confidence: Optional[float]
+    model_confidence: Optional[float] = None
+    confidence_checks: Optional[Dict[str, float]] = None
     status: FieldStatus
     source_page: Optional[int]
     source_quote: Optional[str]
+    source_bbox: Optional[Dict[str, Any]] = None
     original_value: Optional[str]
     edit_reason: Optional[str]
     created_at: datetime
@@ -160,7 +163,15 @@ class ExtractionResponse(BaseModel):
     version: int
     is_current: bool
     model_name: Optional[str]
+    prompt_version: Optional[str] = None
+    route: Optional[str] = None
+    escalation_reason: Optional[str] = None
     processing_time: Optional[float]
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    estimated_cost: Optional[float] = None
     canonical_data: Optional[Dict[str, Any]]
     fields: List[ExtractedFieldResponse] = []
     created_at: datetime
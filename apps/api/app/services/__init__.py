@@ -6,11 +6,17 @@ from .ocr_service import OCRService
 from .extraction_service import ExtractionService
 from .validation_service import ValidationService
 from .export_service import ExportService
+from .usage_service import UsageService
+from .model_router import ModelRouter
+from .extraction_batcher import ExtractionBatcher
 
 __all__ = [
     "OCRService",
     "ExtractionService", 
     "ValidationService",
     "ExportService",
+    "UsageService",
+    "ModelRouter",
+    "ExtractionBatcher",
 ]
 
@@ -0,0 +1,226 @@
+"""
+Confidence Scorer
+Computes field confidence by checking each extracted value against the OCR
+text it cites, instead of trusting the model's self-reported confidence.
+"""
+import re
+from typing import Optional, Dict, Any, List, Set
+
+from .evidence_locator import EvidenceLocator, EvidenceSpan
+
+
+# Weight of each check in the computed confidence
+CHECK_WEIGHTS = {
+    "quote_found": 0.4,
+    "value_in_quote": 0.4,
+    "unit_consistent": 0.2,
+}
+
+# Quote found, but on a different page than the model cited
+PAGE_MISMATCH_FACTOR = 0.75
+
+# Highest confidence of a value its own quote contradicts (value not in the
+# quote, or the quote states another unit): below the default
+# low_confidence_threshold, however well the quote itself was located
+CONTRADICTED_CONFIDENCE = 0.3
+
+# Share of value tokens that must appear in the quote for text values
+MIN_TEXT_OVERLAP = 0.6
+
+# Unit spellings as they appear in bills (normalized to lowercase words)
+UNIT_ALIASES = {
+    "kwh": {"kwh", "kw h"},
+    "mwh": {"mwh", "mw h"},
+    "gwh": {"gwh", "gw h"},
+    "tj": {"tj"},
+    "gj": {"gj"},
+    "eur": {"eur", "euro", "euros", "€"},
+    "usd": {"usd", "$"},
+    "gbp": {"gbp", "£"},
+}
+
+NUMBER_PATTERN = re.compile(r"\d(?:[\d\s.,'’]*\d)?")
+DATE_VALUE_PATTERN = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+NUMBER_PART_SPLIT = re.compile(r"[\s.,'’]+")
+WORD_PATTERN = re.compile(r"[^\W_]+|[€$£]")
+
+
+def _number_readings(token: str) -> Set[float]:
+    """
+    Possible values of a number as printed in a bill, e.g. "1.250,5",
+    "1,250.5", "1 250", "1'250". Ambiguous separators yield both readings.
+    """
+    token = re.sub(r"[\s'’]", "", token)
+    readings: Set[str] = set()
+
+    if "," in token and "." in token:
+        decimal = "," if token.rfind(",") > token.rfind(".") else "."
+        thousands = "." if decimal == "," else ","
+        readings.add(token.replace(thousands, "").replace(decimal, "."))
+    elif "," in token or "." in token:
+        sep = "," if "," in token else "."
+        parts = token.split(sep)
+        if len(parts) > 2 or all(len(p) == 3 for p in parts[1:]):
+            readings.add(token.replace(sep, ""))
+        if len(parts) == 2:
+            readings.add(token.replace(sep, "."))
+    else:
+        readings.add(token)
+
+    values = set()
+    for reading in readings:
+        try:
+            values.add(float(reading))
+        except ValueError:
+            continue
+    return values
+
+
+def _numbers_in(text: str) -> Set[float]:
+    """
+    All numeric readings of the numbers in a text. The separated parts are
+    read on their own too, since "31.01.2024" or "MTR 001 500" are not
+    single numbers.
+    """
+    values: Set[float] = set()
+    for match in NUMBER_PATTERN.finditer(text):
+        values |= _number_readings(match.group())
+        values |= {float(part) for part in NUMBER_PART_SPLIT.split(match.group()) if part}
+    return values
+
+
+def _words(text: str) -> List[str]:
+    return [w.lower() for w in WORD_PATTERN.findall(text)]
+
+
+class ConfidenceScorer:
+    """
+    Scores extracted fields against their evidence.
+
+    For each field three checks are made, each in [0, 1]:
+    - quote_found: the quote occurs in the OCR text on the cited page
+    - value_in_quote: the extracted value (number, date or text) is in the quote
+    - unit_consistent: the quote names the field's unit and no other
+    The confidence is their weighted mean; checks that don't apply (no unit)
+    are left out. A value or unit the quote contradicts is capped at
+    CONTRADICTED_CONFIDENCE, and an uncited value scores 0.
+    """
+
+    def __init__(self, locator: EvidenceLocator):
+        self.locator = locator
+
+    def score_fields(self, fields: List[Dict[str, Any]]) -> None:
+        """
+        Score extracted field dicts in place.
+        Sets confidence (computed), model_confidence (self-reported),
+        confidence_checks, and source_bbox/source_page from the located quote.
+        """
+        for field in fields:
+            quote = field.get("source_quote")
+            span = self.locator.locate(quote, field.get("source_page")) if quote else None
+            if quote:
+                checks = self.checks(field.get("value"), field.get("unit"), quote, field.get("source_page"), span)
+            else:
+                checks = {"quote_found": 0.0, "value_in_quote": 0.0}
+            confidence = self.combine(checks)
+
+            field["model_confidence"] = field.get("confidence")
+            field["confidence"] = confidence
+            field["confidence_checks"] = checks
+            if span:
+                field["source_page"] = span.page
+                field["source_bbox"] = span.to_dict()
+
+    def checks(
+        self,
+        value: Optional[str],
+        unit: Optional[str],
+        quote: Optional[str],
+        cited_page: Optional[int],
+        span: Optional[EvidenceSpan]
+    ) -> Dict[str, float]:
+        """Individual check results for a field with a cited quote."""
+        quote_found = 0.0
+        if span:
+            quote_found = span.score
+            if cited_page is not None and span.page != cited_page:
+                quote_found *= PAGE_MISMATCH_FACTOR
+
+        checks = {
+            "quote_found": round(quote_found, 3),
+            "value_in_quote": round(self._value_in_quote(value, quote), 3)
+        }
+        unit_check = self._unit_consistent(unit, quote)
+        if unit_check is not None:
+            checks["unit_consistent"] = unit_check
+        return checks
+
+    @staticmethod
+    def combine(checks: Dict[str, float]) -> float:
+        """Weighted mean of the checks that apply, capped when the quote contradicts the value."""
+        total_weight = sum(CHECK_WEIGHTS[name] for name in checks)
+        if not total_weight:
+            return 0.0
+        confidence = round(sum(CHECK_WEIGHTS[name] * result for name, result in checks.items()) / total_weight, 3)
+        if checks.get("quote_found") and (checks.get("value_in_quote") == 0.0 or checks.get("unit_consistent") == 0.0):
+            confidence = min(confidence, CONTRADICTED_CONFIDENCE)
+        return confidence
+
+    def _value_in_quote(self, value: Optional[str], quote: str) -> float:
+        """How well the quote supports the extracted value."""
+        if value is None or value == "":
+            return 0.0
+
+        date_match = DATE_VALUE_PATTERN.match(value)
+        if date_match:
+            year, _, day = (int(g) for g in date_match.groups())
+            numbers = _numbers_in(quote)
+            if year not in numbers and year % 100 not in numbers:
+                return 0.0
+            # Month may be spelled out in any language; the day must be there
+            return 1.0 if day in numbers else 0.5
+
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+
+        if number is not None:
+            tolerance = max(abs(number) * 1e-6, 1e-9)
+            return 1.0 if any(abs(n - number) <= tolerance for n in _numbers_in(quote)) else 0.0
+
+        value_words = _words(value)
+        if not value_words:
+            return 0.0
+        quote_words = set(_words(quote))
+        overlap = sum(1 for w in value_words if w in quote_words) / len(value_words)
+        return overlap if overlap >= MIN_TEXT_OVERLAP else 0.0
+
+    @staticmethod
+    def _unit_consistent(unit: Optional[str], quote: str) -> Optional[float]:
+        """
+        1.0 if the quote states the field's unit, 0.0 if it states a different
+        unit of the same kind, 0.5 if it states none; None for unitless fields.
+        """
+        if not unit:
+            return None
+        expected = unit.strip().lower()
+        if expected not in UNIT_ALIASES:
+            return None
+
+        quote_text = " ".join(_words(quote))
+        quote_words = set(quote_text.split())
+
+        def mentions(key: str) -> bool:
+            return any(
+                alias in quote_words if " " not in alias else alias in quote_text
+                for alias in UNIT_ALIASES[key]
+            )
+
+        if mentions(expected):
+            return 1.0
+        energy = {"kwh", "mwh", "gwh", "tj", "gj"}
+        kind = energy if expected in energy else set(UNIT_ALIASES) - energy
+        if any(mentions(other) for other in kind if other != expected):
+            return 0.0
+        return 0.5
@@ -0,0 +1,97 @@
+"""
+Duplicate Detector
+Index keys for spotting the same bill uploaded twice: an exact fingerprint
+of its key fields, and MinHash band keys of its OCR text for rescans.
+"""
+import hashlib
+import re
+from typing import Optional, Dict, Any, List, Tuple
+
+from .period_analyzer import bill_period
+
+
+# Words per shingle of OCR text
+SHINGLE_SIZE = 5
+
+# MinHash signature length, split into bands for the index; documents
+# sharing a band are compared on the full signature
+SIGNATURE_SIZE = 64
+BAND_ROWS = 4
+
+# Minimum estimated shingle similarity for a near-duplicate
+NEAR_DUPLICATE_SIMILARITY = 0.9
+
+# Consumption is compared to the kWh
+FINGERPRINT_MWH_DECIMALS = 3
+
+# Index key kinds
+FINGERPRINT = "fingerprint"
+TEXT_BAND = "text_band"
+
+MERSENNE_PRIME = (1 << 61) - 1
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _seeds() -> List[Tuple[int, int]]:
+    """Fixed (a, b) pairs of the universal hash functions."""
+    seeds = []
+    for i in range(SIGNATURE_SIZE):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        seeds.append((int.from_bytes(digest[:8], "big") % MERSENNE_PRIME | 1, int.from_bytes(digest[8:], "big") % MERSENNE_PRIME))
+    return seeds
+
+
+SEEDS = _seeds()
+
+
+def _key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def bill_fingerprint(bill: Dict[str, Any]) -> Optional[str]:
+    """
+    Hash of a bill's normalized supplier, meter IDs, billing period and
+    consumption, or None when the period or consumption is missing.
+    """
+    period = bill_period(bill)
+    mwh = (bill.get("total_consumption") or {}).get("normalized_mwh")
+    if period is None or not mwh:
+        return None
+    supplier = " ".join(WORD_PATTERN.findall(str(bill.get("supplier") or "").lower()))
+    meters = ",".join(sorted({re.sub(r"\W+", "", str(m)).upper() for m in bill.get("meter_ids") or [] if m}))
+    return _key(supplier, meters, period.start.isoformat(), period.end.isoformat(), f"{mwh:.{FINGERPRINT_MWH_DECIMALS}f}")
+
+
+def text_signature(text: str) -> Optional[List[int]]:
+    """MinHash signature of a text's word shingles, or None for empty text."""
+    words = WORD_PATTERN.findall((text or "").lower())
+    if not words:
+        return None
+    shingles = {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    }
+    return [min((a * h + b) % MERSENNE_PRIME for h in shingles) for a, b in SEEDS]
+
+
+def band_keys(signature: List[int]) -> List[str]:
+    """Index keys of a signature's bands."""
+    return [
+        _key(str(start), *(str(v) for v in signature[start:start + BAND_ROWS]))
+        for start in range(0, len(signature), BAND_ROWS)
+    ]
+
+
+def similarity(first: List[int], second: List[int]) -> float:
+    """Estimated shingle (Jaccard) similarity of two signatures."""
+    if not first or not second or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def index_keys(fingerprint: Optional[str], signature: Optional[List[int]]) -> List[Tuple[str, str]]:
+    """(kind, key) pairs under which a document is indexed."""
+    keys = [(FINGERPRINT, fingerprint)] if fingerprint else []
+    if signature:
+        keys.extend((TEXT_BAND, key) for key in band_keys(signature))
+    return keys
@@ -0,0 +1,209 @@
+"""
+Evidence Locator
+Resolves evidence quotes returned by the extraction model to page and
+character offsets in the OCR text.
+"""
+import re
+from bisect import bisect_right
+from collections import Counter
+from typing import Optional, Dict, Any, List, Tuple
+
+from .ocr_service import OCRPage, OCRResult
+
+
+# Character n-gram length used for the index
+NGRAM_SIZE = 5
+
+# At most this many n-grams of a quote are looked up (evenly strided)
+MAX_QUOTE_NGRAMS = 32
+
+# N-grams occurring more often than this (table rules, repeated labels)
+# carry no position information and are skipped
+MAX_POSTINGS = 64
+
+# Alignment drift, in characters, tolerated between matching n-grams
+# (OCR insertions/deletions, paraphrased punctuation)
+ALIGNMENT_SLACK = 3
+
+# Alignments with the most direct votes that are scored per quote
+MAX_CANDIDATES = 8
+
+# Minimum share of sampled n-grams that must agree on a position
+MIN_MATCH_SCORE = 0.5
+
+# Separator between pages in the combined normalized text
+PAGE_SEPARATOR = "\x00"
+
+
+def _normalize(text: str) -> Tuple[str, List[int]]:
+    """
+    Lowercase, turn markdown/punctuation into spaces and collapse whitespace.
+    Returns the normalized text and, for each normalized character, its
+    offset in the original text.
+    """
+    chars: List[str] = []
+    offsets: List[int] = []
+    for i, ch in enumerate(text):
+        ch = ch.lower() if ch.isalnum() else " "
+        if ch == " " and (not chars or chars[-1] == " "):
+            continue
+        chars.append(ch)
+        offsets.append(i)
+    if chars and chars[-1] == " ":
+        chars.pop()
+        offsets.pop()
+    return "".join(chars), offsets
+
+
+class EvidenceSpan:
+    """Location of a quote in a page's OCR markdown."""
+    def __init__(self, page: int, start: int, end: int, score: float, exact: bool):
+        self.page = page
+        self.start = start
+        self.end = end
+        self.score = score
+        self.exact = exact
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Form stored in ExtractedField.source_bbox."""
+        return {
+            "type": "text_span",
+            "page": self.page,
+            "start": self.start,
+            "end": self.end,
+            "score": round(self.score, 3),
+            "match": "exact" if self.exact else "fuzzy"
+        }
+
+
+class EvidenceLocator:
+    """
+    Character n-gram index over a document's OCR pages.
+
+    Built once per document; each quote is then resolved by looking up a
+    bounded sample of its n-grams and voting on the alignment, so lookups
+    cost the same regardless of document length.
+    """
+
+    def __init__(self, pages: List[OCRPage]):
+        self._page_numbers: List[int] = []
+        self._page_starts: List[int] = []
+        self._offsets: List[int] = []
+        parts: List[str] = []
+        position = 0
+
+        for page in pages:
+            normalized, offsets = _normalize(page.markdown or "")
+            self._page_numbers.append(page.page_number)
+            self._page_starts.append(position)
+            parts.append(normalized + PAGE_SEPARATOR)
+            self._offsets.extend(offsets)
+            self._offsets.append(len(page.markdown or ""))
+            position += len(normalized) + 1
+
+        self._text = "".join(parts)
+        self._index: Dict[str, List[int]] = {}
+        text = self._text
+        for i in range(len(text) - NGRAM_SIZE + 1):
+            gram = text[i:i + NGRAM_SIZE]
+            if PAGE_SEPARATOR in gram:
+                continue
+            self._index.setdefault(gram, []).append(i)
+
+    @classmethod
+    def from_ocr_output(cls, ocr_output: Optional[Dict[str, Any]]) -> "EvidenceLocator":
+        """Build from the OCR output stored on Document.ocr_raw_output."""
+        return cls(OCRResult.from_dict(ocr_output).pages)
+
+    def locate(self, quote: Optional[str], page_hint: Optional[int] = None) -> Optional[EvidenceSpan]:
+        """
+        Find a quote in the OCR text.
+
+        Args:
+            quote: Evidence quote as returned by the model
+            page_hint: Page the model attributed the quote to; preferred on ties
+
+        Returns:
+            The best matching span, or None if the quote can't be placed
+        """
+        if not quote:
+            return None
+        normalized, _ = _normalize(quote)
+        if not normalized:
+            return None
+
+        if len(normalized) < NGRAM_SIZE:
+            return self._locate_short(normalized, page_hint)
+
+        last = len(normalized) - NGRAM_SIZE
+        stride = max(1, (last + 1) // MAX_QUOTE_NGRAMS)
+        offsets = range(0, last + 1, stride)
+
+        votes: Counter = Counter()
+        for j in offsets:
+            postings = self._index.get(normalized[j:j + NGRAM_SIZE])
+            if not postings or len(postings) > MAX_POSTINGS:
+                continue
+            for position in postings:
+                votes[position - j] += 1
+
+        if not votes:
+            return None
+
+        # Score the strongest alignments, counting votes from nearby drifted ones
+        best: Optional[Tuple[float, bool, int, int]] = None
+        for start, direct in votes.most_common(MAX_CANDIDATES):
+            support = sum(votes.get(start + d, 0) for d in range(-ALIGNMENT_SLACK, ALIGNMENT_SLACK + 1))
+            score = min(support / len(offsets), 1.0)
+            on_hint = self._page_at(max(start, 0))[1] == page_hint
+            candidate = (score, on_hint, direct, -start)
+            if best is None or candidate > best:
+                best = candidate
+
+        score, _, _, neg_start = best
+        if score < MIN_MATCH_SCORE:
+            return None
+
+        start = max(-neg_start, 0)
+        if self._text[start] == PAGE_SEPARATOR:
+            start += 1
+        exact = self._text.startswith(normalized, start)
+        return self._span(start, start + len(normalized), 1.0 if exact else score, exact)
+
+    def _locate_short(self, normalized: str, page_hint: Optional[int]) -> Optional[EvidenceSpan]:
+        """
+        Exact whole-word search for quotes shorter than an n-gram
+        (e.g. "kWh", "500" but not the "500" in "10500").
+        """
+        pattern = re.compile(r"(?<!\w)" + re.escape(normalized) + r"(?!\w)")
+
+        if page_hint in self._page_numbers:
+            page_index = self._page_numbers.index(page_hint)
+            page_start = self._page_starts[page_index]
+            page_end = self._text.find(PAGE_SEPARATOR, page_start)
+            match = pattern.search(self._text, page_start, page_end)
+            if match:
+                return self._span(match.start(), match.end(), 1.0, True)
+
+        match = pattern.search(self._text)
+        if not match:
+            return None
+        return self._span(match.start(), match.end(), 1.0, True)
+
+    def _page_at(self, position: int) -> Tuple[int, int]:
+        """(page index, page number) containing a normalized position."""
+        page_index = max(bisect_right(self._page_starts, position) - 1, 0)
+        return page_index, self._page_numbers[page_index] if self._page_numbers else None
+
+    def _span(self, start: int, end: int, score: float, exact: bool) -> EvidenceSpan:
+        """Map a normalized range back to offsets in the page's markdown."""
+        _, page_number = self._page_at(start)
+        page_end = self._text.find(PAGE_SEPARATOR, start)
+        end = min(end, page_end) if page_end != -1 else end
+        return EvidenceSpan(
+            page=page_number,
+            start=self._offsets[start],
+            end=self._offsets[end - 1] + 1,
+            score=score,
+            exact=exact
+        )
@@ -0,0 +1,156 @@
+"""
+Export Cache
+Stores generated exports on disk under a content hash of everything they
+are rendered from, so repeated exports and re-downloads from the history
+are served from disk. Artifacts unused for too long, and the least
+recently used ones beyond the disk budget, are garbage collected.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, Iterator
+
+from ..config import get_settings
+
+
+EXTENSIONS = {"excel": "xlsx", "xml": "xml", "zip": "zip"}
+
+# Artifacts are written under this suffix and renamed once complete
+PARTIAL_SUFFIX = ".part"
+
+# Partial files older than this were left by interrupted exports
+PARTIAL_MAX_AGE_SECONDS = 3600
+
+# Subdirectory of hard links to artifacts still being read (e.g. packages
+# waiting to be copied into a portfolio archive); garbage collection only
+# removes pin directories left behind for longer than this
+PINNED_DIR = "pinned"
+PINNED_MAX_AGE_SECONDS = 86400
+
+
+def _json_line(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+def export_key(format: str, schema_version: str, inputs: Dict[str, Any]) -> str:
+    """Content hash of an export: its format, schema version and everything it renders."""
+    return hashlib.sha256(_json_line([format, schema_version, inputs])).hexdigest()
+
+
+def artifact_path(key: str, format: str) -> Path:
+    return get_settings().export_path / f"{key}.{EXTENSIONS[format]}"
+
+
+def cached_artifact(key: str, format: str) -> Optional[Path]:
+    """Stored artifact for a key, or None; a hit counts as use for garbage collection."""
+    path = artifact_path(key, format)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+@contextmanager
+def artifact_writer(key: str, format: str) -> Iterator[str]:
+    """
+    Path to write a new artifact to. It is published under its key only
+    when the block completes, so readers never see partial files.
+    """
+    fd, partial = tempfile.mkstemp(dir=get_settings().export_path, prefix=f"{key}.", suffix=PARTIAL_SUFFIX)
+    os.close(fd)
+    try:
+        yield partial
+        os.replace(partial, artifact_path(key, format))
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def store_stream(key: str, format: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Pass chunks through while writing them to the cache; an interrupted stream stores nothing."""
+    with artifact_writer(key, format) as partial:
+        with open(partial, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+
+
+def pin_directory() -> str:
+    """New directory for pin_artifact links; the caller removes it when done."""
+    root = get_settings().export_path / PINNED_DIR
+    root.mkdir(exist_ok=True)
+    return tempfile.mkdtemp(dir=root)
+
+
+def pin_artifact(path: str, pin_dir: str) -> Optional[str]:
+    """
+    Hard link to an artifact in pin_dir, which stays readable if garbage
+    collection evicts the artifact. None if it is already gone.
+    """
+    pinned = os.path.join(pin_dir, os.path.basename(path))
+    try:
+        os.link(path, pinned)
+    except FileNotFoundError:
+        return None
+    return pinned
+
+
+def collect_garbage() -> int:
+    """
+    Remove artifacts unused for export_cache_max_age_days, then the least
+    recently used until the rest fit in export_cache_max_mb. Pinned links
+    are not counted, so pinned content outlives its eviction.
+
+    Returns:
+        Number of files removed
+    """
+    settings = get_settings()
+    now = time.time()
+    max_age = settings.export_cache_max_age_days * 86400
+    budget = settings.export_cache_max_mb * 1024 * 1024
+
+    expired = []
+    artifacts = []
+    for entry in os.scandir(settings.export_path):
+        if not entry.is_file():
+            continue
+        stat = entry.stat()
+        age = now - stat.st_mtime
+        if entry.name.endswith(PARTIAL_SUFFIX):
+            if age > PARTIAL_MAX_AGE_SECONDS:
+                expired.append(entry.path)
+        elif age > max_age:
+            expired.append(entry.path)
+        else:
+            artifacts.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in artifacts)
+    for _, size, path in sorted(artifacts):
+        if total <= budget:
+            break
+        expired.append(path)
+        total -= size
+
+    # Pin directories of interrupted downloads
+    pinned_root = settings.export_path / PINNED_DIR
+    if pinned_root.is_dir():
+        for entry in os.scandir(pinned_root):
+            if entry.is_dir() and now - entry.stat().st_mtime > PINNED_MAX_AGE_SECONDS:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    removed = 0
+    for path in expired:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    if removed:
+        print(f"[EXPORT] Removed {removed} cached export file(s)")
+    return removed
@@ -0,0 +1,57 @@
+"""
+Export Pool
+Process pool for background export jobs, so generating large exports
+neither blocks the event loop nor competes with requests for the GIL.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Callable, Any
+
+from ..config import get_settings
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_export_executor() -> ProcessPoolExecutor:
+    """Process-wide pool, started on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            # Spawned workers don't inherit the server's threads or connections
+            _executor = ProcessPoolExecutor(
+                max_workers=get_settings().export_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def submit_export(fn: Callable[..., Any], *args: Any) -> Future:
+    """
+    Submit a task to the pool. A pool broken by a worker that died (e.g.
+    killed for memory) refuses new tasks, so it is replaced once and the
+    task resubmitted.
+    """
+    global _executor
+    executor = get_export_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        print("[EXPORT] Export pool is broken, starting a new one")
+        with _lock:
+            if _executor is executor:
+                _executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        return get_export_executor().submit(fn, *args)
+
+
+def shutdown_export_executor() -> None:
+    """Stop the pool, dropping jobs that have not started."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -4,20 +4,52 @@ Generates Excel and XML exports from canonical data.
 """
 import io
 import os
+import tempfile
 import zipfile
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 import json
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+import xlsxwriter
 from lxml import etree
 
 from ..config import get_settings
 
 
+# Block size for copying files into ZIP packages
+ZIP_CHUNK_SIZE = 64 * 1024
+
+# Files added to ZIP packages without recompressing
+STORED_SUFFIXES = {".pdf", ".xlsx", ".zip", ".png", ".jpg", ".jpeg"}
+
+
+class _ZipStream:
+    """
+    Write-only file object for zipfile that keeps written bytes until
+    drained. It cannot seek, so ZipFile writes sizes after each entry.
+    """
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        chunk = b"".join(self._chunks)
+        self._chunks.clear()
+        return chunk
+
+
 class ExportService:
     """
     Service for generating exports in various formats.
@@ -25,6 +57,7 @@ class ExportService:
     
     # CBAM XML namespace (based on official schema)
     CBAM_NS = "urn:cbam:report:v1"
+    SCHEMA_VERSION = "17.03"
     
     def __init__(self):
         self.settings = get_settings()
@@ -34,7 +67,7 @@ class ExportService:
         project_data: Dict[str, Any],
         canonical_data: Dict[str, Any],
         validation_flags: List[Dict[str, Any]],
-        evidence_items: List[Dict[str, Any]]
+        evidence_items: Iterable[Dict[str, Any]]
     ) -> bytes:
         """
         Generate Excel export with multiple sheets.
@@ -42,57 +75,117 @@ class ExportService:
         Returns:
             Excel file as bytes
         """
-        wb = Workbook()
-        
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="2B5797", end_color="2B5797", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Summary Sheet
-        ws_summary = wb.active
-        ws_summary.title = "Summary"
-        self._write_summary_sheet(ws_summary, project_data, canonical_data, header_font, header_fill, border)
-        
-        # Bills Sheet
-        ws_bills = wb.create_sheet("Electricity Bills")
-        self._write_bills_sheet(ws_bills, canonical_data, header_font, header_fill, border)
-        
-        # Emissions Sheet
-        ws_emissions = wb.create_sheet("Indirect Emissions")
-        self._write_emissions_sheet(ws_emissions, canonical_data, header_font, header_fill, border)
-        
-        # Validation Sheet
-        ws_validation = wb.create_sheet("Validation Summary")
-        self._write_validation_sheet(ws_validation, validation_flags, header_font, header_fill, border)
-        
-        # Evidence Sheet
-        ws_evidence = wb.create_sheet("Evidence Trail")
-        self._write_evidence_sheet(ws_evidence, evidence_items, header_font, header_fill, border)
-        
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output.read()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "report.xlsx")
+            self.write_excel(path, project_data, canonical_data, validation_flags, evidence_items)
+            with open(path, "rb") as f:
+                return f.read()
+    
+    def write_excel(
+        self,
+        path: str,
+        project_data: Dict[str, Any],
+        canonical_data: Dict[str, Any],
+        validation_flags: List[Dict[str, Any]],
+        evidence_items: Iterable[Dict[str, Any]]
+    ) -> None:
+        """
+        Write the Excel export to a file in constant memory.
+        
+        Rows are written in order and flushed to disk as they go
+        (xlsxwriter constant_memory mode), so evidence_items can be a
+        lazy iterator over a DB cursor of any length.
+        """
+        wb = xlsxwriter.Workbook(path, {"constant_memory": True, "tmpdir": os.path.dirname(path) or None})
+        formats = self._add_formats(wb)
+        
+        try:
+            self._write_summary_sheet(wb.add_worksheet("Summary"), project_data, canonical_data, formats)
+            self._write_bills_sheet(wb.add_worksheet("Electricity Bills"), canonical_data, formats)
+            self._write_emissions_sheet(wb.add_worksheet("Indirect Emissions"), canonical_data, formats)
+            self._write_validation_sheet(wb.add_worksheet("Validation Summary"), validation_flags, formats)
+            self._write_evidence_sheet(wb.add_worksheet("Evidence Trail"), evidence_items, formats)
+        finally:
+            wb.close()
     
-    def _write_summary_sheet(self, ws, project_data, canonical_data, header_font, header_fill, border):
+    def write_portfolio_summary(self, path: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Write the consolidated workbook of a portfolio export: one row
+        per project with its totals, flag counts and package outcome.
+        """
+        wb = xlsxwriter.Workbook(path, {"constant_memory": True, "tmpdir": os.path.dirname(path) or None})
+        formats = self._add_formats(wb)
+        
+        try:
+            ws = wb.add_worksheet("Portfolio")
+            headers = [
+                "Project", "Project ID", "Reporting Period", "Declarant",
+                "Electricity (MWh)", "Indirect Emissions (tCO₂)", "Emission Factor (tCO₂/MWh)",
+                "Warnings", "Blocking Flags", "Package", "Note"
+            ]
+            self._write_header(ws, headers, formats)
+            
+            total_mwh = 0.0
+            total_tco2 = 0.0
+            for row_idx, row in enumerate(rows, start=1):
+                total_mwh += row.get("total_electricity_mwh") or 0
+                total_tco2 += row.get("total_indirect_emissions_tco2") or 0
+                ws.write_row(row_idx, 0, [
+                    row.get("name", ""),
+                    row.get("project_id", ""),
+                    row.get("reporting_period", ""),
+                    row.get("declarant", ""),
+                    row.get("total_electricity_mwh") or 0,
+                    row.get("total_indirect_emissions_tco2") or 0,
+                    row.get("emission_factor_value") or "",
+                    row.get("warnings_count", 0),
+                    row.get("blocking_flags_count", 0),
+                    row.get("package") or "",
+                    row.get("note") or ""
+                ], formats["blocking"] if not row.get("package") else formats["cell"])
+            
+            total_row = len(rows) + 1
+            ws.write(total_row, 0, "Total", formats["bold"])
+            ws.write(total_row, 4, total_mwh, formats["bold"])
+            ws.write(total_row, 5, total_tco2, formats["bold"])
+            
+            ws.set_column(0, 0, 30)
+            ws.set_column(1, 1, 38)
+            ws.set_column(2, 3, 20)
+            ws.set_column(4, 6, 18)
+            ws.set_column(7, 8, 12)
+            ws.set_column(9, 9, 40)
+            ws.set_column(10, 10, 50)
+        finally:
+            wb.close()
+    
+    @staticmethod
+    def _add_formats(wb) -> Dict[str, Any]:
+        """Cell formats shared by the workbooks."""
+        return {
+            "header": wb.add_format({"bold": True, "font_color": "#FFFFFF", "bg_color": "#2B5797", "border": 1}),
+            "cell": wb.add_format({"border": 1}),
+            "title": wb.add_format({"bold": True, "font_size": 16}),
+            "bold": wb.add_format({"bold": True}),
+            "section": wb.add_format({"bold": True, "font_size": 12}),
+            "blocking": wb.add_format({"border": 1, "bg_color": "#FF6B6B"}),
+            "warning": wb.add_format({"border": 1, "bg_color": "#FFE66D"}),
+            "info": wb.add_format({"border": 1, "bg_color": "#4ECDC4"}),
+        }
+    
+    @staticmethod
+    def _write_header(ws, headers: List[str], formats: Dict[str, Any]) -> None:
+        ws.write_row(0, 0, headers, formats["header"])
+    
+    def _write_summary_sheet(self, ws, project_data, canonical_data, formats):
         """Write summary sheet."""
         # Title
-        ws["A1"] = "CBAM Quarterly Report - Indirect Emissions (Electricity)"
-        ws["A1"].font = Font(bold=True, size=16)
-        ws.merge_cells("A1:D1")
+        ws.merge_range(0, 0, 0, 3, "CBAM Quarterly Report - Indirect Emissions (Electricity)", formats["title"])
         
         # Project Info
         rows = [
             ("Project Name", project_data.get("name", "")),
             ("Reporting Period", f"{canonical_data.get('reporting_period', 'N/A')} {canonical_data.get('reporting_year', '')}"),
-            ("Generated At", datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")),
             ("", ""),
             ("Total Electricity Consumed (MWh)", canonical_data.get("total_electricity_mwh", 0)),
             ("Total Indirect Emissions (tCO₂)", canonical_data.get("total_indirect_emissions_tco2", 0)),
@@ -100,17 +193,15 @@ class ExportService:
             ("Emission Factor Value (tCO₂/MWh)", project_data.get("emission_factor_value", "N/A")),
         ]
         
-        for idx, (label, value) in enumerate(rows, start=3):
-            ws[f"A{idx}"] = label
-            ws[f"A{idx}"].font = Font(bold=True)
-            ws[f"B{idx}"] = value
+        for idx, (label, value) in enumerate(rows, start=2):
+            ws.write(idx, 0, label, formats["bold"])
+            ws.write(idx, 1, value)
         
         # Declarant Info
         declarant = project_data.get("declarant_info", {})
         if declarant:
-            start_row = len(rows) + 5
-            ws[f"A{start_row}"] = "Declarant Information"
-            ws[f"A{start_row}"].font = Font(bold=True, size=12)
+            start_row = len(rows) + 4
+            ws.write(start_row, 0, "Declarant Information", formats["section"])
             
             decl_rows = [
                 ("Name", declarant.get("name", "")),
@@ -119,30 +210,25 @@ class ExportService:
             ]
             
             for idx, (label, value) in enumerate(decl_rows, start=start_row + 1):
-                ws[f"A{idx}"] = label
-                ws[f"B{idx}"] = value
+                ws.write(idx, 0, label)
+                ws.write(idx, 1, value)
         
         # Adjust column widths
-        ws.column_dimensions["A"].width = 35
-        ws.column_dimensions["B"].width = 40
+        ws.set_column(0, 0, 35)
+        ws.set_column(1, 1, 40)
     
-    def _write_bills_sheet(self, ws, canonical_data, header_font, header_fill, border):
+    def _write_bills_sheet(self, ws, canonical_data, formats):
         """Write electricity bills sheet."""
         headers = ["Document ID", "Supplier", "Period Start", "Period End", 
                    "Consumption", "Unit", "Normalized (MWh)", "Amount", "Currency"]
-        
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = border
+        self._write_header(ws, headers, formats)
         
         bills = canonical_data.get("electricity_bills", [])
-        for row_idx, bill in enumerate(bills, start=2):
-            tc = bill.get("total_consumption", {})
-            bp = bill.get("billing_period", {})
+        for row_idx, bill in enumerate(bills, start=1):
+            tc = bill.get("total_consumption") or {}
+            bp = bill.get("billing_period") or {}
             
-            values = [
+            ws.write_row(row_idx, 0, [
                 bill.get("document_id", ""),
                 bill.get("supplier", ""),
                 bp.get("start_date", ""),
@@ -152,121 +238,83 @@ class ExportService:
                 tc.get("normalized_mwh", ""),
                 bill.get("total_amount", ""),
                 bill.get("currency", "")
-            ]
-            
-            for col, value in enumerate(values, start=1):
-                cell = ws.cell(row=row_idx, column=col, value=value)
-                cell.border = border
+            ], formats["cell"])
         
         # Adjust widths
-        for col in range(1, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(col)].width = 18
+        ws.set_column(0, len(headers) - 1, 18)
     
-    def _write_emissions_sheet(self, ws, canonical_data, header_font, header_fill, border):
+    def _write_emissions_sheet(self, ws, canonical_data, formats):
         """Write indirect emissions sheet."""
         headers = ["Period Start", "Period End", "Electricity (MWh)", 
                    "Emission Factor", "Factor Source", "Emissions (tCO₂)"]
-        
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = border
+        self._write_header(ws, headers, formats)
         
         emissions = canonical_data.get("indirect_emissions", [])
-        for row_idx, em in enumerate(emissions, start=2):
-            values = [
+        for row_idx, em in enumerate(emissions, start=1):
+            ws.write_row(row_idx, 0, [
                 em.get("period_start", ""),
                 em.get("period_end", ""),
                 em.get("electricity_consumed_mwh", 0),
                 em.get("emission_factor", ""),
                 em.get("emission_factor_source", ""),
                 em.get("emissions_tco2", 0)
-            ]
-            
-            for col, value in enumerate(values, start=1):
-                cell = ws.cell(row=row_idx, column=col, value=value)
-                cell.border = border
+            ], formats["cell"])
         
         # Total row
         if emissions:
-            total_row = len(emissions) + 2
-            ws.cell(row=total_row, column=1, value="TOTAL").font = Font(bold=True)
-            ws.cell(row=total_row, column=3, value=canonical_data.get("total_electricity_mwh", 0))
-            ws.cell(row=total_row, column=6, value=canonical_data.get("total_indirect_emissions_tco2", 0))
+            total_row = len(emissions) + 1
+            ws.write(total_row, 0, "TOTAL", formats["bold"])
+            ws.write(total_row, 2, canonical_data.get("total_electricity_mwh", 0))
+            ws.write(total_row, 5, canonical_data.get("total_indirect_emissions_tco2", 0))
         
-        for col in range(1, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(col)].width = 18
+        ws.set_column(0, len(headers) - 1, 18)
     
-    def _write_validation_sheet(self, ws, flags, header_font, header_fill, border):
+    def _write_validation_sheet(self, ws, flags, formats):
         """Write validation summary sheet."""
         headers = ["Code", "Severity", "Category", "Message", "Suggestion", "Status"]
+        self._write_header(ws, headers, formats)
         
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = border
-        
-        severity_colors = {
-            "blocking": PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid"),
-            "warning": PatternFill(start_color="FFE66D", end_color="FFE66D", fill_type="solid"),
-            "info": PatternFill(start_color="4ECDC4", end_color="4ECDC4", fill_type="solid")
-        }
-        
-        for row_idx, flag in enumerate(flags, start=2):
-            values = [
+        for row_idx, flag in enumerate(flags, start=1):
+            severity = flag.get("severity", "")
+            ws.write_row(row_idx, 0, [
                 flag.get("code", ""),
-                flag.get("severity", ""),
+                severity,
                 flag.get("category", ""),
                 flag.get("message", ""),
                 flag.get("suggestion", ""),
                 "Resolved" if flag.get("is_resolved") else ("Acknowledged" if flag.get("is_acknowledged") else "Open")
-            ]
-            
-            for col, value in enumerate(values, start=1):
-                cell = ws.cell(row=row_idx, column=col, value=value)
-                cell.border = border
-                if col == 2:  # Severity column
-                    cell.fill = severity_colors.get(value, PatternFill())
-        
-        ws.column_dimensions["A"].width = 20
-        ws.column_dimensions["B"].width = 12
-        ws.column_dimensions["C"].width = 18
-        ws.column_dimensions["D"].width = 50
-        ws.column_dimensions["E"].width = 40
-        ws.column_dimensions["F"].width = 15
+            ], formats["cell"])
+            # Severity column
+            ws.write(row_idx, 1, severity, formats.get(severity, formats["cell"]))
+        
+        ws.set_column(0, 0, 20)
+        ws.set_column(1, 1, 12)
+        ws.set_column(2, 2, 18)
+        ws.set_column(3, 3, 50)
+        ws.set_column(4, 4, 40)
+        ws.set_column(5, 5, 15)
     
-    def _write_evidence_sheet(self, ws, evidence_items, header_font, header_fill, border):
+    def _write_evidence_sheet(self, ws, evidence_items, formats):
         """Write evidence trail sheet."""
         headers = ["Field", "Value", "Document", "Page", "Quote", "Confidence"]
+        self._write_header(ws, headers, formats)
         
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = border
-        
-        for row_idx, item in enumerate(evidence_items, start=2):
-            values = [
+        for row_idx, item in enumerate(evidence_items, start=1):
+            ws.write_row(row_idx, 0, [
                 item.get("field_name", ""),
                 item.get("value", ""),
                 item.get("document_id", ""),
                 item.get("source_page", ""),
                 item.get("source_quote", ""),
                 f"{item.get('confidence', 0):.0%}" if item.get("confidence") else ""
-            ]
-            
-            for col, value in enumerate(values, start=1):
-                cell = ws.cell(row=row_idx, column=col, value=value)
-                cell.border = border
-        
-        ws.column_dimensions["A"].width = 20
-        ws.column_dimensions["B"].width = 25
-        ws.column_dimensions["C"].width = 15
-        ws.column_dimensions["D"].width = 8
-        ws.column_dimensions["E"].width = 60
-        ws.column_dimensions["F"].width = 12
+            ], formats["cell"])
+        
+        ws.set_column(0, 0, 20)
+        ws.set_column(1, 1, 25)
+        ws.set_column(2, 2, 15)
+        ws.set_column(3, 3, 8)
+        ws.set_column(4, 4, 60)
+        ws.set_column(5, 5, 12)
     
     def generate_xml(
         self,
@@ -279,21 +327,63 @@ class ExportService:
         Returns:
             XML string
         """
-        # Create root element
-        root = etree.Element("Qreport", nsmap={None: self.CBAM_NS})
+        return b"".join(self.iter_xml(project_data, canonical_data)).decode("utf-8")
+    
+    def iter_xml(
+        self,
+        project_data: Dict[str, Any],
+        canonical_data: Dict[str, Any]
+    ) -> Iterator[bytes]:
+        """
+        Generate CBAM-compliant XML incrementally.
+        
+        Each top-level section is built as a small element, serialized with
+        lxml's xmlfile and yielded as UTF-8 bytes, so the whole document is
+        never held in memory. Suitable for StreamingResponse bodies and
+        ZIP entries.
+        """
+        buffer = io.BytesIO()
+        
+        def drain() -> bytes:
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+        
+        with etree.xmlfile(buffer, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            xf.flush()
+            yield drain()
+            with xf.element("Qreport", nsmap={None: self.CBAM_NS}):
+                for section in self._xml_sections(project_data, canonical_data):
+                    etree.indent(section, space="  ", level=1)
+                    xf.write("\n  ")
+                    xf.write(section)
+                    xf.flush()
+                    yield drain()
+                xf.write("\n")
+        # lxml writes no text after the root element
+        yield drain() + b"\n"
+    
+    def _xml_sections(self, project_data: Dict[str, Any], canonical_data: Dict[str, Any]) -> Iterator[etree._Element]:
+        """Top-level elements of the CBAM report, in document order."""
+        def text_element(tag: str, text: str) -> etree._Element:
+            element = etree.Element(tag)
+            element.text = text
+            return element
         
         # Reporting Period
-        etree.SubElement(root, "ReportingPeriod").text = canonical_data.get("reporting_period", "Q1")
-        etree.SubElement(root, "Year").text = canonical_data.get("reporting_year", str(datetime.now().year))
+        yield text_element("ReportingPeriod", canonical_data.get("reporting_period", "Q1"))
+        yield text_element("Year", canonical_data.get("reporting_year", str(datetime.now().year)))
         
         # Totals
-        etree.SubElement(root, "TotalImported").text = str(canonical_data.get("total_electricity_mwh", 0))
-        etree.SubElement(root, "TotalEmissions").text = f"{canonical_data.get('total_indirect_emissions_tco2', 0):.7f}"
+        yield text_element("TotalImported", str(canonical_data.get("total_electricity_mwh", 0)))
+        yield text_element("TotalEmissions", f"{canonical_data.get('total_indirect_emissions_tco2', 0):.7f}")
         
         # Declarant Type
         declarant_info = project_data.get("declarant_info", {})
         if declarant_info:
-            declarant = etree.SubElement(root, "DeclarantType")
+            declarant = etree.Element("DeclarantType")
             etree.SubElement(declarant, "IdentificationNumber").text = declarant_info.get("identification_number", "")
             etree.SubElement(declarant, "Name").text = declarant_info.get("name", "")
             if declarant_info.get("role"):
@@ -319,9 +409,10 @@ class ExportService:
                     etree.SubElement(addr_elem, "Postcode").text = address["postcode"]
                 if address.get("po_box"):
                     etree.SubElement(addr_elem, "POBox").text = address["po_box"]
+            yield declarant
         
         # Imported Goods (Electricity section)
-        imported_good = etree.SubElement(root, "ImportedGood")
+        imported_good = etree.Element("ImportedGood")
         etree.SubElement(imported_good, "ItemNumber").text = "1"
         etree.SubElement(imported_good, "ImportArea").text = "EU"
         
@@ -339,21 +430,14 @@ class ExportService:
         etree.SubElement(indirect, "ElectricityEmissionFactor").text = str(emission_factor)
         etree.SubElement(indirect, "IndirectEmissionsValue").text = f"{canonical_data.get('total_indirect_emissions_tco2', 0):.7f}"
         etree.SubElement(indirect, "EmissionFactorSource").text = project_data.get("emission_factor_source", "DefaultValue")
-        
-        # Generate XML string with pretty printing
-        return etree.tostring(
-            root,
-            pretty_print=True,
-            xml_declaration=True,
-            encoding="UTF-8"
-        ).decode("utf-8")
+        yield imported_good
     
     def generate_zip(
         self,
         project_data: Dict[str, Any],
         canonical_data: Dict[str, Any],
         validation_flags: List[Dict[str, Any]],
-        evidence_items: List[Dict[str, Any]]
+        evidence_items: Iterable[Dict[str, Any]]
     ) -> bytes:
         """
         Generate ZIP package with XML and Excel.
@@ -361,28 +445,120 @@ class ExportService:
         Returns:
             ZIP file as bytes
         """
-        output = io.BytesIO()
+        return b"".join(self.iter_zip(project_data, canonical_data, validation_flags, evidence_items))
+    
+    def iter_zip(
+        self,
+        project_data: Dict[str, Any],
+        canonical_data: Dict[str, Any],
+        validation_flags: List[Dict[str, Any]],
+        evidence_items: Iterable[Dict[str, Any]],
+        attachments: Iterable[Tuple[str, Union[str, bytes]]] = ()
+    ) -> Iterator[bytes]:
+        """
+        Generate the ZIP package incrementally.
+        
+        Entries are compressed as they are produced and the archive bytes
+        are yielded as soon as they are written: the XML section by
+        section, then the Excel file (written to a temporary file first, as
+        xlsxwriter needs one) and attachments in ZIP_CHUNK_SIZE blocks.
+        The archive uses data descriptors, so no entry is held in memory.
+        
+        Args:
+            attachments: Extra (archive name, file path or content) entries,
+                e.g. source PDFs and OCR output for audits
+        """
+        chunks = self._zip_chunks(project_data, canonical_data, validation_flags, evidence_items, attachments)
+        return (chunk for chunk in chunks if chunk)
+    
+    def _zip_chunks(
+        self,
+        project_data: Dict[str, Any],
+        canonical_data: Dict[str, Any],
+        validation_flags: List[Dict[str, Any]],
+        evidence_items: Iterable[Dict[str, Any]],
+        attachments: Iterable[Tuple[str, Union[str, bytes]]]
+    ) -> Iterator[bytes]:
+        stream = _ZipStream()
         
-        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zf:
             # Add XML
-            xml_content = self.generate_xml(project_data, canonical_data)
-            zf.writestr("cbam_report.xml", xml_content)
+            with zf.open("cbam_report.xml", "w") as entry:
+                for chunk in self.iter_xml(project_data, canonical_data):
+                    entry.write(chunk)
+                    yield stream.drain()
             
             # Add Excel
-            excel_content = self.generate_excel(
-                project_data, canonical_data, validation_flags, evidence_items
-            )
-            zf.writestr("cbam_report.xlsx", excel_content)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, "report.xlsx")
+                self.write_excel(path, project_data, canonical_data, validation_flags, evidence_items)
+                yield from self._copy_into_zip(zf, stream, "cbam_report.xlsx", path)
             
-            # Add metadata JSON
+            # Add metadata JSON (no generation time: packages are cached by
+            # content, and when one was made is kept in the export history)
             metadata = {
-                "generated_at": datetime.utcnow().isoformat(),
                 "project_name": project_data.get("name"),
                 "reporting_period": f"{canonical_data.get('reporting_period')} {canonical_data.get('reporting_year')}",
-                "schema_version": "17.03"
+                "schema_version": self.SCHEMA_VERSION
             }
             zf.writestr("metadata.json", json.dumps(metadata, indent=2))
+            
+            for arcname, source in attachments:
+                if isinstance(source, bytes):
+                    zf.writestr(arcname, source)
+                elif os.path.isfile(source):
+                    yield from self._copy_into_zip(zf, stream, arcname, source)
+                else:
+                    print(f"[EXPORT] Skipping missing attachment {source}")
+                yield stream.drain()
+        
+        # Central directory
+        yield stream.drain()
+    
+    def iter_portfolio_zip(
+        self,
+        packages: Iterable[Tuple[str, str]],
+        summary_rows: List[Dict[str, Any]]
+    ) -> Iterator[bytes]:
+        """
+        Generate a portfolio archive incrementally.
         
-        output.seek(0)
-        return output.read()
+        Project packages are added as (archive name, file path) pairs in
+        the order they become ready, then portfolio_summary.xlsx is written
+        from summary_rows. The packages iterator may fill in summary_rows
+        (package names, failures) as it goes; the summary is only written
+        once it is exhausted.
+        """
+        return (chunk for chunk in self._portfolio_chunks(packages, summary_rows) if chunk)
+    
+    def _portfolio_chunks(self, packages: Iterable[Tuple[str, str]], summary_rows: List[Dict[str, Any]]) -> Iterator[bytes]:
+        stream = _ZipStream()
+        
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zf:
+            for arcname, path in packages:
+                yield from self._copy_into_zip(zf, stream, arcname, path)
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, "portfolio_summary.xlsx")
+                self.write_portfolio_summary(path, summary_rows)
+                yield from self._copy_into_zip(zf, stream, "portfolio_summary.xlsx", path)
+        
+        # Central directory
+        yield stream.drain()
+    
+    @staticmethod
+    def _copy_into_zip(zf: zipfile.ZipFile, stream: "_ZipStream", arcname: str, path: str) -> Iterator[bytes]:
+        """Add a file to the archive block by block, yielding the written bytes."""
+        # PDFs, xlsx and zip files are already compressed
+        compress_type = zipfile.ZIP_STORED if Path(path).suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+        info = zipfile.ZipInfo.from_file(path, arcname)
+        info.compress_type = compress_type
+        with open(path, "rb") as src, zf.open(info, "w") as entry:
+            while True:
+                block = src.read(ZIP_CHUNK_SIZE)
+                if not block:
+                    break
+                entry.write(block)
+                yield stream.drain()
+        yield stream.drain()
 
@@ -0,0 +1,175 @@
+"""
+Extraction Batcher
+Packs small documents arriving close together into a single extraction
+request, so one-page bills don't each pay full request overhead.
+"""
+import asyncio
+from typing import Optional, Dict, List, Set
+
+from ..config import get_settings
+from .ocr_service import OCRResult
+from .extraction_service import ExtractionService, ExtractionResult, ExtractionError, PartialCallback
+from .usage_service import TokenUsage
+
+
+# Rough OCR-markdown characters per token, used for the batch budget
+CHARS_PER_TOKEN = 4
+
+
+class _PendingDocument:
+    """A document waiting in a batch for its extraction result."""
+    def __init__(
+        self,
+        document_id: str,
+        ocr_result: OCRResult,
+        tokens: int,
+        future: asyncio.Future,
+        on_partial: Optional[PartialCallback] = None
+    ):
+        self.document_id = document_id
+        self.ocr_result = ocr_result
+        self.tokens = tokens
+        self.future = future
+        self.on_partial = on_partial
+
+
+class ExtractionBatcher:
+    """
+    Micro-batcher for small extraction requests.
+
+    Documents are queued per model. A queue is sent as one packed request
+    when it reaches the token budget or document limit (also bounded by how
+    many answers fit in the model's completion limit), or when the wait
+    window opened by its first document expires. The packed response is
+    split back into per-document results; documents missing from it, or
+    the whole batch if the packed request fails, are retried singly.
+    """
+
+    def __init__(self, extraction_service: ExtractionService):
+        self.settings = get_settings()
+        self.extraction_service = extraction_service
+        self._pending: Dict[str, List[_PendingDocument]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._running: Set[asyncio.Task] = set()
+
+    def estimate_tokens(self, ocr_result: OCRResult) -> int:
+        """Estimated prompt tokens for a document's OCR text."""
+        return len(ocr_result.get_full_markdown()) // CHARS_PER_TOKEN + 1
+
+    def accepts(self, ocr_result: OCRResult) -> bool:
+        """Whether a document is small enough to be packed with others."""
+        return self.estimate_tokens(ocr_result) <= self.settings.batch_max_document_tokens
+
+    async def extract(
+        self,
+        ocr_result: OCRResult,
+        document_id: str,
+        model: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None
+    ) -> ExtractionResult:
+        """
+        Extract a document, packed with others when it is small enough.
+        A packed document's key fields are passed to on_partial once its
+        entry in the shared response is complete.
+        """
+        model = model or self.extraction_service.model
+        capacity = min(self.settings.batch_max_documents, self.extraction_service.batch_capacity(model))
+        if capacity < 2 or not self.accepts(ocr_result):
+            return await self.extraction_service.extract_from_ocr(
+                ocr_result, document_id, on_partial=on_partial, model=model
+            )
+
+        loop = asyncio.get_running_loop()
+        pending = _PendingDocument(
+            document_id, ocr_result, self.estimate_tokens(ocr_result), loop.create_future(), on_partial
+        )
+
+        queue = self._pending.get(model)
+        if queue and sum(p.tokens for p in queue) + pending.tokens > self.settings.batch_max_tokens:
+            self._flush(model)
+
+        queue = self._pending.setdefault(model, [])
+        queue.append(pending)
+        if len(queue) >= capacity:
+            self._flush(model)
+        elif len(queue) == 1:
+            self._timers[model] = loop.call_later(
+                self.settings.batch_wait_ms / 1000, self._flush, model
+            )
+
+        return await pending.future
+
+    def _flush(self, model: str) -> None:
+        """Send the queued documents for a model as one batch."""
+        timer = self._timers.pop(model, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(model, [])
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch, model))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[_PendingDocument], model: str) -> None:
+        """Extract a batch and resolve each document's future."""
+        results: Dict[str, ExtractionResult] = {}
+        # Share of the packed call's usage of each document retried singly
+        unanswered_usage: Dict[str, TokenUsage] = {}
+        if len(batch) > 1:
+            print(f"[BATCH] Extracting {len(batch)} documents in one request ({model})")
+            try:
+                results = await self.extraction_service.extract_batch(
+                    [(p.document_id, p.ocr_result) for p in batch],
+                    model=model,
+                    on_partial={p.document_id: p.on_partial for p in batch if p.on_partial},
+                    unanswered_usage=unanswered_usage
+                )
+            except Exception as e:
+                print(f"[BATCH] Packed request failed, retrying documents singly: {str(e)}")
+
+        retries = [p for p in batch if p.document_id not in results]
+        if len(batch) > 1 and retries:
+            print(f"[BATCH] Retrying {len(retries)} of {len(batch)} documents singly")
+
+        for p in batch:
+            if p.document_id in results and not p.future.done():
+                p.future.set_result(results[p.document_id])
+
+        await asyncio.gather(*(
+            self._extract_single(p, model, unanswered_usage.get(p.document_id)) for p in retries
+        ))
+
+    async def _extract_single(self, pending: _PendingDocument, model: str, packed_usage: Optional[TokenUsage] = None) -> None:
+        """
+        Extract one document on its own, isolating its failure. The
+        document's share of a packed call that left it unanswered is
+        counted in the result (or the failure).
+        """
+        packed_cost = self.extraction_service.usage_service.llm_cost(model, packed_usage) if packed_usage else None
+        try:
+            result = await self.extraction_service.extract_from_ocr(
+                pending.ocr_result, pending.document_id, on_partial=pending.on_partial, model=model
+            )
+        except Exception as e:
+            if packed_usage and isinstance(e, ExtractionError):
+                e.include_usage(packed_usage, packed_cost)
+            if not pending.future.done():
+                pending.future.set_exception(e)
+            return
+        if packed_usage:
+            result.include_usage(packed_usage, packed_cost)
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+
+_batcher: Optional[ExtractionBatcher] = None
+
+
+def get_extraction_batcher() -> ExtractionBatcher:
+    """Process-wide batcher, so concurrent document tasks share batches."""
+    global _batcher
+    if _batcher is None:
+        _batcher = ExtractionBatcher(ExtractionService())
+    return _batcher
@@ -2,15 +2,28 @@
 Extraction Service - OpenAI Structured Extraction
 Converts OCR markdown to canonical Osita JSON using OpenAI.
 """
+import copy
 import json
 import time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 from datetime import datetime
 import re
 from openai import AsyncOpenAI
 
 from ..config import get_settings
 from .ocr_service import OCRResult
+from .json_repair import parse_llm_json, StreamingJSONParser, StreamingJSONArrayParser
+from .usage_service import TokenUsage, UsageService
+from .prompt_builder import ExtractionPromptBuilder
+from .evidence_locator import EvidenceLocator
+from .confidence_scorer import ConfidenceScorer
+from .unit_normalizer import (
+    to_mwh, normalize_many, format_normalized, DEFAULT_UNIT, MACHINE_LANGUAGE
+)
+
+
+# Callback receiving the key fields known so far while a completion streams
+PartialCallback = Callable[[Dict[str, Any]], Awaitable[None]]
 
 
 class ExtractionResult:
@@ -21,13 +34,55 @@ class ExtractionResult:
         fields: List[Dict[str, Any]],
         processing_time: float = 0.0,
         model_name: str = "gpt-4-turbo-preview",
-        raw_response: Optional[Dict] = None
+        raw_response: Optional[Dict] = None,
+        usage: Optional[TokenUsage] = None,
+        prompt_version: Optional[str] = None,
+        estimated_cost: Optional[float] = None
     ):
         self.canonical_data = canonical_data
         self.fields = fields
         self.processing_time = processing_time
         self.model_name = model_name
         self.raw_response = raw_response
+        self.usage = usage or TokenUsage()
+        self.prompt_version = prompt_version
+        self.estimated_cost = estimated_cost
+        # Set by ModelRouter
+        self.route: Optional[str] = None
+        self.escalation_reason: Optional[str] = None
+    
+    def include_usage(self, usage: TokenUsage, estimated_cost: Optional[float], processing_time: float = 0.0) -> None:
+        """Count the API calls of an earlier attempt (failed, escalated or packed) in this result."""
+        self.usage.merge(usage)
+        self.processing_time += processing_time
+        if estimated_cost is not None and self.estimated_cost is not None:
+            self.estimated_cost += estimated_cost
+
+
+class ExtractionError(ValueError):
+    """
+    Extraction failure, carrying the usage of the API calls completed
+    before it failed so they are still accounted for.
+    """
+    def __init__(
+        self,
+        message: str,
+        usage: Optional[TokenUsage] = None,
+        estimated_cost: Optional[float] = None,
+        model_name: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.usage = usage or TokenUsage()
+        self.estimated_cost = estimated_cost
+        self.model_name = model_name
+        # Set by ModelRouter
+        self.route: Optional[str] = None
+    
+    def include_usage(self, usage: TokenUsage, estimated_cost: Optional[float]) -> None:
+        """Count the API calls of an earlier attempt in this failure."""
+        self.usage.merge(usage)
+        if estimated_cost is not None and self.estimated_cost is not None:
+            self.estimated_cost += estimated_cost
 
 
 # JSON Schema for extraction output
@@ -111,24 +166,76 @@ EXTRACTION_SCHEMA = {
 }
 
 
-EXTRACTION_PROMPT = """You are an expert at extracting structured data from electricity bills and energy documents.
+def _to_strict_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a JSON schema to the OpenAI strict structured-output dialect.
 
-Analyze the following OCR text from an electricity bill and extract all relevant information.
+    Strict mode requires every property to be listed in ``required`` and
+    ``additionalProperties`` to be false, so optional properties are made
+    nullable instead.
+    """
+    strict = copy.deepcopy(schema)
 
-IMPORTANT RULES:
-1. Extract all consumption values with their units (kWh, MWh, or TJ)
-2. Parse dates into YYYY-MM-DD format when possible
-3. For each extracted value, provide evidence: the page number and exact quote from the text
-4. Estimate confidence (0-1) for each extraction based on clarity of the source text
-5. If a value is ambiguous or unclear, still extract it but with lower confidence
-6. Handle multiple meters/sites if present
-7. Support multilingual content (English, French, Arabic)
+    def visit(node: Dict[str, Any]) -> None:
+        if node.get("type") == "object" and "properties" in node:
+            originally_required = set(node.get("required", []))
+            for name, prop in node["properties"].items():
+                visit(prop)
+                if name not in originally_required:
+                    prop["type"] = [prop["type"], "null"]
+                    if "enum" in prop:
+                        prop["enum"] = prop["enum"] + [None]
+            node["required"] = list(node["properties"].keys())
+            node["additionalProperties"] = False
+        elif node.get("type") == "array" and "items" in node:
+            visit(node["items"])
 
-OCR TEXT:
-{ocr_text}
+    visit(strict)
+    return strict
 
-Extract the information according to the schema and provide evidence for each field.
-"""
+
+STRICT_EXTRACTION_SCHEMA = _to_strict_schema(EXTRACTION_SCHEMA)
+
+# Several documents packed into one request (see ExtractionBatcher)
+BATCH_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "documents": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "document_index": {"type": "integer", "description": "Number of the bill's <<<DOCUMENT n>>> delimiter"},
+                    "extraction": EXTRACTION_SCHEMA
+                },
+                "required": ["document_index", "extraction"]
+            }
+        }
+    },
+    "required": ["documents"]
+}
+
+STRICT_BATCH_EXTRACTION_SCHEMA = _to_strict_schema(BATCH_EXTRACTION_SCHEMA)
+
+# Model families that accept response_format={"type": "json_schema"}
+# (including fine-tunes of these base models)
+STRUCTURED_OUTPUT_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
+# Completion token budget for packed requests
+BATCH_MAX_TOKENS_PER_DOCUMENT = 1500
+BATCH_MAX_TOKENS = 16000
+
+# Completion token limit per model family (longest prefix wins; fine-tunes
+# use their base model). Unknown models get the smallest common limit.
+MODEL_MAX_OUTPUT_TOKENS = {
+    "gpt-4-turbo": 4096,
+    "gpt-4o": 16384,
+    "gpt-4o-mini": 16384,
+    "gpt-4.1": 32768,
+}
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+JSON_RETRY_PROMPT = "Your previous response could not be parsed as JSON ({error}). Respond again with only the complete JSON object, with no markdown or commentary."
 
 
 class ExtractionService:
@@ -145,11 +252,17 @@ class ExtractionService:
         finetuned = getattr(self.settings, 'openai_finetuned_model', None)
         self.model = finetuned if finetuned else "gpt-4-turbo-preview"
         self.is_finetuned = bool(finetuned and finetuned.startswith("ft:"))
+        # Cheaper model for simple documents (see ModelRouter)
+        self.fast_model = self.settings.openai_fast_model or self.model
+        self.prompt_builder = ExtractionPromptBuilder(EXTRACTION_SCHEMA)
+        self.usage_service = UsageService()
     
     async def extract_from_ocr(
         self, 
         ocr_result: OCRResult,
-        document_id: str
+        document_id: str,
+        on_partial: Optional[PartialCallback] = None,
+        model: Optional[str] = None
     ) -> ExtractionResult:
         """
         Extract structured data from OCR result.
@@ -157,78 +270,318 @@ class ExtractionService:
         Args:
             ocr_result: OCR output with page markdown
             document_id: ID of source document
+            on_partial: Optional callback invoked with the key fields
+                (supplier, period, total consumption) as soon as each one
+                is complete in the streamed response
+            model: Model to use (defaults to the primary model)
             
         Returns:
             ExtractionResult with canonical data and field extractions
         """
         start_time = time.time()
+        model = model or self.model
         
         # Prepare OCR text
         ocr_text = ocr_result.get_full_markdown()
         
+        # Stable instructions/schema/examples first, document text last
+        messages = self.prompt_builder.build(ocr_text)
+        
         # Call OpenAI
+        raw_output = ""
+        usage = TokenUsage()
         try:
-            # Build API call parameters
-            api_params = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert at extracting structured data from electricity bills. Extract all relevant billing information and provide evidence for each field. Always respond with valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Extract data from this electricity bill:\n\n{ocr_text}"
-                    }
-                ],
-                "temperature": 0.1,
-                "max_tokens": 4000
-            }
-            
-            # Only add response_format for non-finetuned models
-            # Fine-tuned models don't support response_format
-            if not self.is_finetuned:
-                api_params["response_format"] = {"type": "json_object"}
+            raw_output = await self._complete(messages, usage, model, on_partial)
             
-            response = await self.client.chat.completions.create(**api_params)
+            try:
+                extracted_data, repaired = parse_llm_json(raw_output)
+                if repaired:
+                    print(f"[EXTRACT] Repaired malformed JSON for document {document_id}")
+            except ValueError as e:
+                # Single targeted retry: show the model its own output and the parse error
+                print(f"[EXTRACT] JSON parse failed ({str(e)}), retrying once")
+                messages = messages + [
+                    {"role": "assistant", "content": raw_output or ""},
+                    {"role": "user", "content": JSON_RETRY_PROMPT.format(error=str(e))}
+                ]
+                raw_output = await self._complete(messages, usage, model)
+                extracted_data, _ = parse_llm_json(raw_output)
             
-            raw_output = response.choices[0].message.content
+            if not isinstance(extracted_data, dict):
+                raise ValueError("Extraction response is not a JSON object")
             
-            # Parse JSON from response (handle potential markdown code blocks)
-            json_str = raw_output.strip()
-            if json_str.startswith("```"):
-                # Remove markdown code block if present
-                lines = json_str.split("\n")
-                json_str = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
-            
-            extracted_data = json.loads(json_str)
-            
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse extraction response as JSON: {str(e)}\nResponse: {raw_output[:500]}")
+        except ValueError as e:
+            raise ExtractionError(
+                f"Failed to parse extraction response as JSON: {str(e)}\nResponse: {(raw_output or '')[:500]}",
+                usage, self.usage_service.llm_cost(model, usage), model
+            )
         except Exception as e:
-            raise ValueError(f"Extraction failed: {str(e)}")
+            raise ExtractionError(f"Extraction failed: {str(e)}", usage, self.usage_service.llm_cost(model, usage), model)
         
         processing_time = time.time() - start_time
         
         # Convert to canonical format
         canonical_data = self._to_canonical(extracted_data, document_id)
         fields = self._extract_fields(extracted_data, document_id)
+        self._verify_fields(fields, ocr_result)
         
         return ExtractionResult(
             canonical_data=canonical_data,
             fields=fields,
             processing_time=processing_time,
-            model_name=self.model,
-            raw_response=extracted_data
+            model_name=model,
+            raw_response=extracted_data,
+            usage=usage,
+            prompt_version=self.prompt_builder.version,
+            estimated_cost=self.usage_service.llm_cost(model, usage)
         )
     
+    async def extract_batch(
+        self,
+        documents: List[Tuple[str, OCRResult]],
+        model: Optional[str] = None,
+        on_partial: Optional[Dict[str, PartialCallback]] = None,
+        unanswered_usage: Optional[Dict[str, TokenUsage]] = None
+    ) -> Dict[str, ExtractionResult]:
+        """
+        Extract several small documents with a single completion.
+        
+        Args:
+            documents: (document_id, OCR result) pairs to pack into one request
+            model: Model to use (defaults to the primary model)
+            on_partial: Callbacks by document ID, each passed its document's
+                key fields as soon as its entry in the response is complete
+            unanswered_usage: Filled with the share of the call's usage of
+                each document left without a result, for the caller to
+                count in its retry
+            
+        Returns:
+            ExtractionResults keyed by document ID. Documents that are missing
+            or malformed in the combined response are left out so the caller
+            can retry them singly.
+            
+        Raises:
+            ExtractionError: If the combined response cannot be parsed at all
+        """
+        start_time = time.time()
+        model = model or self.model
+        ocr_texts = [ocr_result.get_full_markdown() for _, ocr_result in documents]
+        messages = self.prompt_builder.build_batch(ocr_texts)
+        
+        async def publish_entry(entry: Any) -> None:
+            index = entry.get("document_index") if isinstance(entry, dict) else None
+            extraction = entry.get("extraction") if isinstance(entry, dict) else None
+            if not isinstance(index, int) or not 1 <= index <= len(documents) or not isinstance(extraction, dict):
+                return
+            callback = on_partial.get(documents[index - 1][0])
+            preview: Dict[str, Any] = {}
+            for key, value in extraction.items():
+                preview.update(self._preview_fields(key, value))
+            if callback and preview:
+                await callback(preview)
+        
+        raw_output = ""
+        usage = TokenUsage()
+        # Attribute the shared call's tokens by each document's share of the input
+        total_chars = sum(len(text) for text in ocr_texts) or 1
+        shares = [len(text) / total_chars for text in ocr_texts]
+        
+        def batch_error(message: str) -> ExtractionError:
+            if unanswered_usage is not None:
+                for (document_id, _), share in zip(documents, shares):
+                    unanswered_usage[document_id] = usage.share(share)
+            return ExtractionError(message, usage, self.usage_service.llm_cost(model, usage), model)
+        
+        try:
+            raw_output = await self._complete(
+                messages, usage, model, batch=True,
+                on_entry=publish_entry if on_partial else None,
+                max_tokens=min(BATCH_MAX_TOKENS_PER_DOCUMENT * len(documents), BATCH_MAX_TOKENS, self.max_output_tokens(model))
+            )
+            data, repaired = parse_llm_json(raw_output)
+            if repaired:
+                print(f"[EXTRACT] Repaired malformed JSON for batch of {len(documents)} documents")
+        except ValueError as e:
+            raise batch_error(f"Failed to parse batch extraction response as JSON: {str(e)}\nResponse: {(raw_output or '')[:500]}")
+        except Exception as e:
+            raise batch_error(f"Batch extraction failed: {str(e)}")
+        
+        entries = data.get("documents") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise batch_error("Batch extraction response has no documents array")
+        
+        by_index: Dict[int, Dict[str, Any]] = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("extraction"), dict):
+                continue
+            index = entry.get("document_index")
+            if isinstance(index, int) and index not in by_index:
+                by_index[index] = entry["extraction"]
+        
+        processing_time = time.time() - start_time
+        
+        results = {}
+        for index, ((document_id, ocr_result), share) in enumerate(zip(documents, shares), start=1):
+            document_usage = usage.share(share)
+            extracted_data = by_index.get(index)
+            if extracted_data is None:
+                if unanswered_usage is not None:
+                    unanswered_usage[document_id] = document_usage
+                continue
+            fields = self._extract_fields(extracted_data, document_id)
+            self._verify_fields(fields, ocr_result)
+            results[document_id] = ExtractionResult(
+                canonical_data=self._to_canonical(extracted_data, document_id),
+                fields=fields,
+                processing_time=processing_time,
+                model_name=model,
+                raw_response=extracted_data,
+                usage=document_usage,
+                prompt_version=self.prompt_builder.version,
+                estimated_cost=self.usage_service.llm_cost(model, document_usage)
+            )
+        
+        return results
+    
+    @staticmethod
+    def max_output_tokens(model: str) -> int:
+        """Completion token limit of a model."""
+        base_model = model.split(":")[1] if model.startswith("ft:") else model
+        matches = [prefix for prefix in MODEL_MAX_OUTPUT_TOKENS if base_model.startswith(prefix)]
+        if not matches:
+            return DEFAULT_MAX_OUTPUT_TOKENS
+        return MODEL_MAX_OUTPUT_TOKENS[max(matches, key=len)]
+    
+    def batch_capacity(self, model: str) -> int:
+        """Most documents a packed request to the model can answer in full."""
+        return min(self.max_output_tokens(model), BATCH_MAX_TOKENS) // BATCH_MAX_TOKENS_PER_DOCUMENT
+    
+    def _response_format(self, model: str, batch: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Pick the strongest response format the model supports.
+        Strict json_schema for structured-output models (and their fine-tunes),
+        json_object for older chat models, nothing for other fine-tunes.
+        """
+        is_finetuned = model.startswith("ft:")
+        base_model = model.split(":")[1] if is_finetuned else model
+        if base_model.startswith(STRUCTURED_OUTPUT_MODEL_PREFIXES):
+            return {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "electricity_bill_batch_extraction" if batch else "electricity_bill_extraction",
+                    "strict": True,
+                    "schema": STRICT_BATCH_EXTRACTION_SCHEMA if batch else STRICT_EXTRACTION_SCHEMA
+                }
+            }
+        if is_finetuned:
+            return None
+        return {"type": "json_object"}
+    
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        usage: TokenUsage,
+        model: str,
+        on_partial: Optional[PartialCallback] = None,
+        batch: bool = False,
+        max_tokens: int = 4000,
+        on_entry: Optional[Callable[[Any], Awaitable[None]]] = None
+    ) -> str:
+        """
+        Run a streamed chat completion and return the full message content.
+        Key fields are passed to on_partial as soon as they are complete, and
+        each entry of a batch response's documents array to on_entry;
+        token usage is added to `usage`.
+        """
+        api_params = {
+            "model": model,
+            "messages": messages,
+            "temperature": 0.1,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            # Route requests sharing the prompt prefix to the same cache
+            "extra_body": {"prompt_cache_key": f"osita-extraction-{self.prompt_builder.version}"}
+        }
+        
+        response_format = self._response_format(model, batch=batch)
+        if response_format:
+            api_params["response_format"] = response_format
+        
+        stream = await self.client.chat.completions.create(**api_params)
+        parser = StreamingJSONParser()
+        entry_parser = StreamingJSONArrayParser()
+        preview: Dict[str, Any] = {}
+        content: List[str] = []
+        refusal: List[str] = []
+        call_usage = None
+        
+        async for chunk in stream:
+            # Usage arrives on the final chunk, which has no choices
+            if getattr(chunk, "usage", None):
+                call_usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if getattr(delta, "refusal", None):
+                refusal.append(delta.refusal)
+            if not delta.content:
+                continue
+            content.append(delta.content)
+            
+            if on_entry is not None:
+                for entry in entry_parser.feed(delta.content):
+                    try:
+                        await on_entry(entry)
+                    except Exception as e:
+                        print(f"[EXTRACT] Partial update failed: {str(e)}")
+            if on_partial is None:
+                continue
+            updates = {}
+            for key, value in parser.feed(delta.content):
+                updates.update(self._preview_fields(key, value))
+            if updates:
+                preview.update(updates)
+                try:
+                    await on_partial(dict(preview))
+                except Exception as e:
+                    # Progress reporting must never fail the extraction
+                    print(f"[EXTRACT] Partial update failed: {str(e)}")
+        
+        usage.add(call_usage)
+        
+        if refusal:
+            raise RuntimeError(f"Model refused extraction: {''.join(refusal)}")
+        
+        return "".join(content)
+    
+    @staticmethod
+    def _preview_fields(key: str, value: Any) -> Dict[str, Any]:
+        """Map a completed top-level response member to review preview fields."""
+        if key == "supplier" and value:
+            return {"supplier": value}
+        if key == "billing_period" and isinstance(value, dict):
+            return {
+                "period_start": value.get("start_date"),
+                "period_end": value.get("end_date")
+            }
+        if key == "total_consumption" and isinstance(value, dict) and value.get("value") is not None:
+            return {
+                "total_consumption": value.get("value"),
+                "total_consumption_unit": value.get("unit")
+            }
+        return {}
+    
     def _to_canonical(self, data: Dict, document_id: str) -> Dict[str, Any]:
         """Convert extracted data to canonical Osita JSON format."""
         # Normalize consumption to MWh
-        total_consumption = data.get("total_consumption", {})
-        consumption_value = total_consumption.get("value", 0)
-        consumption_unit = total_consumption.get("unit", "kWh")
-        normalized_mwh = self._normalize_to_mwh(consumption_value, consumption_unit)
+        total_consumption = data.get("total_consumption") or {}
+        consumption_value = total_consumption.get("value") or 0
+        consumption_unit = total_consumption.get("unit") or DEFAULT_UNIT
+        normalized_mwh = to_mwh(consumption_value, consumption_unit, MACHINE_LANGUAGE)
+        if normalized_mwh is None:
+            # Unrecognized unit (flagged by validation): assume kWh
+            normalized_mwh = to_mwh(consumption_value, DEFAULT_UNIT, MACHINE_LANGUAGE) or 0
         
         # Build canonical bill structure
         bill = {
@@ -236,15 +589,25 @@ class ExtractionService:
             "supplier": data.get("supplier"),
             "billing_period": data.get("billing_period"),
             "site_address": data.get("site_address"),
-            "meter_ids": [m.get("meter_id") for m in data.get("meter_readings", []) if m.get("meter_id")],
-            "line_items": data.get("line_items", []),
+            "meter_ids": [m.get("meter_id") for m in data.get("meter_readings") or [] if m.get("meter_id")],
+            "meter_readings": [
+                {
+                    "meter_id": m.get("meter_id"),
+                    "reading_start": m.get("reading_start"),
+                    "reading_end": m.get("reading_end"),
+                    "consumption": m.get("consumption"),
+                    "unit": m.get("unit")
+                }
+                for m in data.get("meter_readings") or [] if m.get("meter_id")
+            ],
+            "line_items": data.get("line_items") or [],
             "total_consumption": {
                 "value": consumption_value,
                 "unit": consumption_unit,
                 "normalized_mwh": normalized_mwh
             },
-            "total_amount": data.get("total_amount", {}).get("value"),
-            "currency": data.get("total_amount", {}).get("currency")
+            "total_amount": (data.get("total_amount") or {}).get("value"),
+            "currency": (data.get("total_amount") or {}).get("currency")
         }
         
         return {
@@ -257,17 +620,18 @@ class ExtractionService:
     def _extract_fields(self, data: Dict, document_id: str) -> List[Dict[str, Any]]:
         """Extract individual fields with evidence for review UI."""
         fields = []
-        evidence_map = {e["field"]: e for e in data.get("evidence", [])}
+        evidence_map = {e["field"]: e for e in data.get("evidence") or [] if e.get("field")}
         
-        # Helper to create field entry
-        def add_field(name: str, field_type: str, value: Any, unit: str = None):
-            evidence = evidence_map.get(name, {})
+        # Helper to create field entry; the model may cite a value under the
+        # name of its parent object (e.g. both dates under "billing_period")
+        def add_field(name: str, field_type: str, value: Any, unit: str = None, cited_as: tuple = ()):
+            evidence = next((evidence_map[key] for key in (name,) + cited_as if key in evidence_map), {})
             fields.append({
                 "field_name": name,
                 "field_type": field_type,
                 "value": str(value) if value is not None else None,
                 "unit": unit,
-                "confidence": evidence.get("confidence", 0.5),
+                "confidence": evidence.get("confidence") if evidence.get("confidence") is not None else 0.5,
                 "source_page": evidence.get("page"),
                 "source_quote": evidence.get("quote"),
                 "status": "unconfirmed"
@@ -280,9 +644,9 @@ class ExtractionService:
         if data.get("billing_period"):
             bp = data["billing_period"]
             if bp.get("start_date"):
-                add_field("period_start", "period_start", bp["start_date"])
+                add_field("period_start", "period_start", bp["start_date"], cited_as=("billing_period",))
             if bp.get("end_date"):
-                add_field("period_end", "period_end", bp["end_date"])
+                add_field("period_end", "period_end", bp["end_date"], cited_as=("billing_period",))
         
         if data.get("site_address"):
             add_field("site_address", "site_address", data["site_address"])
@@ -296,25 +660,33 @@ class ExtractionService:
             add_field("total_amount", "total_amount", ta.get("value"), ta.get("currency"))
         
         # Add meter readings
-        for i, meter in enumerate(data.get("meter_readings", [])):
+        for i, meter in enumerate(data.get("meter_readings") or []):
             if meter.get("meter_id"):
-                add_field(f"meter_{i}_id", "meter_id", meter["meter_id"])
+                add_field(f"meter_{i}_id", "meter_id", meter["meter_id"], cited_as=(f"meter_readings[{i}].meter_id", f"meter_readings[{i}]"))
             if meter.get("consumption"):
-                add_field(f"meter_{i}_consumption", "consumption", meter["consumption"], meter.get("unit"))
+                add_field(
+                    f"meter_{i}_consumption", "consumption", meter["consumption"], meter.get("unit"),
+                    cited_as=(f"meter_readings[{i}].consumption", f"meter_readings[{i}]")
+                )
         
+        self._normalize_fields(fields)
         return fields
     
-    def _normalize_to_mwh(self, value: float, unit: str) -> float:
-        """Convert consumption value to MWh."""
-        if unit == "MWh":
-            return value
-        elif unit == "kWh":
-            return value / 1000
-        elif unit == "TJ":
-            return value * 277.778  # 1 TJ = 277.778 MWh
-        else:
-            # Assume kWh if unknown
-            return value / 1000
+    @staticmethod
+    def _normalize_fields(fields: List[Dict[str, Any]]) -> None:
+        """Fill normalized_value/normalized_unit (MWh) on energy fields."""
+        normalized = normalize_many([(f["value"], f["unit"], MACHINE_LANGUAGE) for f in fields])
+        for field, result in zip(fields, normalized):
+            if result:
+                field["normalized_value"] = format_normalized(result[0])
+                field["normalized_unit"] = result[1]
+    
+    def _verify_fields(self, fields: List[Dict[str, Any]], ocr_result: OCRResult) -> None:
+        """
+        Replace self-reported confidence with confidence computed from the
+        cited evidence, and locate each quote in the OCR text.
+        """
+        ConfidenceScorer(EvidenceLocator(ocr_result.pages)).score_fields(fields)
 
 
 class MockExtractionService(ExtractionService):
@@ -323,7 +695,9 @@ class MockExtractionService(ExtractionService):
     async def extract_from_ocr(
         self, 
         ocr_result: OCRResult,
-        document_id: str
+        document_id: str,
+        on_partial: Optional[PartialCallback] = None,
+        model: Optional[str] = None
     ) -> ExtractionResult:
         """Return mock extraction result."""
         mock_data = {
@@ -347,14 +721,37 @@ class MockExtractionService(ExtractionService):
             ]
         }
         
+        if on_partial:
+            preview: Dict[str, Any] = {}
+            for key, value in mock_data.items():
+                preview.update(self._preview_fields(key, value))
+            await on_partial(preview)
+        
         canonical_data = self._to_canonical(mock_data, document_id)
         fields = self._extract_fields(mock_data, document_id)
+        self._verify_fields(fields, ocr_result)
         
         return ExtractionResult(
             canonical_data=canonical_data,
             fields=fields,
             processing_time=0.5,
             model_name="mock-model",
-            raw_response=mock_data
+            raw_response=mock_data,
+            estimated_cost=0.0
         )
+    
+    async def extract_batch(
+        self,
+        documents: List[Tuple[str, OCRResult]],
+        model: Optional[str] = None,
+        on_partial: Optional[Dict[str, PartialCallback]] = None,
+        unanswered_usage: Optional[Dict[str, TokenUsage]] = None
+    ) -> Dict[str, ExtractionResult]:
+        """Return mock extraction results for each document."""
+        return {
+            document_id: await self.extract_from_ocr(
+                ocr_result, document_id, on_partial=(on_partial or {}).get(document_id), model=model
+            )
+            for document_id, ocr_result in documents
+        }
 
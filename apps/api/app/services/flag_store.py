@@ -0,0 +1,102 @@
+"""
+Flag Store
+Persists validation flags as the set of live issues: flags are matched to
+stored rows by identity, updated in place (keeping acknowledgements and
+resolutions), and rows no longer raised are deleted.
+"""
+import hashlib
+import json
+from typing import Optional, Dict, List
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from ..models.validation import ValidationFlag as FlagModel
+from .validation_service import ValidationFlag
+
+
+# Which validation run raised a flag; each run only replaces its own flags
+SOURCE_DOCUMENT = "document"
+SOURCE_PROJECT = "project"
+
+# Codes raised by project validation only; document runs stored them too
+# before, and those copies are dropped when the project is validated
+PROJECT_CODES = ("LOW_CONFIDENCE",)
+
+
+def flag_keys(flags: List[ValidationFlag], source: str) -> List[str]:
+    """Stable key per flag; repeats of an identity are numbered in order."""
+    seen: Dict[tuple, int] = {}
+    keys = []
+    for flag in flags:
+        identity = (source,) + flag.identity()
+        ordinal = seen.get(identity, 0)
+        seen[identity] = ordinal + 1
+        keys.append(hashlib.sha256(json.dumps(identity + (ordinal,)).encode("utf-8")).hexdigest())
+    return keys
+
+
+def save_flags(
+    db: Session,
+    project_id: str,
+    flags: List[ValidationFlag],
+    source: str,
+    document_id: Optional[str] = None
+) -> List[FlagModel]:
+    """
+    Replace the stored flags of one validation run with its new flags.
+
+    Args:
+        db: Session; the caller commits
+        project_id: Project the flags belong to
+        flags: Flags raised by the run
+        source: SOURCE_DOCUMENT (processing one document) or SOURCE_PROJECT
+        document_id: The processed document, for SOURCE_DOCUMENT
+
+    Returns:
+        The stored rows, in the order of flags
+    """
+    query = db.query(FlagModel).filter(FlagModel.project_id == project_id)
+    if source == SOURCE_DOCUMENT:
+        # Also replaces rows stored before flags had keys
+        query = query.filter(
+            FlagModel.document_id == document_id,
+            or_(FlagModel.source == source, FlagModel.source.is_(None))
+        )
+    else:
+        query = query.filter(or_(
+            FlagModel.source == source,
+            FlagModel.code.in_(PROJECT_CODES)
+        ))
+
+    existing: Dict[str, FlagModel] = {}
+    stale: List[FlagModel] = []
+    for row in query.all():
+        if row.flag_key and row.source == source:
+            existing[row.flag_key] = row
+        else:
+            stale.append(row)
+
+    rows = []
+    for flag, key in zip(flags, flag_keys(flags, source)):
+        row = existing.pop(key, None)
+        if row is None:
+            row = FlagModel(project_id=project_id, source=source, flag_key=key)
+            db.add(row)
+        row.document_id = flag.document_id or (document_id if source == SOURCE_DOCUMENT else None)
+        row.code = flag.code
+        row.category = flag.category
+        row.severity = flag.severity
+        row.message = flag.message
+        row.suggestion = flag.suggestion
+        row.field_name = flag.field_name
+        row.expected_value = flag.expected_value
+        row.actual_value = flag.actual_value
+        row.context = flag.context
+        rows.append(row)
+
+    # Issues that are gone
+    for row in list(existing.values()) + stale:
+        db.delete(row)
+
+    return rows
@@ -0,0 +1,274 @@
+"""
+JSON Repair Utilities
+Tolerant parsing of JSON produced by language models.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+
+# Maximum number of truncation checkpoints tried before giving up
+MAX_REPAIR_CHECKPOINTS = 64
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove a surrounding markdown code block (```json ... ```) if present."""
+    stripped = text.strip()
+    if not stripped.startswith("```"):
+        return stripped
+    lines = stripped.split("\n")
+    lines = lines[1:]
+    if lines and lines[-1].strip() == "```":
+        lines = lines[:-1]
+    return "\n".join(lines).strip()
+
+
+def _closers(stack: List[str]) -> str:
+    """Closing brackets for an open container stack."""
+    return "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair common defects in model-produced JSON.
+
+    Handles code fences, prose before/after the value, trailing commas,
+    mismatched closing brackets and truncated output (unterminated strings,
+    dangling keys, unclosed containers). The input is scanned once; on
+    truncation the output is cut back to the last complete value.
+
+    Raises:
+        ValueError: If no JSON object or array could be recovered
+    """
+    text = strip_code_fences(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("No JSON object found in response")
+
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, stack snapshot) after each complete member of a container
+    checkpoints: List[Tuple[int, List[str]]] = []
+    in_string = False
+    escaped = False
+    complete = False
+
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+            checkpoints.append((len(out), list(stack)))
+        elif ch in "}]":
+            # Drop trailing commas: {"a": 1,} -> {"a": 1}
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            if not stack or stack[-1] != ch:
+                continue  # Stray closing bracket
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                complete = True
+                break  # Ignore anything after the top-level value
+        elif ch == ",":
+            checkpoints.append((len(out), list(stack)))
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    if complete:
+        return "".join(out)
+
+    # Truncated output: close the string and containers, then fall back to
+    # the most recent checkpoint that yields valid JSON.
+    candidate = "".join(out) + ('"' if in_string else "") + _closers(stack)
+    try:
+        json.loads(candidate)
+        return candidate
+    except json.JSONDecodeError:
+        pass
+
+    for length, snapshot in reversed(checkpoints[-MAX_REPAIR_CHECKPOINTS:]):
+        candidate = "".join(out[:length]).rstrip(" \t\r\n,") + _closers(snapshot)
+        try:
+            json.loads(candidate)
+            return candidate
+        except json.JSONDecodeError:
+            continue
+
+    raise ValueError("Could not repair truncated JSON response")
+
+
+def parse_llm_json(text: str) -> Tuple[Any, bool]:
+    """
+    Parse JSON from a model response, repairing it if needed.
+
+    Returns:
+        Tuple of (parsed data, whether a repair was required)
+
+    Raises:
+        ValueError: If the response cannot be parsed even after repair
+    """
+    if text is None:
+        raise ValueError("Empty response")
+
+    try:
+        return json.loads(strip_code_fences(text)), False
+    except json.JSONDecodeError:
+        pass
+
+    repaired = repair_json(text)
+    try:
+        return json.loads(repaired), True
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON after repair: {str(e)}")
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a streamed JSON object.
+
+    Feed response chunks as they arrive; each call returns the top-level
+    members (key, value) that became complete with that chunk. Each chunk is
+    scanned only once.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: Optional[int] = None
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return newly completed top-level members."""
+        members: List[Tuple[str, Any]] = []
+        if self._done or not chunk:
+            return members
+
+        self._text += chunk
+        text = self._text
+        i = self._pos
+
+        while i < len(text) and not self._done:
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                # Skip code fences or prose until the top-level object opens
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(text[self._member_start:i], members)
+                    self._done = True
+            elif ch == "," and self._depth == 1:
+                self._emit(text[self._member_start:i], members)
+                self._member_start = i + 1
+            i += 1
+
+        self._pos = i
+        return members
+
+    @staticmethod
+    def _emit(member_text: str, members: List[Tuple[str, Any]]) -> None:
+        """Parse a single `"key": value` member and collect it."""
+        if not member_text.strip():
+            return
+        try:
+            parsed = json.loads("{" + member_text + "}")
+        except json.JSONDecodeError:
+            return
+        members.extend(parsed.items())
+
+
+class StreamingJSONArrayParser:
+    """
+    Incremental parser for a streamed JSON object whose first array member
+    holds objects, e.g. {"documents": [{...}, {...}]}.
+
+    Feed response chunks as they arrive; each call returns the array's
+    objects that became complete with that chunk. Each chunk is scanned
+    only once.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._in_array = False
+        self._item_start: Optional[int] = None
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return newly completed array items."""
+        items: List[Any] = []
+        if self._done or not chunk:
+            return items
+
+        self._text += chunk
+        text = self._text
+        i = self._pos
+
+        while i < len(text) and not self._done:
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                # Skip code fences or prose until the top-level object opens
+                if ch == "{":
+                    self._depth = 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1 and not self._in_array:
+                    self._in_array = True
+                elif ch == "{" and self._depth == 2 and self._in_array:
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = None
+                elif self._depth == 1 and self._in_array:
+                    # Only the first array is followed
+                    self._done = True
+            i += 1
+
+        self._pos = i
+        return items
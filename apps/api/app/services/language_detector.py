@@ -0,0 +1,148 @@
+"""
+Language Detector
+Table-driven script and language detection for OCR pages.
+"""
+import re
+from collections import Counter
+from typing import Optional, Dict, List, Tuple
+
+
+# Non-Latin scripts (first-letter code point ranges), decided by their
+# share of letters
+SCRIPT_RANGES = (
+    ("ar", ((0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF))),
+    ("el", ((0x0370, 0x03FF), (0x1F00, 0x1FFF))),
+    ("bg", ((0x0400, 0x04FF),)),
+)
+
+# Minimum share of letters in a script for it to decide the language
+MIN_SCRIPT_RATIO = 0.2
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Frequent function words and billing vocabulary per Latin-script language
+LANGUAGE_WORDS = {
+    "en": "the and of to for your this is with from on by at are you be account bill billing invoice statement total amount due date period supply electricity energy usage charges customer meter reading payment",
+    "fr": "le la les de des du et un une pour votre vous est sur au aux avec par facture montant total date période électricité énergie consommation compteur relevé client échéance tva abonnement fournisseur",
+    "de": "der die das und den dem des ist ein eine für ihre sie mit von zu auf im bei rechnung betrag gesamt datum zeitraum strom energie verbrauch zähler zählerstand kunde kundennummer abrechnung netto brutto",
+    "es": "el la los las de del y en un una para su con por es al factura importe total fecha periodo electricidad energía consumo contador lectura cliente pago suministro iva",
+    "it": "il lo la gli le di del della e per con su un una è al bolletta fattura importo totale data periodo elettricità energia consumo contatore lettura cliente pagamento fornitura iva",
+    "nl": "de het een en van voor uw met op is te bij aan factuur bedrag totaal datum periode elektriciteit stroom energie verbruik meter meterstand klant betaling levering btw",
+    "pt": "o a os as de do da dos das e em um uma para com por é ao fatura valor total data período eletricidade energia consumo contador leitura cliente pagamento fornecimento",
+    "pl": "i w na z do się że jest nie za od dla faktura kwota razem data okres energia elektryczna zużycie licznik odczyt klient płatność sprzedawca netto brutto vat",
+    "sv": "och att det som en är för på med av till den har faktura belopp totalt datum period el elektricitet energi förbrukning mätare mätarställning kund betalning moms",
+    "da": "og at det som en er for på med af til den har faktura beløb total dato periode el elektricitet energi forbrug måler målerstand kunde betaling moms",
+    "cs": "a v na se je s z do pro že k od faktura částka celkem datum období elektřina energie spotřeba elektroměr odečet zákazník platba dph",
+    "ro": "și în de la cu pe un o este pentru din care factura suma total data perioada energie electrică electricitate consum contor citire client plată furnizor tva",
+}
+
+# Letters that are (nearly) unique to a language, weighted per occurrence
+LANGUAGE_CHARACTERS = {
+    "fr": "éèêëàâçùûôîïœ",
+    "de": "äöüß",
+    "es": "ñáíóú¿¡",
+    "it": "àèìòù",
+    "pt": "ãõçáâêô",
+    "pl": "ąćęłńśźż",
+    "sv": "åäö",
+    "da": "æøå",
+    "cs": "čďěňřšťůž",
+    "ro": "ăâîșțşţ",
+}
+
+CHARACTER_WEIGHT = 0.5
+
+# Minimum evidence (word hits + weighted characters) to name a language
+MIN_LANGUAGE_SCORE = 3
+
+
+def _build_word_table() -> Dict[str, Tuple[str, ...]]:
+    """word -> languages it belongs to (shared words count for each)."""
+    table: Dict[str, List[str]] = {}
+    for language, words in LANGUAGE_WORDS.items():
+        for word in words.split():
+            table.setdefault(word, []).append(language)
+    return {word: tuple(languages) for word, languages in table.items()}
+
+
+def _build_character_table() -> Dict[str, Tuple[str, ...]]:
+    """distinctive letter -> languages it points to."""
+    table: Dict[str, List[str]] = {}
+    for language, chars in LANGUAGE_CHARACTERS.items():
+        for ch in chars:
+            table.setdefault(ch, []).append(language)
+    return {ch: tuple(languages) for ch, languages in table.items()}
+
+
+WORD_TABLE = _build_word_table()
+CHARACTER_TABLE = _build_character_table()
+
+
+def _script(word: str) -> Optional[str]:
+    """Non-Latin script of a word, from its first letter."""
+    code = ord(word[0])
+    if code < 0x0370:
+        return None
+    for language, ranges in SCRIPT_RANGES:
+        if any(low <= code <= high for low, high in ranges):
+            return language
+    return None
+
+
+def detect_language(text: str) -> str:
+    """
+    Detect the language of a text.
+
+    The text is tokenized once; all counting is then done over the distinct
+    words, which are few even for long documents. Non-Latin scripts (Arabic,
+    Greek, Cyrillic) are decided by their share of letters, Latin-script
+    languages by frequent-word and distinctive-letter counts. Returns an
+    ISO 639-1 code, or "unknown".
+    """
+    if not text:
+        return "unknown"
+
+    word_counts = Counter(WORD_PATTERN.findall(text.lower()))
+    if not word_counts:
+        return "unknown"
+
+    letters = 0
+    script_letters: Counter = Counter()
+    scores: Counter = Counter()
+
+    for word, count in word_counts.items():
+        length = len(word) * count
+        letters += length
+        script = _script(word)
+        if script:
+            script_letters[script] += length
+            continue
+        for language in WORD_TABLE.get(word, ()):
+            scores[language] += count
+        for ch in word:
+            for language in CHARACTER_TABLE.get(ch, ()):
+                scores[language] += CHARACTER_WEIGHT * count
+
+    if script_letters:
+        script, script_count = script_letters.most_common(1)[0]
+        if script_count / letters > MIN_SCRIPT_RATIO:
+            return script
+
+    if not scores:
+        return "unknown"
+    language, score = scores.most_common(1)[0]
+    return language if score >= MIN_LANGUAGE_SCORE else "unknown"
+
+
+def dominant_language(pages: List[Tuple[str, int]]) -> str:
+    """
+    Document language from (page language, page text length) pairs:
+    the language covering the most text, ignoring undetected pages.
+    """
+    weights: Counter = Counter()
+    for language, length in pages:
+        if language and language != "unknown":
+            weights[language] += length
+    if not weights:
+        return "unknown"
+    return weights.most_common(1)[0][0]
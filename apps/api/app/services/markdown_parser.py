@@ -0,0 +1,180 @@
+"""
+Markdown Parser
+Parses OCR page markdown once into a structured form: headings, key-value
+lines and tables with typed columns.
+"""
+import re
+from datetime import date
+from typing import Optional, Dict, Any, List, Tuple
+
+from .unit_normalizer import parse_number
+
+
+# Bump when the structure layout or value parsing changes, so stored structures are re-parsed
+STRUCTURE_VERSION = 2
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+KEY_VALUE_PATTERN = re.compile(r"^\s*(?:[-*+]\s+)?\**([^:|*#][^:|*]{0,59}?)\**\s*:\s*\**\s*(.+?)\s*$")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$")
+QUANTITY_PATTERN = re.compile(r"^([-+]?\d[\d\s.,'’]*)\s*([^\d\s].*)?$")
+DATE_PATTERNS = (
+    (re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$"), ("y", "m", "d")),
+    (re.compile(r"^(\d{1,2})[./-](\d{1,2})[./-](\d{4})$"), ("d", "m", "y")),
+)
+
+# Units recognized in quantity cells
+QUANTITY_UNITS = {"kwh", "mwh", "gwh", "wh", "tj", "gj", "kw", "mw", "kva", "kvarh", "eur", "€", "usd", "$", "gbp", "£", "%"}
+
+
+def parse_date(token: str) -> Optional[str]:
+    """Parse a numeric date (ISO or day-first) to YYYY-MM-DD."""
+    token = token.strip()
+    for pattern, order in DATE_PATTERNS:
+        match = pattern.match(token)
+        if not match:
+            continue
+        parts = dict(zip(order, (int(g) for g in match.groups())))
+        # Day-first unless that is impossible (e.g. 01/31/2024)
+        if parts["m"] > 12 >= parts["d"]:
+            parts["d"], parts["m"] = parts["m"], parts["d"]
+        try:
+            return date(parts["y"], parts["m"], parts["d"]).isoformat()
+        except ValueError:
+            return None
+    return None
+
+
+def parse_quantity(token: str, language: Optional[str] = None) -> Optional[Tuple[float, Optional[str]]]:
+    """Parse "10 500 kWh" / "€187.50" style cells to (value, unit)."""
+    token = token.strip().replace("**", "")
+    for symbol in ("€", "$", "£"):
+        if token.startswith(symbol):
+            token = token[len(symbol):].strip() + " " + symbol
+    match = QUANTITY_PATTERN.match(token)
+    if not match:
+        return None
+    value = parse_number(match.group(1), language)
+    if value is None:
+        return None
+    unit = (match.group(2) or "").strip() or None
+    if unit is not None and unit.lower() not in QUANTITY_UNITS:
+        return None
+    return value, unit
+
+
+def _clean(text: str) -> str:
+    """Strip markdown emphasis from inline text."""
+    return re.sub(r"[*_`]+", "", text).strip()
+
+
+def _split_row(line: str) -> List[str]:
+    """Split a markdown table row into cells (escaped pipes are kept)."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [_clean(cell.replace("\\|", "|")) for cell in re.split(r"(?<!\\)\|", line)]
+
+
+def _type_column(cells: List[str], language: Optional[str]) -> Dict[str, Any]:
+    """Infer a column's type from its non-empty cells."""
+    cells = [c for c in cells if c]
+    if not cells:
+        return {"type": "text", "unit": None}
+    if all(parse_date(c) for c in cells):
+        return {"type": "date", "unit": None}
+    quantities = [parse_quantity(c, language) for c in cells]
+    if all(quantities):
+        units = {q[1] for q in quantities}
+        if units == {None}:
+            return {"type": "number", "unit": None}
+        if len(units) == 1:
+            return {"type": "quantity", "unit": units.pop()}
+    return {"type": "text", "unit": None}
+
+
+def _typed_value(cell: str, column_type: str, language: Optional[str]) -> Any:
+    """Cell value converted to its column type (None for empty cells)."""
+    if not cell:
+        return None
+    if column_type == "date":
+        return parse_date(cell)
+    if column_type in ("number", "quantity"):
+        return parse_quantity(cell, language)[0]
+    return cell
+
+
+def _parse_table(lines: List[str], start: int, section: Optional[str], language: Optional[str]) -> Dict[str, Any]:
+    """Build a table from its header, separator and body lines."""
+    header = _split_row(lines[0])
+    rows = [_split_row(line) for line in lines[2:]]
+    width = len(header)
+    rows = [(row + [""] * width)[:width] for row in rows]
+
+    columns = []
+    for i, name in enumerate(header):
+        column = {"name": name, **_type_column([row[i] for row in rows], language)}
+        columns.append(column)
+
+    return {
+        "section": section,
+        "line": start,
+        "columns": columns,
+        "rows": rows,
+        "values": [
+            [_typed_value(cell, columns[i]["type"], language) for i, cell in enumerate(row)]
+            for row in rows
+        ]
+    }
+
+
+def parse_markdown(markdown: str, language: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse page markdown into headings, key-value lines and tables.
+
+    Each item records its 0-based line number and, for key-values and
+    tables, the nearest preceding heading ("section"). The page language,
+    when known, decides ambiguous number formats in table cells.
+    """
+    headings: List[Dict[str, Any]] = []
+    key_values: List[Dict[str, Any]] = []
+    tables: List[Dict[str, Any]] = []
+    section: Optional[str] = None
+
+    lines = (markdown or "").splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if line.startswith("|") and i + 1 < len(lines) and TABLE_SEPARATOR_PATTERN.match(lines[i + 1].strip()):
+            end = i + 2
+            while end < len(lines) and lines[end].strip().startswith("|"):
+                end += 1
+            tables.append(_parse_table([l.strip() for l in lines[i:end]], i, section, language))
+            i = end
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            section = _clean(heading.group(2))
+            headings.append({"level": len(heading.group(1)), "text": section, "line": i})
+        else:
+            key_value = KEY_VALUE_PATTERN.match(line)
+            if key_value and "://" not in line:
+                value = _clean(key_value.group(2))
+                if value:
+                    key_values.append({
+                        "key": _clean(key_value.group(1)),
+                        "value": value,
+                        "section": section,
+                        "line": i
+                    })
+        i += 1
+
+    return {
+        "version": STRUCTURE_VERSION,
+        "headings": headings,
+        "key_values": key_values,
+        "tables": tables
+    }
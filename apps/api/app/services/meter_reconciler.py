@@ -0,0 +1,101 @@
+"""
+Meter Reconciler
+Checks meter readings across consecutive bills: each bill's consumption
+must equal its reading difference, and each bill must start where the
+previous bill of the same meter ended.
+"""
+from typing import Optional, Dict, Any, List
+
+from .unit_normalizer import parse_number, MACHINE_LANGUAGE
+
+
+# Absolute difference always tolerated (readings are printed rounded)
+READING_TOLERANCE = 1.0
+
+
+class MeterReading:
+    """One meter's readings on one bill."""
+    def __init__(self, meter_id: str, start: float, end: float, consumption: Optional[float], unit: Optional[str], document_id: Optional[str]):
+        self.meter_id = meter_id
+        self.start = start
+        self.end = end
+        self.consumption = consumption
+        self.unit = unit
+        self.document_id = document_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reading_start": self.start,
+            "reading_end": self.end,
+            "consumption": self.consumption,
+            "unit": self.unit,
+            "document": self.document_id
+        }
+
+
+class ReadingIssue:
+    """A reading discrepancy, named after its validation code."""
+    def __init__(self, code: str, reading: MeterReading, expected: float, actual: float, previous: Optional[MeterReading] = None):
+        self.code = code
+        self.reading = reading
+        self.expected = expected
+        self.actual = actual
+        self.previous = previous
+
+
+def bill_readings(bill: Dict[str, Any]) -> List[MeterReading]:
+    """Readings of a canonical bill that have a meter ID and both readings."""
+    readings = []
+    for item in bill.get("meter_readings") or []:
+        start = parse_number(item.get("reading_start"), MACHINE_LANGUAGE)
+        end = parse_number(item.get("reading_end"), MACHINE_LANGUAGE)
+        if not item.get("meter_id") or start is None or end is None:
+            continue
+        readings.append(MeterReading(
+            meter_id=str(item["meter_id"]).strip(),
+            start=start,
+            end=end,
+            consumption=parse_number(item.get("consumption"), MACHINE_LANGUAGE),
+            unit=item.get("unit"),
+            document_id=bill.get("document_id")
+        ))
+    return readings
+
+
+def _differs(expected: float, actual: float, tolerance_percent: float) -> bool:
+    return abs(expected - actual) > max(READING_TOLERANCE, abs(expected) * tolerance_percent / 100)
+
+
+def reconcile_readings(bills: List[Dict[str, Any]], tolerance_percent: float) -> List[ReadingIssue]:
+    """
+    Reconcile meter readings across bills.
+
+    Readings are grouped per meter and sorted by start reading (meter
+    indexes only go up), so consecutive bills are neighbours and every
+    check compares adjacent pairs once:
+    - METER_CONSUMPTION_MISMATCH: consumption differs from end - start
+    - METER_READING_GAP: a bill starts above the previous end (missing bill)
+    - METER_READING_OVERLAP: a bill starts below the previous end
+      (duplicated or overlapping bill)
+    """
+    meters: Dict[str, List[MeterReading]] = {}
+    for bill in bills:
+        for reading in bill_readings(bill):
+            meters.setdefault(reading.meter_id, []).append(reading)
+
+    issues: List[ReadingIssue] = []
+    for meter_id in sorted(meters):
+        readings = sorted(meters[meter_id], key=lambda r: (r.start, r.end))
+
+        for reading in readings:
+            difference = reading.end - reading.start
+            if reading.consumption is not None and _differs(difference, reading.consumption, tolerance_percent):
+                issues.append(ReadingIssue("METER_CONSUMPTION_MISMATCH", reading, difference, reading.consumption))
+
+        for previous, reading in zip(readings, readings[1:]):
+            if not _differs(previous.end, reading.start, 0):
+                continue
+            code = "METER_READING_GAP" if reading.start > previous.end else "METER_READING_OVERLAP"
+            issues.append(ReadingIssue(code, reading, previous.end, reading.start, previous))
+
+    return issues
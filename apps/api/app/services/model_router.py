@@ -0,0 +1,157 @@
+"""
+Model Router
+Sends simple documents to a fast, cheap model and escalates to the large
+model only when the fast extraction looks unreliable.
+"""
+from typing import Optional, Dict, Any
+
+from ..config import get_settings
+from .ocr_service import OCRResult
+from .extraction_service import ExtractionService, ExtractionResult, ExtractionError, PartialCallback
+from .validation_service import ValidationService
+from .extraction_batcher import ExtractionBatcher
+
+
+# Route labels stored on Extraction.route
+ROUTE_FAST = "fast"
+ROUTE_LARGE = "large"
+ROUTE_ESCALATED = "escalated"
+
+# Fields a fast extraction must fill in to be trusted
+KEY_FIELDS = ("total_consumption", "period_start", "period_end")
+
+# Key fields whose evidence confidence is also checked. The model cites the
+# billing dates loosely (often under "billing_period"), so their scores
+# aren't reliable enough to escalate on.
+CONFIDENCE_FIELDS = ("total_consumption",)
+
+
+class RouteDecision:
+    """Initial routing decision for a document."""
+    def __init__(self, route: str, model: str, reason: str):
+        self.route = route
+        self.model = model
+        self.reason = reason
+
+
+class ModelRouter:
+    """
+    Chooses the extraction model per document.
+
+    Documents that are short, have few pages and few table rows (meters,
+    line items) go to the fast model. The fast result is escalated to the
+    large model when the fast model fails, a key field is missing or has
+    low evidence confidence, or document validation raises blocking flags.
+
+    With a batcher, small documents on their initial route are packed with
+    other documents into shared requests; escalations always run singly.
+    """
+
+    def __init__(
+        self,
+        extraction_service: ExtractionService,
+        validation_service: ValidationService,
+        batcher: Optional[ExtractionBatcher] = None
+    ):
+        self.settings = get_settings()
+        self.extraction_service = extraction_service
+        self.validation_service = validation_service
+        self.batcher = batcher
+
+    def route(self, ocr_result: OCRResult) -> RouteDecision:
+        """Pick the initial model from document complexity."""
+        large_model = self.extraction_service.model
+        fast_model = self.extraction_service.fast_model
+
+        if not self.settings.routing_enabled or fast_model == large_model:
+            return RouteDecision(ROUTE_LARGE, large_model, "routing disabled")
+
+        if ocr_result.page_count > self.settings.routing_max_fast_pages:
+            return RouteDecision(ROUTE_LARGE, large_model, f"{ocr_result.page_count} pages")
+
+        text = ocr_result.get_full_markdown()
+        if len(text) > self.settings.routing_max_fast_chars:
+            return RouteDecision(ROUTE_LARGE, large_model, f"{len(text)} characters")
+
+        table_rows = sum(len(table["rows"]) for table in ocr_result.get_tables())
+        if table_rows > self.settings.routing_max_fast_table_rows:
+            return RouteDecision(ROUTE_LARGE, large_model, f"{table_rows} table rows")
+
+        return RouteDecision(ROUTE_FAST, fast_model, "simple document")
+
+    def escalation_reason(self, result: ExtractionResult, document_id: str) -> Optional[str]:
+        """Why a fast extraction should be redone with the large model, or None."""
+        fields: Dict[str, Dict[str, Any]] = {f["field_name"]: f for f in result.fields}
+
+        for name in KEY_FIELDS:
+            field = fields.get(name)
+            if not field or field.get("value") in (None, ""):
+                return f"missing {name}"
+            confidence = field.get("confidence")
+            if name in CONFIDENCE_FIELDS and confidence is not None and confidence < self.settings.routing_min_confidence:
+                return f"low confidence on {name} ({confidence:.2f})"
+
+        validation = self.validation_service.validate_document(result.canonical_data, document_id)
+        if validation.blocking_count > 0:
+            codes = ", ".join(sorted({f.code for f in validation.flags if f.severity.value == "blocking"}))
+            return f"blocking flags: {codes}"
+
+        return None
+
+    async def extract(
+        self,
+        ocr_result: OCRResult,
+        document_id: str,
+        on_partial: Optional[PartialCallback] = None
+    ) -> ExtractionResult:
+        """
+        Extract with the routed model, escalating once if needed.
+        The returned result carries the combined usage, cost and latency of
+        every attempt, plus the route taken; so does an ExtractionError
+        raised when the last attempt fails.
+        """
+        decision = self.route(ocr_result)
+        print(f"[ROUTER] {decision.route} route ({decision.model}): {decision.reason}")
+
+        try:
+            if self.batcher is not None and self.batcher.accepts(ocr_result):
+                result = await self.batcher.extract(
+                    ocr_result, document_id, model=decision.model, on_partial=on_partial
+                )
+            else:
+                result = await self.extraction_service.extract_from_ocr(
+                    ocr_result, document_id, on_partial=on_partial, model=decision.model
+                )
+        except Exception as e:
+            if isinstance(e, ExtractionError):
+                e.route = decision.route
+            if decision.route != ROUTE_FAST:
+                raise
+            # A failed or unparseable fast response is retried on the large model;
+            # the calls it made are still counted
+            attempt = (e.usage, e.estimated_cost, 0.0) if isinstance(e, ExtractionError) else None
+            reason = f"fast model failed: {str(e)[:200]}"
+        else:
+            result.route = decision.route
+            if decision.route != ROUTE_FAST:
+                return result
+            reason = self.escalation_reason(result, document_id)
+            if reason is None:
+                return result
+            attempt = (result.usage, result.estimated_cost, result.processing_time)
+
+        print(f"[ROUTER] Escalating to {self.extraction_service.model}: {reason}")
+        try:
+            escalated = await self.extraction_service.extract_from_ocr(
+                ocr_result, document_id, on_partial=on_partial, model=self.extraction_service.model
+            )
+        except ExtractionError as e:
+            e.route = ROUTE_ESCALATED
+            if attempt is not None:
+                e.include_usage(*attempt[:2])
+            raise
+        escalated.route = ROUTE_ESCALATED
+        escalated.escalation_reason = reason
+        if attempt is not None:
+            escalated.include_usage(*attempt)
+        return escalated
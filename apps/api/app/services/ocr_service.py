@@ -11,14 +11,34 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from ..config import get_settings
+from .markdown_parser import parse_markdown, STRUCTURE_VERSION
+from .language_detector import detect_language, dominant_language
 
 
 class OCRPage:
     """Represents a single page of OCR output."""
-    def __init__(self, page_number: int, markdown: str, language: Optional[str] = None):
+    def __init__(
+        self,
+        page_number: int,
+        markdown: str,
+        language: Optional[str] = None,
+        structure: Optional[Dict[str, Any]] = None
+    ):
         self.page_number = page_number
         self.markdown = markdown
         self.language = language
+        # Reuse a stored structure only if it was parsed by the current parser
+        if structure and structure.get("version") == STRUCTURE_VERSION:
+            self._structure = structure
+        else:
+            self._structure = None
+    
+    @property
+    def structure(self) -> Dict[str, Any]:
+        """Headings, key-value lines and typed tables, parsed once on first use."""
+        if self._structure is None:
+            self._structure = parse_markdown(self.markdown, self.language)
+        return self._structure
 
 
 class OCRResult:
@@ -30,7 +50,8 @@ class OCRResult:
         detected_language: str = "unknown",
         processing_time: float = 0.0,
         confidence: float = 0.0,
-        raw_response: Optional[Dict] = None
+        raw_response: Optional[Dict] = None,
+        pages_billed: Optional[int] = None
     ):
         self.pages = pages
         self.page_count = page_count
@@ -38,6 +59,37 @@ class OCRResult:
         self.processing_time = processing_time
         self.confidence = confidence
         self.raw_response = raw_response
+        self.pages_billed = pages_billed if pages_billed is not None else page_count
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "OCRResult":
+        """Rebuild from the stored form produced by to_dict()."""
+        data = data or {}
+        pages = [
+            OCRPage(
+                page_number=p.get("page_number", i + 1),
+                markdown=p.get("markdown") or "",
+                language=p.get("language"),
+                structure=p.get("structure")
+            )
+            for i, p in enumerate(data.get("pages") or [])
+        ]
+        return cls(
+            pages=pages,
+            page_count=data.get("page_count", len(pages)),
+            detected_language=data.get("detected_language", "unknown"),
+            processing_time=data.get("processing_time", 0.0),
+            confidence=data.get("confidence", 0.0),
+            pages_billed=data.get("pages_billed")
+        )
+    
+    def get_tables(self) -> List[Dict[str, Any]]:
+        """Parsed tables of all pages, each tagged with its page number."""
+        return [
+            {"page": p.page_number, **table}
+            for p in self.pages
+            for table in p.structure["tables"]
+        ]
     
     def get_full_markdown(self) -> str:
         """Get all pages concatenated as markdown."""
@@ -50,7 +102,8 @@ class OCRResult:
                 {
                     "page_number": p.page_number,
                     "markdown": p.markdown,
-                    "language": p.language
+                    "language": p.language,
+                    "structure": p.structure
                 }
                 for p in self.pages
             ],
@@ -58,6 +111,7 @@ class OCRResult:
             "detected_language": self.detected_language,
             "processing_time": self.processing_time,
             "confidence": self.confidence,
+            "pages_billed": self.pages_billed,
             "processed_at": datetime.utcnow().isoformat()
         }
 
@@ -161,6 +215,7 @@ class OCRService:
         pages = self._parse_ocr_response(result)
         detected_language = self._detect_language(pages)
         confidence = self._calculate_confidence(result)
+        usage_info = result.get("usage_info") or {}
         
         return OCRResult(
             pages=pages,
@@ -168,7 +223,8 @@ class OCRService:
             detected_language=detected_language,
             processing_time=processing_time,
             confidence=confidence,
-            raw_response=result
+            raw_response=result,
+            pages_billed=usage_info.get("pages_processed", len(pages))
         )
     
     def _parse_ocr_response(self, response: Dict) -> List[OCRPage]:
@@ -194,29 +250,12 @@ class OCRService:
     
     def _detect_language(self, pages: List[OCRPage]) -> str:
         """
-        Detect primary language from OCR output.
-        Simple heuristic based on character analysis.
+        Detect each page's language (stored on OCRPage.language) and
+        return the document's dominant language.
         """
-        all_text = " ".join([p.markdown for p in pages])
-        
-        # Check for Arabic (RTL characters)
-        arabic_chars = sum(1 for c in all_text if '\u0600' <= c <= '\u06FF')
-        # Check for French (accented characters)
-        french_chars = sum(1 for c in all_text if c in 'éèêëàâäùûüôöîïç')
-        
-        total_chars = len(all_text.replace(" ", ""))
-        if total_chars == 0:
-            return "unknown"
-        
-        arabic_ratio = arabic_chars / total_chars
-        french_ratio = french_chars / total_chars
-        
-        if arabic_ratio > 0.2:
-            return "ar"
-        elif french_ratio > 0.02:
-            return "fr"
-        else:
-            return "en"
+        for page in pages:
+            page.language = detect_language(page.markdown)
+        return dominant_language([(p.language, len(p.markdown)) for p in pages])
     
     def _calculate_confidence(self, response: Dict) -> float:
         """
@@ -0,0 +1,168 @@
+"""
+Period Analyzer
+Sort-and-sweep analysis of billing periods: overlaps, gaps and coverage of
+the reporting quarter, per meter or site.
+"""
+import re
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+
+QUARTER_START_MONTHS = {"Q1": 1, "Q2": 4, "Q3": 7, "Q4": 10}
+
+# Group for bills naming neither a meter nor a site
+UNASSIGNED_GROUP = "unassigned"
+
+ONE_DAY = timedelta(days=1)
+
+
+class BillPeriod:
+    """A bill's billing period (both dates inclusive)."""
+    def __init__(self, start: date, end: date, document_id: Optional[str]):
+        self.start = start
+        self.end = end
+        self.document_id = document_id
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": self.start.isoformat(), "end": self.end.isoformat(), "document": self.document_id}
+
+
+class PeriodAnalysis:
+    """Result of sweeping one group's billing periods."""
+    def __init__(self, group: str):
+        self.group = group
+        self.periods: List[BillPeriod] = []
+        # (later period, period it overlaps, overlapping days)
+        self.overlaps: List[Tuple[BillPeriod, BillPeriod, int]] = []
+        # (first uncovered day, last uncovered day)
+        self.gaps: List[Tuple[date, date]] = []
+        self.covered_days = 0
+        self.quarter_days = 0
+
+    @property
+    def coverage_percent(self) -> Optional[float]:
+        if not self.quarter_days:
+            return None
+        return round(self.covered_days / self.quarter_days * 100, 1)
+
+
+def quarter_bounds(reporting_period: Optional[str], reporting_year: Optional[str]) -> Optional[Tuple[date, date]]:
+    """First and last day of a CBAM reporting quarter ("Q1", "2024"), or None."""
+    month = QUARTER_START_MONTHS.get(str(reporting_period or "").upper())
+    try:
+        year = int(reporting_year)
+    except (TypeError, ValueError):
+        return None
+    if not month:
+        return None
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 10 else date(year, month + 3, 1)
+    return start, end - ONE_DAY
+
+
+def bill_period(bill: Dict[str, Any]) -> Optional[BillPeriod]:
+    """Parsed billing period of a canonical bill, or None if incomplete or invalid."""
+    bp = bill.get("billing_period") or {}
+    try:
+        start = date.fromisoformat(bp["start_date"])
+        end = date.fromisoformat(bp["end_date"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if end < start:
+        return None
+    return BillPeriod(start, end, bill.get("document_id"))
+
+
+def bill_group(bill: Dict[str, Any]) -> str:
+    """Meter(s) a bill covers, else its site address, else UNASSIGNED_GROUP."""
+    meters = sorted({str(m).strip() for m in bill.get("meter_ids") or [] if m})
+    if meters:
+        return "meter:" + ",".join(meters)
+    site = re.sub(r"\W+", " ", str(bill.get("site_address") or "")).strip().lower()
+    if site:
+        return "site:" + site
+    return UNASSIGNED_GROUP
+
+
+def analyze_periods(
+    bills: List[Dict[str, Any]],
+    quarter: Optional[Tuple[date, date]] = None
+) -> List[PeriodAnalysis]:
+    """
+    Sweep each group's billing periods in start order.
+
+    A running "covered until" date is kept per group, so each bill is
+    compared once: starting on or before it is an overlap with the bill
+    that extends furthest, starting more than a day after it leaves a gap.
+    Sharing only a boundary day counts as contiguous, since bills dated by
+    meter reading end on the day the next one starts. With a quarter, only
+    gaps inside it are reported (including its uncovered edges) and the
+    share of its days covered by some bill is computed.
+    """
+    groups: Dict[str, PeriodAnalysis] = {}
+    for bill in bills:
+        period = bill_period(bill)
+        if period is None:
+            continue
+        group = bill_group(bill)
+        if group not in groups:
+            groups[group] = PeriodAnalysis(group)
+        groups[group].periods.append(period)
+
+    for analysis in groups.values():
+        _sweep(analysis, quarter)
+
+    return sorted(groups.values(), key=lambda a: a.group)
+
+
+def _sweep(analysis: PeriodAnalysis, quarter: Optional[Tuple[date, date]]) -> None:
+    """Find overlaps, gaps and quarter coverage of one group's periods."""
+    periods = sorted(analysis.periods, key=lambda p: (p.start, p.end))
+    analysis.periods = periods
+
+    gaps: List[Tuple[date, date]] = []
+    covered: List[Tuple[date, date]] = []
+    furthest: Optional[BillPeriod] = None
+
+    for period in periods:
+        if furthest is None:
+            covered.append((period.start, period.end))
+            furthest = period
+            continue
+
+        covered_until = furthest.end
+        if period.start <= covered_until:
+            overlap_days = (min(period.end, covered_until) - period.start).days + 1
+            if overlap_days > 1 or period.start != covered_until:
+                analysis.overlaps.append((period, furthest, overlap_days))
+        elif period.start > covered_until + ONE_DAY:
+            gaps.append((covered_until + ONE_DAY, period.start - ONE_DAY))
+
+        if period.start <= covered_until + ONE_DAY:
+            covered[-1] = (covered[-1][0], max(covered_until, period.end))
+        else:
+            covered.append((period.start, period.end))
+        if period.end > covered_until:
+            furthest = period
+
+    if quarter is None:
+        analysis.gaps = gaps
+        return
+
+    q_start, q_end = quarter
+    analysis.quarter_days = (q_end - q_start).days + 1
+    cursor = q_start
+    for start, end in covered:
+        if end < q_start or start > q_end:
+            continue
+        start, end = max(start, q_start), min(end, q_end)
+        if start > cursor:
+            analysis.gaps.append((cursor, start - ONE_DAY))
+        analysis.covered_days += (end - start).days + 1
+        cursor = end + ONE_DAY
+    if cursor <= q_end:
+        analysis.gaps.append((cursor, q_end))
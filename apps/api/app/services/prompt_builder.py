@@ -0,0 +1,175 @@
+"""
+Prompt Builder - Cache-Friendly Extraction Prompts
+Lays out extraction prompts as a long, stable prefix (instructions, schema,
+few-shot examples) followed by the variable OCR text, so provider-side
+prompt caching applies to everything but the document itself.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from ..config import get_settings
+
+
+# Bump when the prefix layout or instructions change; the prefix hash is
+# appended automatically so example or schema edits also change the version.
+PROMPT_VERSION = "2"
+
+# Shipped with the API (a selection from training/training_data.jsonl), so
+# deployments rooted at apps/api have them too
+DEFAULT_EXAMPLES_PATH = Path(__file__).resolve().parents[1] / "data" / "extraction_examples.jsonl"
+
+SYSTEM_PROMPT = "You are an expert at extracting structured data from electricity bills. Extract all relevant billing information and provide evidence for each field. Always respond with valid JSON."
+
+EXTRACTION_INSTRUCTIONS = """IMPORTANT RULES:
+1. Extract all consumption values with their units (kWh, MWh, or TJ)
+2. Parse dates into YYYY-MM-DD format when possible
+3. For each extracted value, provide evidence: the page number and exact quote from the text
+4. Estimate confidence (0-1) for each extraction based on clarity of the source text
+5. If a value is ambiguous or unclear, still extract it but with lower confidence
+6. Handle multiple meters/sites if present
+7. Support multilingual content (English, French, German, Arabic)
+8. Use null for values that are not present in the document"""
+
+USER_PROMPT = "Extract data from this electricity bill:\n\n{ocr_text}"
+
+BATCH_USER_PROMPT = """Extract data from each of the {count} electricity bills below. Each bill is enclosed in <<<DOCUMENT n>>> ... <<<END DOCUMENT n>>> delimiters; never mix data between bills.
+Respond with {{"documents": [{{"document_index": n, "extraction": {{...}}}}]}}: one entry per bill, where "extraction" follows the OUTPUT JSON SCHEMA.
+
+{documents}"""
+
+BATCH_DOCUMENT_TEMPLATE = "<<<DOCUMENT {index}>>>\n{ocr_text}\n<<<END DOCUMENT {index}>>>"
+
+# Few-shot examples repeated as one packed exchange, so batched requests
+# see the "documents" wrapper answered once
+BATCH_EXAMPLE_DOCUMENTS = 2
+
+
+@lru_cache()
+def load_examples(path: str) -> tuple:
+    """
+    Load (bill text, expected JSON) pairs from a fine-tuning JSONL file.
+    Lines that are malformed or whose answer is not valid JSON are skipped.
+    """
+    examples = []
+    examples_file = Path(path)
+    if not examples_file.exists():
+        print(f"[PROMPT] WARNING: Few-shot examples file not found: {path}")
+        return tuple()
+
+    with open(examples_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                messages = json.loads(line)["messages"]
+                user = next(m["content"] for m in messages if m["role"] == "user")
+                answer = next(m["content"] for m in messages if m["role"] == "assistant")
+                json.loads(answer)
+            except (json.JSONDecodeError, KeyError, StopIteration, TypeError):
+                continue
+            # Strip the instruction line so only the bill text is kept
+            bill_text = user.split("\n\n", 1)[1] if "\n\n" in user else user
+            examples.append((bill_text, answer))
+
+    if not examples:
+        print(f"[PROMPT] WARNING: No valid few-shot examples in {path}")
+    return tuple(examples)
+
+
+def configured_examples_path() -> str:
+    """Configured few-shot examples file, or the one shipped with the API."""
+    return get_settings().extraction_examples_path or str(DEFAULT_EXAMPLES_PATH)
+
+
+class ExtractionPromptBuilder:
+    """
+    Builds versioned extraction prompts with a stable, cacheable prefix.
+    """
+
+    def __init__(
+        self,
+        schema: Dict[str, Any],
+        examples_path: Optional[str] = None,
+        max_examples: Optional[int] = None
+    ):
+        settings = get_settings()
+        self.schema = schema
+        self.examples_path = examples_path or configured_examples_path()
+        self.max_examples = max_examples if max_examples is not None else settings.extraction_few_shot_examples
+        self._prefix: Optional[List[Dict[str, str]]] = None
+        self._batch_example: Optional[List[Dict[str, str]]] = None
+        self._version: Optional[str] = None
+
+    @property
+    def prefix(self) -> List[Dict[str, str]]:
+        """Stable leading messages shared by every extraction request."""
+        if self._prefix is None:
+            system = "\n\n".join([
+                SYSTEM_PROMPT,
+                EXTRACTION_INSTRUCTIONS,
+                "OUTPUT JSON SCHEMA:\n" + json.dumps(self.schema, sort_keys=True, separators=(",", ":"))
+            ])
+            messages = [{"role": "system", "content": system}]
+            for bill_text, answer in self._select_examples():
+                messages.append({"role": "user", "content": USER_PROMPT.format(ocr_text=bill_text)})
+                messages.append({"role": "assistant", "content": answer})
+            self._prefix = messages
+        return self._prefix
+
+    @property
+    def batch_example(self) -> List[Dict[str, str]]:
+        """
+        Example exchange in the packed format, sent after the prefix in
+        batched requests only. Empty when there are no few-shot examples.
+        """
+        if self._batch_example is None:
+            examples = self._select_examples()[:BATCH_EXAMPLE_DOCUMENTS]
+            messages = []
+            if examples:
+                answer = {"documents": [
+                    {"document_index": i, "extraction": json.loads(example_answer)}
+                    for i, (_, example_answer) in enumerate(examples, start=1)
+                ]}
+                messages.append({"role": "user", "content": self._batch_content([text for text, _ in examples])})
+                messages.append({"role": "assistant", "content": json.dumps(answer, ensure_ascii=False)})
+            self._batch_example = messages
+        return self._batch_example
+
+    @property
+    def version(self) -> str:
+        """Prompt version, e.g. "2+3fa9c1d0" (layout version + prefix hash)."""
+        if self._version is None:
+            digest = hashlib.sha256(json.dumps(self.prefix + self.batch_example).encode("utf-8")).hexdigest()
+            self._version = f"{PROMPT_VERSION}+{digest[:8]}"
+        return self._version
+
+    def build(self, ocr_text: str) -> List[Dict[str, str]]:
+        """Full message list: cached prefix first, document text last."""
+        return self.prefix + [{"role": "user", "content": USER_PROMPT.format(ocr_text=ocr_text)}]
+
+    def build_batch(self, ocr_texts: List[str]) -> List[Dict[str, str]]:
+        """
+        Message list packing several documents into one request.
+        Documents are numbered from 1 in the order given.
+        """
+        return self.prefix + self.batch_example + [{"role": "user", "content": self._batch_content(ocr_texts)}]
+
+    @staticmethod
+    def _batch_content(ocr_texts: List[str]) -> str:
+        """Packed user message for the given bill texts."""
+        documents = "\n\n".join(
+            BATCH_DOCUMENT_TEMPLATE.format(index=i, ocr_text=text)
+            for i, text in enumerate(ocr_texts, start=1)
+        )
+        return BATCH_USER_PROMPT.format(count=len(ocr_texts), documents=documents)
+
+    def _select_examples(self) -> List[tuple]:
+        """Evenly spaced examples, for language/supplier variety in a fixed order."""
+        examples = load_examples(self.examples_path)
+        if self.max_examples <= 0 or not examples:
+            return []
+        if len(examples) <= self.max_examples:
+            return list(examples)
+        step = len(examples) / self.max_examples
+        return [examples[int(i * step)] for i in range(self.max_examples)]
@@ -0,0 +1,157 @@
+"""
+Unit Normalizer
+Single place for parsing locale-formatted numbers and converting energy
+quantities to MWh.
+"""
+import re
+from typing import Optional, Dict, List, Tuple
+
+
+# Conversion factors to MWh, keyed by canonical unit
+MWH_FACTORS = {
+    "Wh": 1e-6,
+    "kWh": 1e-3,
+    "MWh": 1.0,
+    "GWh": 1e3,
+    "GJ": 1 / 3.6,
+    "TJ": 1000 / 3.6,
+}
+
+# Unit spellings (lowercased, without spaces, dots or hyphens) -> canonical unit
+UNIT_ALIASES = {
+    "wh": "Wh",
+    "kwh": "kWh",
+    "kilowatthour": "kWh",
+    "kilowatthours": "kWh",
+    "kilowattstunde": "kWh",
+    "kilowattstunden": "kWh",
+    "kilowattheure": "kWh",
+    "kilowattheures": "kWh",
+    "mwh": "MWh",
+    "megawatthour": "MWh",
+    "megawatthours": "MWh",
+    "megawattstunde": "MWh",
+    "megawattstunden": "MWh",
+    "mégawattheure": "MWh",
+    "mégawattheures": "MWh",
+    "gwh": "GWh",
+    "gigawatthour": "GWh",
+    "gigawatthours": "GWh",
+    "gj": "GJ",
+    "gigajoule": "GJ",
+    "gigajoules": "GJ",
+    "tj": "TJ",
+    "terajoule": "TJ",
+    "terajoules": "TJ",
+}
+
+# Unit assumed when a consumption value has none
+DEFAULT_UNIT = "kWh"
+
+NORMALIZED_UNIT = "MWh"
+
+# Decimal places kept in MWh values (1 mWh), hiding float conversion noise
+MWH_PRECISION = 9
+
+# Languages that write 1.234,5 and those that write 1,234.5; for others the
+# separator is guessed from the digit grouping
+DECIMAL_COMMA_LANGUAGES = {"fr", "de", "es", "it", "nl", "pt", "pl", "sv", "da", "cs", "ro", "el", "bg"}
+DECIMAL_POINT_LANGUAGES = {"en"}
+
+# Language to read model output with: JSON numbers always use a decimal point
+MACHINE_LANGUAGE = "en"
+
+NUMBER_PATTERN = re.compile(r"^[-+]?\d[\d.,]*$")
+UNIT_STRIP_PATTERN = re.compile(r"[\s.\-·_]")
+
+
+def parse_number(token, language: Optional[str] = None) -> Optional[float]:
+    """
+    Parse a number as printed in a bill.
+
+    Mixed separators are unambiguous ("1.234,5", "1,234.5"), as is a
+    repeated separator ("1.234.567") or one not followed by exactly three
+    digits ("12,5"). Otherwise the document language decides ("45.230" is
+    45230 in German, 45.23 in English); without one, the separator is taken
+    as a thousands separator.
+    """
+    if token is None:
+        return None
+    if isinstance(token, (int, float)):
+        return float(token)
+
+    token = re.sub(r"[\s'’  ]", "", str(token))
+    if not token or not NUMBER_PATTERN.match(token):
+        return None
+
+    if "," in token and "." in token:
+        decimal = "," if token.rfind(",") > token.rfind(".") else "."
+        thousands = "." if decimal == "," else ","
+        token = token.replace(thousands, "").replace(decimal, ".")
+    elif "," in token or "." in token:
+        sep = "," if "," in token else "."
+        parts = token.split(sep)
+        if len(parts) > 2:
+            is_thousands = True
+        elif len(parts[1]) != 3:
+            is_thousands = False
+        elif language in DECIMAL_COMMA_LANGUAGES or language in DECIMAL_POINT_LANGUAGES:
+            is_thousands = (sep == ".") == (language in DECIMAL_COMMA_LANGUAGES)
+        else:
+            is_thousands = True
+        token = token.replace(sep, "" if is_thousands else ".")
+
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def canonical_unit(unit: Optional[str]) -> Optional[str]:
+    """Canonical spelling of an energy unit ("KWH", "kW h" -> "kWh"), or None."""
+    if not unit:
+        return None
+    return UNIT_ALIASES.get(UNIT_STRIP_PATTERN.sub("", unit.lower()))
+
+
+def to_mwh(value, unit: Optional[str], language: Optional[str] = None) -> Optional[float]:
+    """
+    Convert an energy quantity to MWh.
+    A missing unit is taken as kWh; an unrecognized unit gives None.
+    """
+    number = parse_number(value, language)
+    if number is None:
+        return None
+    canonical = canonical_unit(unit) if unit else DEFAULT_UNIT
+    if canonical is None:
+        return None
+    return round(number * MWH_FACTORS[canonical], MWH_PRECISION)
+
+
+def normalize_many(
+    quantities: List[Tuple[Optional[str], Optional[str], Optional[str]]]
+) -> List[Optional[Tuple[float, str]]]:
+    """
+    Normalize a batch of (value, unit, language) triples in one pass.
+
+    Returns (value in MWh, "MWh") for each item with a recognized energy
+    unit and a parseable value, None otherwise. Units are resolved once per
+    distinct spelling.
+    """
+    units: Dict[Optional[str], Optional[float]] = {}
+    results: List[Optional[Tuple[float, str]]] = []
+
+    for value, unit, language in quantities:
+        if unit not in units:
+            canonical = canonical_unit(unit)
+            units[unit] = MWH_FACTORS[canonical] if canonical else None
+        factor = units[unit]
+        number = parse_number(value, language) if factor is not None else None
+        results.append((round(number * factor, MWH_PRECISION), NORMALIZED_UNIT) if number is not None else None)
+
+    return results
+
+
+def format_normalized(value: float) -> str:
+    """Text form stored in ExtractedField.normalized_value."""
+    return repr(round(value, MWH_PRECISION))
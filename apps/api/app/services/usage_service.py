@@ -0,0 +1,119 @@
+"""
+Usage Service
+Token, page and cost accounting for OCR and extraction calls.
+"""
+from typing import Optional, Dict, Any
+
+from ..config import get_settings
+
+
+# USD per 1M tokens: (input, cached input, output)
+# Fine-tuned models are priced by their base model with the "ft:" markup below.
+MODEL_PRICING = {
+    "gpt-4-turbo": (10.00, 10.00, 30.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+
+FINETUNED_PRICE_MULTIPLIER = 2.0
+
+
+class TokenUsage:
+    """Token usage accumulated over one or more LLM calls."""
+    def __init__(
+        self,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        completion_tokens: int = 0,
+        calls: int = 0
+    ):
+        self.prompt_tokens = prompt_tokens
+        self.cached_tokens = cached_tokens
+        self.completion_tokens = completion_tokens
+        self.calls = calls
+
+    def add(self, usage: Any) -> None:
+        """Add an OpenAI `usage` object (or None if the call reported none)."""
+        self.calls += 1
+        if usage is None:
+            return
+        self.prompt_tokens += usage.prompt_tokens or 0
+        self.completion_tokens += usage.completion_tokens or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        if details is not None:
+            self.cached_tokens += getattr(details, "cached_tokens", 0) or 0
+
+    def merge(self, other: "TokenUsage") -> None:
+        """Add another accumulated usage (e.g. from an escalated attempt)."""
+        self.prompt_tokens += other.prompt_tokens
+        self.cached_tokens += other.cached_tokens
+        self.completion_tokens += other.completion_tokens
+        self.calls += other.calls
+
+    def share(self, fraction: float) -> "TokenUsage":
+        """
+        Portion of this usage attributed to one document of a packed request.
+        Token counts are prorated; the call itself is counted once per document.
+        """
+        return TokenUsage(
+            prompt_tokens=round(self.prompt_tokens * fraction),
+            cached_tokens=round(self.cached_tokens * fraction),
+            completion_tokens=round(self.completion_tokens * fraction),
+            calls=1
+        )
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "llm_calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens
+        }
+
+
+class UsageService:
+    """
+    Service for estimating the cost of OCR and extraction calls.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+
+    def model_pricing(self, model: str) -> Optional[tuple]:
+        """Per-1M-token pricing for a model, matched on the longest known prefix."""
+        if not model:
+            return None
+        is_finetuned = model.startswith("ft:")
+        base_model = model.split(":")[1] if is_finetuned else model
+
+        matches = [prefix for prefix in MODEL_PRICING if base_model.startswith(prefix)]
+        if not matches:
+            return None
+        pricing = MODEL_PRICING[max(matches, key=len)]
+
+        if is_finetuned:
+            return tuple(p * FINETUNED_PRICE_MULTIPLIER for p in pricing)
+        return pricing
+
+    def llm_cost(self, model: str, usage: TokenUsage) -> Optional[float]:
+        """
+        Estimated USD cost of the given token usage.
+        Returns None when the model's price is unknown.
+        """
+        pricing = self.model_pricing(model)
+        if pricing is None:
+            return None
+        input_price, cached_price, output_price = pricing
+        uncached = max(usage.prompt_tokens - usage.cached_tokens, 0)
+        return (
+            uncached * input_price
+            + usage.cached_tokens * cached_price
+            + usage.completion_tokens * output_price
+        ) / 1_000_000
+
+    def ocr_cost(self, pages: int) -> float:
+        """Estimated USD cost of OCR for a number of pages."""
+        return (pages or 0) * self.settings.ocr_cost_per_page
@@ -2,12 +2,21 @@
 Validation Service
 Runs validation rules and generates flags.
 """
-from typing import List, Dict, Any, Optional
-from datetime import date, datetime
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Callable
+import hashlib
+import json
 import re
+import time
+
+from sqlalchemy.orm import Session
 
 from ..config import get_settings
+from ..models.project import Project
 from ..models.validation import FlagSeverity, FlagCategory, VALIDATION_CODES
+from .unit_normalizer import canonical_unit, to_mwh, MACHINE_LANGUAGE
+from .period_analyzer import analyze_periods, quarter_bounds, UNASSIGNED_GROUP
+from .meter_reconciler import reconcile_readings
 
 
 class ValidationFlag:
@@ -23,7 +32,8 @@ class ValidationFlag:
         expected_value: Optional[str] = None,
         actual_value: Optional[str] = None,
         context: Optional[Dict] = None,
-        document_id: Optional[str] = None
+        document_id: Optional[str] = None,
+        key: Optional[str] = None
     ):
         self.code = code
         self.category = category
@@ -35,6 +45,12 @@ class ValidationFlag:
         self.actual_value = actual_value
         self.context = context or {}
         self.document_id = document_id
+        # Tells apart flags of the same code, document and field (e.g. the meter)
+        self.key = key
+    
+    def identity(self) -> Tuple[Optional[str], str, Optional[str], Optional[str]]:
+        """What makes this the same issue across validation runs."""
+        return self.document_id, self.code, self.field_name, self.key
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -51,10 +67,111 @@ class ValidationFlag:
         }
 
 
+class ValidationRule:
+    """
+    A project validation rule and the inputs it reads: top-level canonical
+    data keys, project settings keys, and whether it needs the extracted
+    fields. The rule method receives only what it declares, in that order.
+    """
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        reads: Tuple[str, ...] = (),
+        settings: Tuple[str, ...] = (),
+        uses_fields: bool = False
+    ):
+        self.name = name
+        self.method = method
+        self.reads = reads
+        self.settings = settings
+        self.uses_fields = uses_fields
+    
+    def arguments(
+        self,
+        canonical_data: Dict[str, Any],
+        project_settings: Dict[str, Any],
+        fields: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """The rule's declared inputs, as positional arguments."""
+        args: List[Any] = []
+        if self.reads:
+            args.append({key: canonical_data[key] for key in self.reads if key in canonical_data})
+        if self.settings:
+            args.append({key: project_settings[key] for key in self.settings if key in project_settings})
+        if self.uses_fields:
+            args.append(fields)
+        return args
+    
+    def cache_key(self, input_digest, config_digest: str) -> str:
+        """Key of the rule's result for its current inputs."""
+        parts = [self.name, config_digest]
+        parts.extend(input_digest("canonical", key) for key in self.reads)
+        parts.extend(input_digest("settings", key) for key in self.settings)
+        if self.uses_fields:
+            parts.append(input_digest("fields", None))
+        return _digest(parts)
+
+
+def _digest(value: Any) -> str:
+    """Content hash of JSON-serializable data."""
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def canonical_digests(canonical_data: Dict[str, Any]) -> Dict[str, str]:
+    """Content hash of each top-level canonical key, stored with the data when it is written."""
+    return {key: _digest(value) for key, value in canonical_data.items()}
+
+
+def bump_fields_version(db: Session, project_id: str) -> None:
+    """Mark a project's extracted fields as changed (added, edited, confirmed or removed); the caller commits."""
+    db.query(Project).filter(Project.id == project_id).update(
+        {Project.fields_version: Project.fields_version + 1}, synchronize_session=False
+    )
+
+
+class ValidationCache:
+    """
+    LRU cache of rule results keyed by rule, settings and input content.
+    Revalidating unchanged data re-runs no rule; after an edit only the
+    rules reading the changed inputs run again.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[ValidationFlag]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[List[ValidationFlag]]:
+        flags = self._entries.get(key)
+        if flags is not None:
+            self._entries.move_to_end(key)
+        return flags
+    
+    def put(self, key: str, flags: List[ValidationFlag]) -> None:
+        self._entries[key] = flags
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_validation_cache: Optional[ValidationCache] = None
+
+
+def get_validation_cache() -> ValidationCache:
+    """Process-wide validation rule cache."""
+    global _validation_cache
+    if _validation_cache is None:
+        _validation_cache = ValidationCache(get_settings().validation_cache_size)
+    return _validation_cache
+
+
 class ValidationResult:
     """Result of validation run."""
-    def __init__(self, flags: List[ValidationFlag]):
+    def __init__(self, flags: List[ValidationFlag], rule_stats: Optional[List[Dict[str, Any]]] = None):
         self.flags = flags
+        # Per rule: name, duration_ms, flag_count, cached
+        self.rule_stats = rule_stats or []
     
     @property
     def blocking_count(self) -> int:
@@ -72,13 +189,19 @@ class ValidationResult:
     def can_export(self) -> bool:
         return self.blocking_count == 0
     
+    @property
+    def all_cached(self) -> bool:
+        """Whether every rule result came from the cache, i.e. nothing changed since the last run."""
+        return bool(self.rule_stats) and all(r["cached"] for r in self.rule_stats)
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             "flags": [f.to_dict() for f in self.flags],
             "blocking_count": self.blocking_count,
             "warning_count": self.warning_count,
             "info_count": self.info_count,
-            "can_export": self.can_export
+            "can_export": self.can_export,
+            "rules": self.rule_stats
         }
 
 
@@ -88,14 +211,19 @@ class ValidationService:
     Runs a suite of validation rules and produces flags.
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ValidationCache] = None):
         self.settings = get_settings()
         self.tolerance_percent = self.settings.totals_tolerance_percent
+        self.cache = cache
     
     def validate_project(
         self,
         canonical_data: Dict[str, Any],
-        project_settings: Dict[str, Any]
+        project_settings: Dict[str, Any],
+        load_fields: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        stored_digests: Optional[Dict[str, str]] = None,
+        project_id: Optional[str] = None,
+        fields_version: Optional[int] = None
     ) -> ValidationResult:
         """
         Run all validations on a project's canonical data.
@@ -103,21 +231,67 @@ class ValidationService:
         Args:
             canonical_data: The aggregated canonical data for the project
             project_settings: Project configuration (emission factor, declarant, etc.)
+            load_fields: Returns the current extracted fields of all documents
+                (document_id, field_name, value, confidence, status), for
+                confidence checks; only called when such a rule is recomputed
+            stored_digests: canonical_digests() of canonical_data saved with it;
+                spares hashing the canonical data to look up cached rule results
+            project_id: Scopes cached results to the project, so a run served
+                entirely from cache has no new flags to store
+            fields_version: The project's fields_version; stands in for hashing
+                the fields to look up cached rule results
             
         Returns:
             ValidationResult with all flags
         """
         flags: List[ValidationFlag] = []
+        rule_stats: List[Dict[str, Any]] = []
+        loaded: List[List[Dict[str, Any]]] = []
         
-        # Run each validation rule
-        flags.extend(self._validate_completeness(canonical_data, project_settings))
-        flags.extend(self._validate_units(canonical_data))
-        flags.extend(self._validate_totals(canonical_data))
-        flags.extend(self._validate_periods(canonical_data))
-        flags.extend(self._validate_confidence(canonical_data))
-        flags.extend(self._validate_emission_factor(project_settings))
+        def fields() -> List[Dict[str, Any]]:
+            if not loaded:
+                loaded.append(load_fields() if load_fields else [])
+            return loaded[0]
         
-        return ValidationResult(flags)
+        # Each input is hashed once per run, however many rules read it
+        digests: Dict[Tuple[str, Optional[str]], str] = {
+            ("canonical", key): digest for key, digest in (stored_digests or {}).items()
+        }
+        if fields_version is not None:
+            digests[("fields", None)] = _digest(["version", project_id, fields_version])
+        sources = {"canonical": canonical_data, "settings": project_settings}
+        
+        def input_digest(source: str, key: Optional[str]) -> str:
+            if (source, key) not in digests:
+                digests[(source, key)] = _digest(fields() if source == "fields" else sources[source].get(key))
+            return digests[(source, key)]
+        
+        config_digest = _digest([project_id, self.tolerance_percent, self.settings.low_confidence_threshold])
+        
+        for rule in PROJECT_RULES:
+            started = time.perf_counter()
+            key = rule.cache_key(input_digest, config_digest) if self.cache else None
+            rule_flags = self.cache.get(key) if key else None
+            cached = rule_flags is not None
+            if not cached:
+                rule_flags = getattr(self, rule.method)(*rule.arguments(
+                    canonical_data, project_settings, fields() if rule.uses_fields else []
+                ))
+                if key:
+                    self.cache.put(key, rule_flags)
+            rule_stats.append({
+                "rule": rule.name,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "flag_count": len(rule_flags),
+                "cached": cached
+            })
+            flags.extend(rule_flags)
+        
+        slowest = max(rule_stats, key=lambda r: r["duration_ms"])
+        recomputed = sum(1 for r in rule_stats if not r["cached"])
+        print(f"[VALIDATION] {recomputed}/{len(rule_stats)} rules recomputed in {sum(r['duration_ms'] for r in rule_stats):.1f} ms, slowest: {slowest['rule']} ({slowest['duration_ms']:.1f} ms)")
+        
+        return ValidationResult(flags, rule_stats)
     
     def validate_document(
         self,
@@ -126,6 +300,8 @@ class ValidationService:
     ) -> ValidationResult:
         """
         Validate a single document's extraction.
+        Field confidence is checked by project validation only, so each
+        low-confidence field is flagged once.
         
         Args:
             extraction_data: The canonical data from extraction
@@ -190,7 +366,8 @@ class ValidationService:
                 category=FlagCategory.MISSING_REQUIRED,
                 severity=FlagSeverity.WARNING,
                 message="Reporting period not set",
-                suggestion="Set the quarterly reporting period (Q1-Q4) in project settings"
+                suggestion="Set the quarterly reporting period (Q1-Q4) in project settings",
+                field_name="reporting_period"
             ))
         
         # Check reporting year
@@ -200,7 +377,8 @@ class ValidationService:
                 category=FlagCategory.MISSING_REQUIRED,
                 severity=FlagSeverity.WARNING,
                 message="Reporting year not set",
-                suggestion="Set the reporting year in project settings"
+                suggestion="Set the reporting year in project settings",
+                field_name="reporting_year"
             ))
         
         # Check total electricity
@@ -259,16 +437,16 @@ class ValidationService:
             ))
         
         # Check for invalid units
-        valid_units = {"kWh", "MWh", "TJ", "kwh", "mwh", "KWH", "MWH"}
         for unit in units_found:
-            if unit not in valid_units:
+            if canonical_unit(unit) is None:
                 flags.append(ValidationFlag(
                     code="UNIT_INVALID",
                     category=FlagCategory.UNIT_CONSISTENCY,
                     severity=FlagSeverity.WARNING,
                     message=f"Unrecognized unit: {unit}",
                     suggestion="Verify and correct the consumption unit",
-                    actual_value=unit
+                    actual_value=unit,
+                    key=unit
                 ))
         
         return flags
@@ -286,10 +464,7 @@ class ValidationService:
             if line_items and total and total.get("normalized_mwh"):
                 # Sum line items
                 line_sum = sum(
-                    self._normalize_to_mwh(
-                        item.get("quantity", 0),
-                        item.get("unit", "kWh")
-                    )
+                    to_mwh(item.get("quantity"), item.get("unit"), MACHINE_LANGUAGE) or 0
                     for item in line_items
                     if item.get("quantity")
                 )
@@ -314,49 +489,126 @@ class ValidationService:
         return flags
     
     def _validate_periods(self, canonical_data: Dict[str, Any]) -> List[ValidationFlag]:
-        """Validate billing periods for overlaps and gaps."""
+        """
+        Validate billing periods for overlaps, gaps and coverage of the
+        reporting quarter, per meter or site (see period_analyzer).
+        """
         flags = []
         
-        bills = canonical_data.get("electricity_bills", [])
-        periods = []
+        quarter = quarter_bounds(canonical_data.get("reporting_period"), canonical_data.get("reporting_year"))
+        analyses = analyze_periods(canonical_data.get("electricity_bills", []), quarter)
         
-        for bill in bills:
-            bp = bill.get("billing_period", {})
-            if bp.get("start_date") and bp.get("end_date"):
-                try:
-                    start = datetime.strptime(bp["start_date"], "%Y-%m-%d").date()
-                    end = datetime.strptime(bp["end_date"], "%Y-%m-%d").date()
-                    periods.append((start, end, bill.get("document_id")))
-                except ValueError:
-                    pass  # Invalid date format, skip
-        
-        # Check for overlaps
-        for i, (start1, end1, doc1) in enumerate(periods):
-            for start2, end2, doc2 in periods[i+1:]:
-                if start1 <= end2 and start2 <= end1:
-                    flags.append(ValidationFlag(
-                        code="PERIOD_OVERLAP",
-                        category=FlagCategory.PERIOD_OVERLAP,
-                        severity=FlagSeverity.WARNING,
-                        message=f"Overlapping billing periods detected",
-                        suggestion="Review the billing periods to avoid double-counting",
-                        context={
-                            "period1": {"start": str(start1), "end": str(end1), "document": doc1},
-                            "period2": {"start": str(start2), "end": str(end2), "document": doc2}
-                        }
-                    ))
+        for analysis in analyses:
+            group = None if analysis.group == UNASSIGNED_GROUP else analysis.group
+            
+            for period, other, days in analysis.overlaps:
+                flags.append(ValidationFlag(
+                    code="PERIOD_OVERLAP",
+                    category=FlagCategory.PERIOD_OVERLAP,
+                    severity=FlagSeverity.WARNING,
+                    message=f"Billing period overlaps another bill by {days} day(s)",
+                    suggestion="Review the billing periods to avoid double-counting",
+                    context={
+                        "group": group,
+                        "overlap_days": days,
+                        "period1": other.to_dict(),
+                        "period2": period.to_dict()
+                    },
+                    document_id=period.document_id,
+                    key=f"{analysis.group}|{other.document_id}"
+                ))
+            
+            for gap_start, gap_end in analysis.gaps:
+                days = (gap_end - gap_start).days + 1
+                flags.append(ValidationFlag(
+                    code="PERIOD_GAP",
+                    category=FlagCategory.PERIOD_OVERLAP,
+                    severity=FlagSeverity.INFO,
+                    message=f"No bill covers {gap_start.isoformat()} to {gap_end.isoformat()} ({days} day(s))",
+                    suggestion="Upload the missing bill(s) or confirm there was no consumption",
+                    context={
+                        "group": group,
+                        "gap": {"start": gap_start.isoformat(), "end": gap_end.isoformat(), "days": days},
+                        "quarter_coverage_percent": analysis.coverage_percent
+                    },
+                    key=f"{analysis.group}|{gap_start.isoformat()}"
+                ))
         
         return flags
     
-    def _validate_confidence(self, canonical_data: Dict[str, Any]) -> List[ValidationFlag]:
-        """Flag low confidence extractions."""
+    def _validate_meter_readings(self, canonical_data: Dict[str, Any]) -> List[ValidationFlag]:
+        """Reconcile meter readings within and across consecutive bills."""
         flags = []
         
-        # This would check extraction confidence values
-        # For now, return empty - would need field-level confidence data
+        issues = reconcile_readings(canonical_data.get("electricity_bills", []), self.tolerance_percent)
+        
+        for issue in issues:
+            reading = issue.reading
+            if issue.code == "METER_CONSUMPTION_MISMATCH":
+                consumption = f"{issue.actual:g} {reading.unit or ''}".strip()
+                message = f"Meter {reading.meter_id}: consumption {consumption} doesn't match readings {reading.start:g} to {reading.end:g}"
+                suggestion = "Check the readings and consumption (the meter may have a multiplier)"
+                category = FlagCategory.TOTALS_MISMATCH
+            elif issue.code == "METER_READING_GAP":
+                message = f"Meter {reading.meter_id}: readings jump from {issue.expected:g} to {issue.actual:g} between bills"
+                suggestion = "A bill for this meter may be missing"
+                category = FlagCategory.PERIOD_OVERLAP
+            else:
+                message = f"Meter {reading.meter_id}: bill starts at {issue.actual:g}, below the previous bill's end reading {issue.expected:g}"
+                suggestion = "Check for a duplicated or overlapping bill to avoid double-counting"
+                category = FlagCategory.PERIOD_OVERLAP
+            
+            context = {"meter_id": reading.meter_id, "reading": reading.to_dict()}
+            if issue.previous:
+                context["previous_reading"] = issue.previous.to_dict()
+            
+            flags.append(ValidationFlag(
+                code=issue.code,
+                category=category,
+                severity=FlagSeverity.WARNING,
+                message=message,
+                suggestion=suggestion,
+                expected_value=f"{issue.expected:g}",
+                actual_value=f"{issue.actual:g}",
+                context=context,
+                document_id=reading.document_id,
+                key=f"{reading.meter_id}|{issue.previous.document_id if issue.previous else ''}"
+            ))
         
         return flags
     
+    def _validate_confidence(
+        self,
+        fields: List[Dict[str, Any]],
+        document_id: Optional[str] = None
+    ) -> List[ValidationFlag]:
+        """
+        Flag unreviewed fields whose evidence-checked confidence is low.
+        Runs as a single pass over the fields of all documents.
+        """
+        threshold = self.settings.low_confidence_threshold
+        low = [
+            f for f in fields
+            if f.get("confidence") is not None
+            and f["confidence"] < threshold
+            and f.get("status", "unconfirmed") == "unconfirmed"
+        ]
+        
+        return [
+            ValidationFlag(
+                code="LOW_CONFIDENCE",
+                category=FlagCategory.EXTRACTION_CONFIDENCE,
+                severity=FlagSeverity.INFO,
+                message=f"Low confidence ({f['confidence']:.0%}) for {f['field_name']}: the value could not be fully verified against the cited text",
+                suggestion="Check the value against the document and confirm or correct it",
+                field_name=f["field_name"],
+                actual_value=f.get("value"),
+                context={"confidence": f["confidence"], "checks": f.get("confidence_checks")},
+                document_id=f.get("document_id", document_id)
+            )
+            for f in low
+        ]
+    
     def _validate_emission_factor(self, project_settings: Dict[str, Any]) -> List[ValidationFlag]:
         """Validate emission factor configuration."""
         flags = []
@@ -374,15 +626,22 @@ class ValidationService:
             ))
         
         return flags
-    
-    def _normalize_to_mwh(self, value: float, unit: str) -> float:
-        """Convert to MWh for comparison."""
-        unit_lower = unit.lower() if unit else "kwh"
-        if unit_lower == "mwh":
-            return value
-        elif unit_lower == "kwh":
-            return value / 1000
-        elif unit_lower == "tj":
-            return value * 277.778
-        return value / 1000  # Default to kWh
 
+
+# Project rules, in the order their flags are reported
+PROJECT_RULES = (
+    ValidationRule(
+        "completeness", "_validate_completeness",
+        reads=("reporting_period", "reporting_year", "total_electricity_mwh"),
+        settings=("declarant_info",)
+    ),
+    ValidationRule("units", "_validate_units", reads=("electricity_bills",)),
+    ValidationRule("totals", "_validate_totals", reads=("electricity_bills",)),
+    ValidationRule("periods", "_validate_periods", reads=("electricity_bills", "reporting_period", "reporting_year")),
+    ValidationRule("meter_readings", "_validate_meter_readings", reads=("electricity_bills",)),
+    ValidationRule("confidence", "_validate_confidence", uses_fields=True),
+    ValidationRule(
+        "emission_factor", "_validate_emission_factor",
+        settings=("emission_factor_source", "emission_factor_value")
+    ),
+)
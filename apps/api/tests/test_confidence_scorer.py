@@ -0,0 +1,75 @@
+"""
+Tests for ConfidenceScorer evidence checks.
+"""
+from app.config import get_settings
+from app.services.confidence_scorer import ConfidenceScorer
+from app.services.evidence_locator import EvidenceLocator
+from app.services.ocr_service import OCRPage
+
+
+PAGE = """ENERGIECORP GMBH
+Rechnungsnummer: 2024-00045
+Abrechnungszeitraum: 01.12.2023 - 31.12.2023
+Zähler: DE0012345678901234567890
+Gesamtverbrauch: 660 kWh
+Rechnungsbetrag: 198,00 EUR"""
+
+
+def _score(value, quote, unit=None, page=1):
+    field = {"field_name": "field", "value": value, "unit": unit, "source_quote": quote, "source_page": page, "confidence": 0.9}
+    ConfidenceScorer(EvidenceLocator([OCRPage(1, PAGE)])).score_fields([field])
+    return field
+
+
+def _threshold():
+    return get_settings().low_confidence_threshold
+
+
+def test_verified_quote_scores_high():
+    field = _score("660", "Gesamtverbrauch: 660 kWh", unit="kWh")
+
+    assert field["confidence"] == 1.0
+    assert field["model_confidence"] == 0.9
+    assert field["source_bbox"]["page"] == 1
+
+
+def test_locale_formatted_number_is_in_quote():
+    field = _score("198.0", "Rechnungsbetrag: 198,00 EUR", unit="EUR")
+
+    assert field["confidence_checks"]["value_in_quote"] == 1.0
+    assert field["confidence"] >= _threshold()
+
+
+def test_date_in_other_format_is_in_quote():
+    field = _score("2023-12-31", "Abrechnungszeitraum: 01.12.2023 - 31.12.2023")
+
+    assert field["confidence_checks"]["value_in_quote"] == 1.0
+
+
+def test_contradicting_quote_is_flagged():
+    # Digits of the value occur on the page, but not in its quote
+    field = _score("2023", "Gesamtverbrauch: 660 kWh")
+
+    assert field["confidence_checks"]["value_in_quote"] == 0.0
+    assert field["confidence"] < _threshold()
+
+
+def test_unit_conflict_is_flagged():
+    field = _score("660", "Gesamtverbrauch: 660 kWh", unit="MWh")
+
+    assert field["confidence_checks"]["unit_consistent"] == 0.0
+    assert field["confidence"] < _threshold()
+
+
+def test_uncited_value_is_flagged():
+    field = _score("31", None)
+
+    assert field["confidence"] == 0.0
+    assert field["confidence"] < _threshold()
+
+
+def test_quote_not_in_text_is_flagged():
+    field = _score("660", "Total consumption 660 kWh for March", unit="kWh", page=2)
+
+    assert field["confidence_checks"]["quote_found"] < 1.0
+    assert field["confidence"] < 1.0
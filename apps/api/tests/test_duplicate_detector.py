@@ -0,0 +1,71 @@
+"""
+Tests for bill fingerprints and MinHash text signatures.
+"""
+from app.services.duplicate_detector import (
+    bill_fingerprint, text_signature, similarity, band_keys, index_keys,
+    FINGERPRINT, TEXT_BAND, SIGNATURE_SIZE, BAND_ROWS, NEAR_DUPLICATE_SIMILARITY
+)
+
+
+BILL = {
+    "supplier": "Energy Corp.",
+    "meter_ids": ["MTR-001", "mtr 002"],
+    "billing_period": {"start_date": "2024-01-01", "end_date": "2024-01-31"},
+    "total_consumption": {"value": 1250, "unit": "kWh", "normalized_mwh": 1.25}
+}
+
+TEXT = "Energy Corp invoice 1234 billing period January 2024 meter MTR-001 total consumption 1,250 kWh amount due 187.50 EUR " * 5
+
+
+def test_fingerprint_ignores_formatting():
+    rescan = {**BILL, "supplier": "ENERGY CORP", "meter_ids": ["MTR002", "MTR001"]}
+
+    assert bill_fingerprint(BILL) == bill_fingerprint(rescan)
+
+
+def test_fingerprint_differs_by_period_and_consumption():
+    next_month = {**BILL, "billing_period": {"start_date": "2024-02-01", "end_date": "2024-02-29"}}
+    other_total = {**BILL, "total_consumption": {"value": 1300, "unit": "kWh", "normalized_mwh": 1.3}}
+
+    assert bill_fingerprint(next_month) != bill_fingerprint(BILL)
+    assert bill_fingerprint(other_total) != bill_fingerprint(BILL)
+
+
+def test_fingerprint_needs_period_and_consumption():
+    assert bill_fingerprint({**BILL, "billing_period": {}}) is None
+    assert bill_fingerprint({**BILL, "total_consumption": {"value": None}}) is None
+
+
+def test_identical_text_is_similar():
+    signature = text_signature(TEXT)
+
+    assert len(signature) == SIGNATURE_SIZE
+    assert similarity(signature, text_signature(TEXT.upper())) == 1.0
+
+
+def test_small_ocr_difference_is_near_duplicate():
+    page = " ".join(f"line {i} meter MTR-{i:03d} reading {i * 37} kWh" for i in range(60))
+    rescan = page.replace("reading 370 kWh", "reading 37O kWh")
+
+    assert similarity(text_signature(page), text_signature(rescan)) >= NEAR_DUPLICATE_SIMILARITY
+
+
+def test_different_text_is_not_similar():
+    other = "Stadtwerke Musterstadt Rechnung Abrechnungszeitraum Februar 2024 Zähler 9876 Verbrauch 830 kWh " * 5
+
+    assert similarity(text_signature(TEXT), text_signature(other)) < NEAR_DUPLICATE_SIMILARITY
+
+
+def test_empty_text_has_no_signature():
+    assert text_signature("") is None
+    assert similarity(None, text_signature(TEXT)) == 0.0
+
+
+def test_index_keys():
+    signature = text_signature(TEXT)
+    keys = index_keys(bill_fingerprint(BILL), signature)
+
+    assert keys[0] == (FINGERPRINT, bill_fingerprint(BILL))
+    assert [key for kind, key in keys if kind == TEXT_BAND] == band_keys(signature)
+    assert len(band_keys(signature)) == SIGNATURE_SIZE // BAND_ROWS
+    assert index_keys(None, None) == []
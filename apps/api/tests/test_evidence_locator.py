@@ -0,0 +1,75 @@
+"""
+Tests for resolving evidence quotes to OCR page offsets.
+"""
+from app.services.evidence_locator import EvidenceLocator
+from app.services.ocr_service import OCRPage
+
+
+PAGE_1 = """# **ENERGY CORP**
+Invoice #12345
+
+Billing Period: January 1, 2024 - January 31, 2024
+Account: ACC-789456"""
+
+PAGE_2 = """| Meter | Previous | Current | Consumption |
+|---|---|---|---|
+| MTR-001 | 10,000 | 10,500 | 500 kWh |
+
+**Total Consumption: 1,250 kWh**
+Amount Due: €187.50"""
+
+
+def _locator() -> EvidenceLocator:
+    return EvidenceLocator([OCRPage(1, PAGE_1), OCRPage(2, PAGE_2)])
+
+
+def _text(span) -> str:
+    return (PAGE_1, PAGE_2)[span.page - 1][span.start:span.end]
+
+
+def test_exact_quote_maps_to_markdown_offsets():
+    span = _locator().locate("Total Consumption: 1,250 kWh")
+
+    assert span.page == 2
+    assert span.exact
+    assert span.score == 1.0
+    assert _text(span) == "Total Consumption: 1,250 kWh"
+
+
+def test_quote_ignores_markdown_and_case():
+    span = _locator().locate("energy corp")
+
+    assert span.page == 1
+    assert _text(span) == "ENERGY CORP"
+
+
+def test_ocr_noise_gives_fuzzy_match():
+    span = _locator().locate("Billing Period: January 1, 2O24 - January 31, 2024")
+
+    assert span.page == 1
+    assert not span.exact
+    assert 0.5 <= span.score < 1.0
+    assert _text(span).startswith("Billing Period")
+
+
+def test_short_quote_matches_whole_words_only():
+    page = "Reading: 10500\nUsed: 500 kWh"
+    span = EvidenceLocator([OCRPage(1, page)]).locate("500")
+
+    assert page[span.start - 1:span.end] == " 500"
+
+
+def test_unknown_quote_is_not_located():
+    locator = _locator()
+
+    assert locator.locate("Stadtwerke Musterstadt Rechnung") is None
+    assert locator.locate("") is None
+    assert locator.locate("***") is None
+
+
+def test_span_serializes_for_source_bbox():
+    data = _locator().locate("Account: ACC-789456").to_dict()
+
+    assert data["type"] == "text_span"
+    assert data["page"] == 1
+    assert data["match"] == "exact"
@@ -0,0 +1,83 @@
+"""
+Tests for tolerant parsing of model-produced JSON.
+"""
+import json
+
+import pytest
+
+from app.services.json_repair import (
+    strip_code_fences, repair_json, parse_llm_json, StreamingJSONParser, StreamingJSONArrayParser
+)
+
+
+def _chunks(text: str, size: int = 7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_strip_code_fences():
+    assert strip_code_fences('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert strip_code_fences('  {"a": 1} ') == '{"a": 1}'
+
+
+def test_valid_json_needs_no_repair():
+    assert parse_llm_json('{"a": [1, 2]}') == ({"a": [1, 2]}, False)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('Here you go: {"a": 1} Hope this helps!', {"a": 1}),
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ('{"a": [1, 2}', {"a": [1, 2]}),
+    ('{"a": "x}y", "b": "say \\"hi\\""', {"a": "x}y", "b": 'say "hi"'}),
+])
+def test_repairs_common_defects(text, expected):
+    assert parse_llm_json(text) == (expected, True)
+
+
+def test_truncated_string_is_closed():
+    data, repaired = parse_llm_json('{"supplier": "Energy Corp", "account": "ACC-78')
+
+    assert repaired
+    assert data == {"supplier": "Energy Corp", "account": "ACC-78"}
+
+
+def test_truncation_falls_back_to_last_complete_member():
+    data, _ = parse_llm_json('{"supplier": "Energy Corp", "total": {"value": 500, "unit":')
+
+    assert data["supplier"] == "Energy Corp"
+    assert json.dumps(data)
+
+
+@pytest.mark.parametrize("text", [None, "no json here"])
+def test_unrecoverable_input_raises(text):
+    with pytest.raises(ValueError):
+        parse_llm_json(text)
+
+
+def test_repair_json_ignores_stray_closers():
+    assert json.loads(repair_json('{"a": 1}}]')) == {"a": 1}
+
+
+def test_streaming_parser_emits_completed_members():
+    response = '```json\n{"supplier": "Energy, Corp", "billing_period": {"start_date": "2024-01-01"}, "total": 5}\n```'
+    parser = StreamingJSONParser()
+
+    members = [member for chunk in _chunks(response) for member in parser.feed(chunk)]
+
+    assert members == [
+        ("supplier", "Energy, Corp"),
+        ("billing_period", {"start_date": "2024-01-01"}),
+        ("total", 5)
+    ]
+    assert parser.feed('{"late": 1}') == []
+
+
+def test_streaming_array_parser_emits_completed_items():
+    response = '{"documents": [{"document_index": 1, "extraction": {"note": "a ] b"}}, {"document_index": 2, "extraction": {}}], "other": [{"x": 1}]}'
+    parser = StreamingJSONArrayParser()
+
+    items = [item for chunk in _chunks(response, 5) for item in parser.feed(chunk)]
+
+    assert items == [
+        {"document_index": 1, "extraction": {"note": "a ] b"}},
+        {"document_index": 2, "extraction": {}}
+    ]
@@ -0,0 +1,87 @@
+"""
+Tests for meter reading reconciliation across bills.
+"""
+from app.services.meter_reconciler import bill_readings, reconcile_readings
+
+
+TOLERANCE_PERCENT = 5.0
+
+
+def _bill(document_id, *readings):
+    return {
+        "document_id": document_id,
+        "meter_readings": [
+            {"meter_id": meter, "reading_start": start, "reading_end": end, "consumption": consumption, "unit": "kWh"}
+            for meter, start, end, consumption in readings
+        ]
+    }
+
+
+def _codes(bills):
+    return [(issue.code, issue.reading.document_id) for issue in reconcile_readings(bills, TOLERANCE_PERCENT)]
+
+
+def test_consecutive_bills_reconcile():
+    bills = [
+        _bill("feb", ("MTR-001", 10500, 11000, 500)),
+        _bill("jan", ("MTR-001", 10000, 10500, 500))
+    ]
+
+    assert _codes(bills) == []
+
+
+def test_consumption_must_match_reading_difference():
+    issues = reconcile_readings([_bill("jan", ("MTR-001", 10000, 10500, 750))], TOLERANCE_PERCENT)
+
+    assert [(i.code, i.expected, i.actual) for i in issues] == [("METER_CONSUMPTION_MISMATCH", 500, 750)]
+
+
+def test_small_differences_are_tolerated():
+    bills = [
+        _bill("jan", ("MTR-001", 10000, 10500, 510)),
+        _bill("feb", ("MTR-001", 10501, 11000, None))
+    ]
+
+    assert _codes(bills) == []
+
+
+def test_missing_bill_leaves_a_reading_gap():
+    bills = [
+        _bill("jan", ("MTR-001", 10000, 10500, 500)),
+        _bill("mar", ("MTR-001", 11000, 11500, 500))
+    ]
+
+    issues = reconcile_readings(bills, TOLERANCE_PERCENT)
+
+    assert [(i.code, i.reading.document_id, i.previous.document_id) for i in issues] == [("METER_READING_GAP", "mar", "jan")]
+    assert (issues[0].expected, issues[0].actual) == (10500, 11000)
+
+
+def test_overlapping_bills_are_reported():
+    bills = [
+        _bill("jan", ("MTR-001", 10000, 10500, 500)),
+        _bill("jan-copy", ("MTR-001", 10200, 10700, 500))
+    ]
+
+    assert _codes(bills) == [("METER_READING_OVERLAP", "jan-copy")]
+
+
+def test_meters_are_reconciled_separately():
+    bills = [
+        _bill("jan", ("MTR-001", 10000, 10500, 500), ("MTR-002", 200, 300, 100)),
+        _bill("feb", ("MTR-001", 10500, 11000, 500), ("MTR-002", 300, 450, 150))
+    ]
+
+    assert _codes(bills) == []
+
+
+def test_incomplete_readings_are_skipped():
+    bill = {"document_id": "jan", "meter_readings": [
+        {"meter_id": "MTR-001", "reading_start": "10000", "reading_end": None},
+        {"meter_id": None, "reading_start": 1, "reading_end": 2},
+        {"meter_id": " MTR-002 ", "reading_start": "200", "reading_end": "300.5", "consumption": "100.5"}
+    ]}
+
+    readings = bill_readings(bill)
+
+    assert [(r.meter_id, r.start, r.end, r.consumption) for r in readings] == [("MTR-002", 200.0, 300.5, 100.5)]
@@ -0,0 +1,103 @@
+"""
+Tests for ModelRouter routing and escalation.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.extraction_service import ExtractionResult, ExtractionError
+from app.services.model_router import ModelRouter, ROUTE_FAST, ROUTE_ESCALATED
+from app.services.ocr_service import OCRPage, OCRResult
+from app.services.usage_service import TokenUsage
+
+
+FAST_MODEL = "fast-model"
+LARGE_MODEL = "large-model"
+
+
+class FakeExtractionService:
+    """Records the models called; each model returns its result or raises it."""
+    def __init__(self, fast_result, large_result=None):
+        self.model = LARGE_MODEL
+        self.fast_model = FAST_MODEL
+        self.results = {FAST_MODEL: fast_result, LARGE_MODEL: large_result or _result(confidence=0.9)}
+        self.calls = []
+
+    async def extract_from_ocr(self, ocr_result, document_id, on_partial=None, model=None):
+        self.calls.append(model)
+        if isinstance(self.results[model], Exception):
+            raise self.results[model]
+        return self.results[model]
+
+
+class FakeValidationService:
+    def validate_document(self, canonical_data, document_id):
+        return SimpleNamespace(blocking_count=0, flags=[])
+
+
+def _ocr_result() -> OCRResult:
+    page = OCRPage(1, "Supplier: Energie AG\nPeriod: 01.01.2024 - 31.01.2024\nConsumption: 1.234 kWh")
+    return OCRResult(pages=[page], page_count=1)
+
+
+def _result(confidence: float, period_confidence: float = 0.0) -> ExtractionResult:
+    fields = [
+        {"field_name": "total_consumption", "value": "1234", "confidence": confidence},
+        {"field_name": "period_start", "value": "2024-01-01", "confidence": period_confidence},
+        {"field_name": "period_end", "value": "2024-01-31", "confidence": period_confidence},
+    ]
+    return ExtractionResult(canonical_data={}, fields=fields, usage=TokenUsage(1000, 0, 300, calls=1), estimated_cost=0.01)
+
+
+def _failure(calls: int = 1) -> ExtractionError:
+    return ExtractionError("Failed to parse extraction response as JSON", TokenUsage(1000, 0, 300, calls=calls), 0.01)
+
+
+def _extract(fast_result, large_result=None):
+    service = FakeExtractionService(fast_result, large_result)
+    router = ModelRouter(service, FakeValidationService())
+    result = asyncio.run(router.extract(_ocr_result(), "doc-1"))
+    return result, service.calls
+
+
+def test_clean_fast_extraction_is_not_escalated():
+    # Uncited billing dates score low but must not trigger escalation
+    result, calls = _extract(_result(confidence=0.9))
+
+    assert calls == [FAST_MODEL]
+    assert result.route == ROUTE_FAST
+    assert result.escalation_reason is None
+
+
+def test_low_consumption_confidence_escalates():
+    result, calls = _extract(_result(confidence=0.2))
+
+    assert calls == [FAST_MODEL, LARGE_MODEL]
+    assert result.route == ROUTE_ESCALATED
+    assert result.escalation_reason.startswith("low confidence on total_consumption")
+
+
+def test_fast_model_failure_escalates():
+    result, calls = _extract(ValueError("Failed to parse extraction response as JSON"))
+
+    assert calls == [FAST_MODEL, LARGE_MODEL]
+    assert result.route == ROUTE_ESCALATED
+    assert result.escalation_reason == "fast model failed: Failed to parse extraction response as JSON"
+
+
+def test_failed_fast_attempt_usage_is_counted():
+    result, _ = _extract(_failure(calls=2))
+
+    assert result.usage.calls == 3
+    assert result.usage.prompt_tokens == 2000
+    assert result.estimated_cost == pytest.approx(0.02)
+
+
+def test_failed_escalation_carries_usage_of_both_attempts():
+    with pytest.raises(ExtractionError) as error:
+        _extract(_result(confidence=0.2), large_result=_failure())
+
+    assert error.value.route == ROUTE_ESCALATED
+    assert error.value.usage.calls == 2
+    assert error.value.estimated_cost == pytest.approx(0.02)
@@ -0,0 +1,103 @@
+"""
+Tests for billing period overlaps, gaps and quarter coverage.
+"""
+from datetime import date
+
+from app.services.period_analyzer import (
+    analyze_periods, bill_group, bill_period, quarter_bounds, UNASSIGNED_GROUP
+)
+
+
+Q1_2024 = quarter_bounds("Q1", "2024")
+
+
+def _bill(start, end, meter="MTR-001", document_id=None):
+    return {
+        "document_id": document_id or start,
+        "meter_ids": [meter] if meter else [],
+        "billing_period": {"start_date": start, "end_date": end}
+    }
+
+
+def _analysis(bills, quarter=Q1_2024):
+    analyses = analyze_periods(bills, quarter)
+    assert len(analyses) == 1
+    return analyses[0]
+
+
+def test_quarter_bounds():
+    assert quarter_bounds("q1", "2024") == (date(2024, 1, 1), date(2024, 3, 31))
+    assert quarter_bounds("Q4", "2023") == (date(2023, 10, 1), date(2023, 12, 31))
+    assert quarter_bounds("Q5", "2024") is None
+    assert quarter_bounds("Q1", None) is None
+
+
+def test_bill_period_rejects_invalid_dates():
+    assert bill_period(_bill("2024-01-01", "2024-01-31")).days == 31
+    assert bill_period(_bill("2024-01-31", "2024-01-01")) is None
+    assert bill_period(_bill("January 2024", "2024-01-31")) is None
+
+
+def test_bill_group():
+    assert bill_group({"meter_ids": ["B", "A ", None]}) == "meter:A,B"
+    assert bill_group({"site_address": "12, Rue de la Paix"}) == "site:12 rue de la paix"
+    assert bill_group({}) == UNASSIGNED_GROUP
+
+
+def test_contiguous_bills_cover_the_quarter():
+    analysis = _analysis([
+        _bill("2024-02-01", "2024-02-29"),
+        _bill("2024-01-01", "2024-01-31"),
+        _bill("2024-03-01", "2024-03-31")
+    ])
+
+    assert analysis.overlaps == []
+    assert analysis.gaps == []
+    assert analysis.coverage_percent == 100.0
+    assert [p.start.month for p in analysis.periods] == [1, 2, 3]
+
+
+def test_shared_boundary_day_is_not_an_overlap():
+    analysis = _analysis([_bill("2024-01-01", "2024-02-15"), _bill("2024-02-15", "2024-03-31")])
+
+    assert analysis.overlaps == []
+    assert analysis.gaps == []
+
+
+def test_overlap_is_reported_against_furthest_bill():
+    analysis = _analysis([
+        _bill("2024-01-01", "2024-03-31", document_id="quarterly"),
+        _bill("2024-02-01", "2024-02-29", document_id="february")
+    ])
+
+    later, earlier, days = analysis.overlaps[0]
+    assert (later.document_id, earlier.document_id, days) == ("february", "quarterly", 29)
+
+
+def test_gaps_inside_the_quarter_include_its_edges():
+    analysis = _analysis([_bill("2023-12-15", "2024-01-14"), _bill("2024-02-01", "2024-03-15")])
+
+    assert analysis.gaps == [
+        (date(2024, 1, 15), date(2024, 1, 31)),
+        (date(2024, 3, 16), date(2024, 3, 31))
+    ]
+    assert analysis.covered_days == 14 + 44
+    assert analysis.coverage_percent == round(58 / 91 * 100, 1)
+
+
+def test_without_quarter_only_gaps_between_bills_are_reported():
+    analysis = _analysis([_bill("2024-01-01", "2024-01-31"), _bill("2024-03-01", "2024-03-31")], quarter=None)
+
+    assert analysis.gaps == [(date(2024, 2, 1), date(2024, 2, 29))]
+    assert analysis.coverage_percent is None
+
+
+def test_groups_are_analyzed_separately():
+    analyses = analyze_periods([
+        _bill("2024-01-01", "2024-03-31", meter="A"),
+        _bill("2024-01-01", "2024-03-31", meter="B"),
+        _bill(None, None, meter="C")
+    ], Q1_2024)
+
+    assert [a.group for a in analyses] == ["meter:A", "meter:B"]
+    assert all(not a.overlaps and a.coverage_percent == 100.0 for a in analyses)
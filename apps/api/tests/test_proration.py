@@ -0,0 +1,63 @@
+"""
+Tests for day-level proration of bills over the reporting quarter.
+"""
+from datetime import date
+
+from app.services.period_analyzer import quarter_bounds
+from app.services.proration import allocate, allocate_projects, days_in
+
+
+Q1_2024 = quarter_bounds("Q1", "2024")
+
+
+def _bill(start, end, mwh, document_id="doc"):
+    return {
+        "document_id": document_id,
+        "billing_period": {"start_date": start, "end_date": end},
+        "total_consumption": {"value": mwh * 1000, "unit": "kWh", "normalized_mwh": mwh}
+    }
+
+
+def test_days_in_quarter():
+    assert days_in(date(2023, 12, 15), date(2024, 1, 14), Q1_2024) == 14
+    assert days_in(date(2024, 2, 1), date(2024, 2, 29), Q1_2024) == 29
+    assert days_in(date(2024, 4, 1), date(2024, 4, 30), Q1_2024) == 0
+
+
+def test_bill_inside_quarter_counts_in_full():
+    allocation = allocate([_bill("2024-02-01", "2024-02-29", 2.9)], Q1_2024)[0]
+
+    assert allocation.mwh == 2.9
+    assert allocation.days_in_quarter == allocation.billing_days == 29
+
+
+def test_straddling_bill_is_prorated_by_day():
+    allocation = allocate([_bill("2023-12-15", "2024-01-14", 3.1)], Q1_2024)[0]
+
+    assert allocation.billing_days == 31
+    assert allocation.days_in_quarter == 14
+    assert allocation.mwh == 1.4
+    assert allocation.billed_mwh == 3.1
+    assert allocation.to_dict()["prorated"] is True
+
+
+def test_bill_outside_quarter_counts_nothing():
+    assert allocate([_bill("2024-04-01", "2024-04-30", 1.0)], Q1_2024)[0].mwh == 0
+
+
+def test_without_period_or_quarter_counts_in_full():
+    no_period = allocate([_bill(None, None, 1.5)], Q1_2024)[0]
+    no_quarter = allocate([_bill("2023-12-15", "2024-01-14", 3.1)], None)[0]
+
+    assert (no_period.mwh, no_period.prorated) == (1.5, False)
+    assert (no_quarter.mwh, no_quarter.prorated) == (3.1, False)
+
+
+def test_allocate_projects():
+    totals = allocate_projects({
+        "a": ([_bill("2023-12-15", "2024-01-14", 3.1), _bill("2024-01-15", "2024-02-14", 3.1)], Q1_2024),
+        "b": ([_bill("2024-03-17", "2024-04-15", 3.0)], Q1_2024),
+        "empty": ([], Q1_2024)
+    })
+
+    assert totals == {"a": 4.5, "b": 1.5, "empty": 0}
@@ -0,0 +1,60 @@
+"""
+Tests for locale-aware number parsing and MWh conversion.
+"""
+import pytest
+
+from app.services.unit_normalizer import (
+    parse_number, canonical_unit, to_mwh, normalize_many, format_normalized
+)
+
+
+@pytest.mark.parametrize("token, language, expected", [
+    ("1.234,5", None, 1234.5),
+    ("1,234.5", None, 1234.5),
+    ("1.234.567", None, 1234567.0),
+    ("12,5", None, 12.5),
+    ("45.230", "de", 45230.0),
+    ("45.230", "en", 45.23),
+    ("45,230", "fr", 45.23),
+    ("45.230", None, 45230.0),
+    ("1 234,5", "fr", 1234.5),
+    ("1'234.5", None, 1234.5),
+    (660, None, 660.0),
+])
+def test_parse_number(token, language, expected):
+    assert parse_number(token, language) == expected
+
+
+@pytest.mark.parametrize("token", [None, "", "abc", "12 kWh", "--1"])
+def test_parse_number_rejects_non_numbers(token):
+    assert parse_number(token) is None
+
+
+def test_canonical_unit_spellings():
+    assert canonical_unit("KWH") == "kWh"
+    assert canonical_unit("kW h") == "kWh"
+    assert canonical_unit("Kilowattstunden") == "kWh"
+    assert canonical_unit("m3") is None
+    assert canonical_unit(None) is None
+
+
+def test_to_mwh():
+    assert to_mwh("660", "kWh") == 0.66
+    assert to_mwh("1,5", "MWh", "de") == 1.5
+    assert to_mwh("3.6", "GJ") == 1.0
+    assert to_mwh("500", None) == 0.5
+    assert to_mwh("500", "m3") is None
+    assert to_mwh("n/a", "kWh") is None
+
+
+def test_normalize_many_matches_to_mwh():
+    quantities = [("45.230", "kWh", "de"), ("45.230", "kWh", "en"), ("12", "litres", None), ("x", "kWh", None)]
+
+    results = normalize_many(quantities)
+
+    assert results == [(45.23, "MWh"), (0.04523, "MWh"), None, None]
+    assert [r[0] if r else None for r in results[:2]] == [to_mwh(*q) for q in quantities[:2]]
+
+
+def test_format_normalized_rounds():
+    assert format_normalized(0.1 + 0.2) == "0.3"
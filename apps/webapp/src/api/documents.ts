@@ -35,6 +35,11 @@ export const documentsApi = {
     return `/api/documents/${id}/pdf`
   },
 
+  // Server-sent events: status and key fields as extraction streams in
+  getEventsUrl: (id: string): string => {
+    return `${api.defaults.baseURL}/documents/${id}/events`
+  },
+
   reprocess: async (id: string): Promise<Document> => {
     const { data } = await api.post(`/documents/${id}/reprocess`)
     return data
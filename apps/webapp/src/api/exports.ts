@@ -18,8 +18,25 @@ export const exportsApi = {
     return data
   },
 
-  downloadZip: async (projectId: string): Promise<Blob> => {
+  downloadZip: async (projectId: string, includeSources = false): Promise<Blob> => {
     const { data } = await api.post(`/exports/project/${projectId}/zip`, null, {
+      params: includeSources ? { include_sources: true } : undefined,
+      responseType: 'blob',
+    })
+    return data
+  },
+
+  downloadPortfolio: async (
+    reportingPeriod: string,
+    reportingYear: string,
+    includeSources = false
+  ): Promise<Blob> => {
+    const { data } = await api.post('/exports/portfolio', null, {
+      params: {
+        reporting_period: reportingPeriod,
+        reporting_year: reportingYear,
+        ...(includeSources ? { include_sources: true } : {}),
+      },
       responseType: 'blob',
     })
     return data
@@ -29,6 +46,30 @@ export const exportsApi = {
     const { data } = await api.get(`/exports/project/${projectId}/history`)
     return data
   },
+
+  createJob: async (
+    projectId: string,
+    format: ExportJobFormat,
+    includeSources = false
+  ): Promise<ExportJob> => {
+    const { data } = await api.post(`/exports/project/${projectId}/jobs`, {
+      format,
+      include_sources: includeSources,
+    })
+    return data
+  },
+
+  getJob: async (jobId: string): Promise<ExportJob> => {
+    const { data } = await api.get(`/exports/jobs/${jobId}`)
+    return data
+  },
+
+  downloadExport: async (exportId: string): Promise<Blob> => {
+    const { data } = await api.get(`/exports/${exportId}/download`, {
+      responseType: 'blob',
+    })
+    return data
+  },
 }
 
 export interface ExportRecord {
@@ -38,5 +79,23 @@ export interface ExportRecord {
   generated_at: string
   warnings_count: string
   blocking_flags_count: string
+  available: boolean
 }
 
+
+export type ExportJobFormat = 'excel' | 'xml' | 'zip'
+
+export interface ExportJob {
+  id: string
+  project_id: string
+  format: ExportJobFormat
+  include_sources: boolean
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  progress: number
+  error_message: string | null
+  export_id: string | null
+  download_url: string | null
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}
@@ -3,8 +3,10 @@ export { projectsApi } from './projects'
 export { documentsApi } from './documents'
 export { extractionsApi } from './extractions'
 export { exportsApi } from './exports'
+export { usageApi } from './usage'
 
 export type { ValidationResult, ValidationFlag } from './projects'
 export type { OcrResult } from './documents'
 export type { ExportRecord } from './exports'
+export type { UsageDashboard, ProjectUsage } from './usage'
 
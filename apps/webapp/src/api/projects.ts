@@ -38,6 +38,13 @@ export interface ValidationResult {
   warning_count: number
   info_count: number
   can_export: boolean
+  rules?: ValidationRuleStats[]
+}
+
+export interface ValidationRuleStats {
+  rule: string
+  duration_ms: number
+  flag_count: number
 }
 
 export interface ValidationFlag {
@@ -0,0 +1,79 @@
+import api from './client'
+
+export const usageApi = {
+  getDashboard: async (limit = 10): Promise<UsageDashboard> => {
+    const { data } = await api.get(`/usage/dashboard?limit=${limit}`)
+    return data
+  },
+
+  getProject: async (projectId: string): Promise<ProjectUsage> => {
+    const { data } = await api.get(`/usage/project/${projectId}`)
+    return data
+  },
+}
+
+export interface UsageTotals {
+  document_count: number
+  ocr_pages: number
+  extraction_runs: number
+  llm_calls: number
+  prompt_tokens: number
+  cached_tokens: number
+  completion_tokens: number
+  cached_token_ratio: number
+  ocr_cost: number
+  llm_cost: number
+  total_cost: number
+  avg_cost_per_document: number
+  avg_ocr_time: number
+  avg_extraction_time: number
+}
+
+export interface ProjectUsageTotals extends UsageTotals {
+  project_id: string
+  project_name: string
+}
+
+export interface DocumentUsage {
+  document_id: string
+  project_id: string
+  filename: string
+  supplier?: string
+  page_count?: number
+  ocr_pages: number
+  ocr_cost: number
+  ocr_time: number
+  extraction_runs: number
+  llm_calls: number
+  prompt_tokens: number
+  cached_tokens: number
+  completion_tokens: number
+  llm_cost: number
+  extraction_time: number
+  total_cost: number
+}
+
+export interface SupplierUsage {
+  supplier: string
+  document_count: number
+  ocr_pages: number
+  prompt_tokens: number
+  completion_tokens: number
+  total_cost: number
+  total_time: number
+  avg_cost_per_document: number
+  avg_time_per_document: number
+}
+
+export interface UsageDashboard {
+  totals: UsageTotals
+  projects: ProjectUsageTotals[]
+  top_documents: DocumentUsage[]
+  top_suppliers: SupplierUsage[]
+}
+
+export interface ProjectUsage {
+  totals: ProjectUsageTotals | null
+  documents: DocumentUsage[]
+  suppliers: SupplierUsage[]
+}
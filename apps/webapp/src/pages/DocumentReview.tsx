@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useParams, Link, useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import {
@@ -21,7 +21,18 @@ import { projectsApi } from '../api/projects'
 import { Card } from '../components/ui/Card'
 import { Button } from '../components/ui/Button'
 import { Breadcrumb } from '../components/ui/Breadcrumb'
-import type { ExtractedField, FieldStatus } from '../types'
+import type { Document, DocumentEvent, DocumentStatus, ExtractedField, FieldStatus } from '../types'
+
+// Statuses after which a document's event stream closes
+const TERMINAL_STATUSES: DocumentStatus[] = ['ocr_failed', 'extraction_complete', 'extraction_failed', 'reviewed']
+
+// Key fields streamed while a document is being extracted
+const PREVIEW_FIELDS = [
+  { key: 'supplier', label: 'Supplier' },
+  { key: 'period_start', label: 'Period start' },
+  { key: 'period_end', label: 'Period end' },
+  { key: 'total_consumption', label: 'Energy consumed' },
+] as const
 
 export default function DocumentReview() {
   const { projectId, documentId } = useParams<{ projectId: string; documentId: string }>()
@@ -42,6 +53,29 @@ export default function DocumentReview() {
     enabled: !!documentId,
   })
 
+  const isProcessing = !!document && !TERMINAL_STATUSES.includes(document.status)
+
+  // Follow status and partially extracted fields while the document is processed
+  useEffect(() => {
+    if (!documentId || !isProcessing) return
+    const events = new EventSource(documentsApi.getEventsUrl(documentId))
+    events.onmessage = (event) => {
+      const update: DocumentEvent = JSON.parse(event.data)
+      queryClient.setQueryData<Document>(['document', documentId], (old) => old && {
+        ...old,
+        status: update.status,
+        extraction_data: update.extraction_data ?? undefined,
+        error_message: update.error_message ?? undefined,
+      })
+      if (TERMINAL_STATUSES.includes(update.status)) {
+        events.close()
+        queryClient.invalidateQueries({ queryKey: ['fields', documentId] })
+        queryClient.invalidateQueries({ queryKey: ['ocr', documentId] })
+      }
+    }
+    return () => events.close()
+  }, [documentId, isProcessing, queryClient])
+
   const { data: ocrResult } = useQuery({
     queryKey: ['ocr', documentId],
     queryFn: () => documentsApi.getOcr(documentId!),
@@ -236,6 +270,30 @@ export default function DocumentReview() {
                   ))}
                 </tbody>
               </table>
+            ) : isProcessing ? (
+              <div className="p-6">
+                <div className="flex items-center gap-2 text-sm text-osita-500 mb-4">
+                  <Loader2 className="w-4 h-4 animate-spin" />
+                  Extracting fields...
+                </div>
+                <dl className="space-y-3">
+                  {PREVIEW_FIELDS.map(({ key, label }) => {
+                    const value = document.extraction_data?.[key]
+                    return (
+                      <div key={key} className="flex items-center justify-between text-sm">
+                        <dt className="text-osita-500">{label}</dt>
+                        <dd className={cn('font-medium', value == null ? 'text-osita-300' : 'text-osita-900')}>
+                          {value == null
+                            ? '...'
+                            : key === 'total_consumption'
+                              ? `${value} ${document.extraction_data?.total_consumption_unit ?? 'kWh'}`
+                              : value}
+                        </dd>
+                      </div>
+                    )
+                  })}
+                </dl>
+              </div>
             ) : (
               <div className="text-center py-12 text-osita-500">
                 <Edit3 className="w-12 h-12 mx-auto mb-3 opacity-50" />
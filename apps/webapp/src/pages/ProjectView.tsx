@@ -210,7 +210,7 @@ export default function ProjectView() {
                                 <span>Period: {doc.extraction_data.period_start}</span>
                               )}
                               {doc.extraction_data?.total_consumption && (
-                                <span>Energy consumed: {doc.extraction_data.total_consumption} kWh</span>
+                                <span>Energy consumed: {doc.extraction_data.total_consumption} {doc.extraction_data.total_consumption_unit ?? 'kWh'}</span>
                               )}
                               {!doc.extraction_data?.period_start && doc.page_count && (
                                 <span>{doc.page_count} pages</span>
@@ -83,12 +83,22 @@ export interface Document {
     period_start?: string
     period_end?: string
     total_consumption?: number
+    total_consumption_unit?: string
     supplier?: string
   }
+  duplicate_of_id?: string
+  duplicate_similarity?: number
   created_at: string
   updated_at: string
 }
 
+// Server-sent event of a document's processing status
+export interface DocumentEvent {
+  status: DocumentStatus
+  extraction_data?: Document['extraction_data'] | null
+  error_message?: string | null
+}
+
 export interface DocumentUpload {
   id: string
   filename: string
@@ -120,6 +130,15 @@ export interface Extraction {
   created_at: string
 }
 
+export interface EvidenceSpan {
+  type: 'text_span'
+  page: number
+  start: number
+  end: number
+  score: number
+  match: 'exact' | 'fuzzy'
+}
+
 export interface ExtractedField {
   id: string
   field_name: string
@@ -129,9 +148,12 @@ export interface ExtractedField {
   normalized_value?: string
   normalized_unit?: string
   confidence?: number
+  model_confidence?: number
+  confidence_checks?: Record<string, number>
   status: FieldStatus
   source_page?: number
   source_quote?: string
+  source_bbox?: EvidenceSpan
   original_value?: string
   edit_reason?: string
   created_at: string